@@ -0,0 +1 @@
+"""Benchmarks for KPI AI Agent"""
@@ -0,0 +1,58 @@
+"""Benchmark the streaming anomaly detector: history ingest, daily update cost and state size
+
+Run from the project directory:
+    python -m benchmarks.bench_anomaly --series 1000 5000 --days 365 --cases-per-day 20000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.tools.anomaly.core import StreamingDetector
+
+
+def make_cases(n_series: int, n_days: int, cases_per_day: int, seed: int = 0) -> pd.DataFrame:
+    """Cases spread over n_series call center x problem code category pairs"""
+    rng = np.random.default_rng(seed)
+    n_rows = n_days * cases_per_day
+    series = rng.integers(0, n_series, n_rows)
+    n_categories = 50
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.sort(rng.integers(0, n_days, n_rows)), unit='D')
+    return pd.DataFrame({
+        'Call Center': pd.Categorical([f"CC{i}" for i in series // n_categories]),
+        'Problem Code Category': pd.Categorical([f"PC{i}" for i in series % n_categories]),
+        'Case Created On Date': dates.strftime('%d/%m/%Y'),
+        'Resolution Days': rng.gamma(2.0, 1.5, n_rows)
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming anomaly detector benchmark")
+    parser.add_argument("--series", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--cases-per-day", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'series':>7} {'rows':>9} {'history_s':>10} {'rows_s':>10} {'day_update_ms':>14} "
+          f"{'state_b_series':>15} {'alerts':>7}")
+    for n_series in args.series:
+        df = make_cases(n_series, args.days, args.cases_per_day)
+        days = pd.to_datetime(df['Case Created On Date'], format='%d/%m/%Y')
+        last = days.max()
+        history, latest = df[days < last - pd.Timedelta(days=1)], df[days >= last - pd.Timedelta(days=2)]
+
+        detector = StreamingDetector()
+        start = time.perf_counter()
+        detector.update(history)
+        history_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        detector.update(latest)
+        update_ms = (time.perf_counter() - start) * 1000
+        info = detector.describe()
+        print(f"{info['series']:>7} {len(df):>9} {history_seconds:>10.2f} {len(history) / history_seconds:>10.0f} "
+              f"{update_ms:>14.1f} {info['state_bytes_per_series']:>15} {len(detector.alerts):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark the predictive model backends: training time, inference throughput and accuracy
+
+Run from the project directory:
+    python -m benchmarks.bench_backends --rows 20000 100000 --time-budget 10
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_eda_profile import make_frame
+from src.tools.predictive.backends import BACKEND_PARAMS
+from src.tools.predictive.core import PredictiveAnalyzer
+from src.tools.predictive.features import FeaturePipeline
+
+
+def make_target(df: pd.DataFrame, seed: int = 0) -> pd.Series:
+    """Resolution days driven by problem code, origin and agreement, plus noise"""
+    rng = np.random.default_rng(seed)
+    code = df['Problem Code'].astype(str).str.split('.').str[0].astype(int)
+    days = (code % 7 + 2.0 * (df['Origin'].astype(str) == 'HDIS') +
+            1.5 * (df['Agreement Type'].astype(str) == 'MPS') + rng.exponential(1.0, len(df)))
+    return pd.Series(days.to_numpy(), name='Resolution Days')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model backend benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[20000, 100000])
+    parser.add_argument("--backends", nargs="+", default=list(BACKEND_PARAMS))
+    parser.add_argument("--time-budget", type=float, default=None, help="Training seconds per model")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'backend':>24} {'float64_mb':>11} {'float32_mb':>11} {'train_s':>8} "
+          f"{'trees':>6} {'stopped':>8} {'predict_rows_s':>15} {'r2':>6}")
+    for n_rows in args.rows:
+        df = make_frame(n_rows)
+        y = make_target(df)
+        pipeline = FeaturePipeline()
+        X = pipeline.fit_transform(df, y)
+        dense_mb = X.shape[0] * X.shape[1] / 1e6
+        for backend in args.backends:
+            _, results = PredictiveAnalyzer.fit_forecast_model(X, y, feature_names=pipeline.feature_names,
+                                                               backend=backend, time_budget=args.time_budget)
+            timing = results['timing']
+            print(f"{n_rows:>8} {backend:>24} {dense_mb * 8:>11.1f} {dense_mb * 4:>11.1f} "
+                  f"{timing['train_seconds']:>8.2f} {str(timing['estimators']):>6} {str(timing['stopped_early']):>8} "
+                  f"{timing['predict_rows_per_second']:>15} {results['model_performance']['r2_score']:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
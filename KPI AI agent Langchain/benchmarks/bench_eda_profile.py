@@ -0,0 +1,77 @@
+"""Benchmark the fused column profiler against the previous summary statistics
+
+Run from the project directory:
+    python -m benchmarks.bench_eda_profile --rows 10000 1000000 10000000
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_case_frame
+from src.tools.data.encoding import optimize_dtypes
+from src.tools.eda.profiler import profile_summary
+
+# Larger frames repeat rows of a base frame so generation stays cheap
+MAX_BASE_ROWS = 1000000
+
+
+def reference_summary_stats(df: pd.DataFrame):
+    """EDAProcessor.generate_summary_stats before the fused profiler"""
+    numeric_cols = df.select_dtypes(include=['number']).columns
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns
+    summary = {
+        'shape': df.shape,
+        'numeric_summary': {},
+        'categorical_summary': {},
+        'missing_data': df.isnull().sum().to_dict(),
+        'data_types': df.dtypes.to_dict()
+    }
+    if len(numeric_cols) > 0:
+        summary['numeric_summary'] = df[numeric_cols].describe().to_dict()
+    for col in categorical_cols:
+        summary['categorical_summary'][col] = {
+            'unique_count': df[col].nunique(),
+            'top_values': df[col].value_counts().head(5).to_dict()
+        }
+    return summary
+
+
+def make_frame(n_rows: int) -> pd.DataFrame:
+    """Case-schema frame with loader dtypes (categoricals, parsed dates)"""
+    base, _ = optimize_dtypes(make_case_frame(min(n_rows, MAX_BASE_ROWS)))
+    if n_rows <= len(base):
+        return base
+    return base.take(np.arange(n_rows) % len(base)).reset_index(drop=True)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summary statistics profiler benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 1000000, 10000000])
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Profiler threads (default: one per CPU for large frames)")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'rows':>10} {'reference_s':>12} {'fused_s':>9} {'speedup':>8}")
+    for n_rows in args.rows:
+        df = make_frame(n_rows)
+        reference_seconds, reference = timed(reference_summary_stats, df)
+        fused_seconds, fused = timed(profile_summary, df, workers=args.workers)
+        assert fused['categorical_summary'] == reference['categorical_summary']
+        assert fused['missing_data'] == reference['missing_data']
+        print(f"{n_rows:>10} {reference_seconds:>12.3f} {fused_seconds:>9.3f} "
+              f"{reference_seconds / fused_seconds:>8.2f}")
+        del df
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark the fitted feature pipeline: fit cost, batch transform throughput and memory
+
+Run from the project directory:
+    python -m benchmarks.bench_features --rows 100000 1000000 --batch 10000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_eda_profile import make_frame
+from src.tools.predictive.features import CATEGORICAL_FEATURES, FeaturePipeline
+
+
+def sparse_bytes(matrix) -> int:
+    return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+
+def dense_one_hot_bytes(df: pd.DataFrame) -> int:
+    """Size of a dense float64 one-hot encoding of every categorical feature, without building it"""
+    return len(df) * sum(df[col].nunique() for col in CATEGORICAL_FEATURES) * 8
+
+
+def peak_mb(func, *args):
+    """Run func and return its result, seconds and peak traced allocation in MB"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature pipeline benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--batch", type=int, default=10000, help="Rows per transform call")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'fit_s':>7} {'fit_peak_mb':>12} {'features':>9} {'matrix_mb':>10} "
+          f"{'dense_1hot_mb':>14} {'batch_rows_s':>13} {'batch_peak_mb':>14} {'refit_rows_s':>13}")
+    for n_rows in args.rows:
+        df = make_frame(n_rows)
+        y = pd.Series(np.random.default_rng(0).exponential(3.0, n_rows), name='Resolution Days')
+        pipeline = FeaturePipeline()
+        matrix, fit_seconds, fit_peak = peak_mb(pipeline.fit_transform, df, y)
+
+        batches = [df.iloc[start:start + args.batch] for start in range(0, n_rows, args.batch)]
+        start = time.perf_counter()
+        for batch in batches:
+            pipeline.transform(batch)
+        batch_rate = n_rows / (time.perf_counter() - start)
+        _, _, batch_peak = peak_mb(pipeline.transform, batches[0])
+
+        # Encoding recomputed per call, as without a fitted pipeline
+        sample = batches[:10]
+        start = time.perf_counter()
+        for batch in sample:
+            FeaturePipeline().fit_transform(batch, y.iloc[:len(batch)])
+        refit_rate = sum(len(b) for b in sample) / (time.perf_counter() - start)
+
+        print(f"{n_rows:>9} {fit_seconds:>7.2f} {fit_peak:>12.1f} {matrix.shape[1]:>9} "
+              f"{sparse_bytes(matrix) / 1e6:>10.1f} {dense_one_hot_bytes(df) / 1e6:>14.1f} "
+              f"{batch_rate:>13.0f} {batch_peak:>14.1f} {refit_rate:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark batch Holt-Winters fitting against fitting one series at a time
+
+Run from the project directory:
+    python -m benchmarks.bench_forecast --series 100 1000 10000 --periods 120
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.tools.predictive.timeseries import holt_winters_batch
+
+# The per-series loop is timed on at most this many series and extrapolated
+MAX_LOOP_SERIES = 500
+
+
+def make_series(n_series: int, n_periods: int, seed: int = 0) -> np.ndarray:
+    """Daily case counts with per-series level, trend and weekly pattern"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_periods)
+    level = rng.uniform(5, 200, (n_series, 1))
+    trend = rng.normal(0, 0.05, (n_series, 1)) * level / 100
+    weekly = np.where(t % 7 >= 5, -0.4, 0.1)[None, :] * level
+    return np.clip(rng.poisson(np.clip(level + trend * t + weekly, 0, None)), 0, None).astype(np.float64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch time-series forecasting benchmark")
+    parser.add_argument("--series", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--periods", type=int, default=120)
+    parser.add_argument("--horizon", type=int, default=14)
+    args = parser.parse_args()
+
+    print(f"{'series':>8} {'loop_series_s':>14} {'batch_s':>9} {'batch_series_s':>15} {'speedup':>8}")
+    for n_series in args.series:
+        values = make_series(n_series, args.periods)
+        looped = min(n_series, MAX_LOOP_SERIES)
+        start = time.perf_counter()
+        single = [holt_winters_batch(values[i:i + 1], horizon=args.horizon)['forecasts'][0] for i in range(looped)]
+        loop_rate = looped / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batch = holt_winters_batch(values, horizon=args.horizon)
+        batch_seconds = time.perf_counter() - start
+        np.testing.assert_allclose(batch['forecasts'][:looped], np.array(single))
+        batch_rate = n_series / batch_seconds
+        print(f"{n_series:>8} {loop_rate:>14.0f} {batch_seconds:>9.3f} {batch_rate:>15.0f} "
+              f"{batch_rate / loop_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
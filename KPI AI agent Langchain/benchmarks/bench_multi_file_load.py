@@ -0,0 +1,36 @@
+"""Benchmark parallel multi-file loading against worker count
+
+Run from the project directory:
+    python -m benchmarks.bench_multi_file_load --files 20 --rows 50000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import write_case_exports
+from src.tools.data.core import DataRetriever
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-file loader scaling benchmark")
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=50000, help="Rows per file")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = write_case_exports(tmp_dir, args.files, args.rows)
+        print(f"{args.files} files x {args.rows} rows, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8} {'seconds':>9} {'speedup':>8} {'rows':>10}")
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            df, metrics = DataRetriever.load_csv_files(paths, max_workers=workers, use_cache=False)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{metrics['workers']:>8} {elapsed:>9.2f} {baseline / elapsed:>8.2f} {len(df):>10}")
+
+
+if __name__ == '__main__':
+    main()
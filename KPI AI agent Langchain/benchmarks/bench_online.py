@@ -0,0 +1,60 @@
+"""Benchmark online volume updates against refitting on the whole history
+
+Run from the project directory:
+    python -m benchmarks.bench_online --rows 100000 1000000 --days 365
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.tools.predictive.online import OnlineVolumeForecaster
+from src.tools.predictive.timeseries import forecast_case_volumes
+
+GROUP_BY = ['Call Center', 'Problem Code Category']
+
+
+def make_cases(n_rows: int, n_days: int, seed: int = 0) -> pd.DataFrame:
+    """Cases spread over n_days for 10 call centers x 20 problem code categories"""
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.sort(rng.integers(0, n_days, n_rows)), unit='D')
+    return pd.DataFrame({
+        'Call Center': rng.choice([f"CC{i}" for i in range(10)], n_rows),
+        'Problem Code Category': rng.choice([f"PC{i}" for i in range(20)], n_rows),
+        'Case Created On Date': dates.strftime('%d/%m/%Y')
+    })
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Online forecast update benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--horizon", type=int, default=14)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'series':>7} {'refit_ms':>9} {'start_ms':>9} {'update_ms':>10} "
+          f"{'new_rows':>9} {'forecast_ms':>12} {'speedup':>8}")
+    for n_rows in args.rows:
+        df = make_cases(n_rows, args.days)
+        days = pd.to_datetime(df['Case Created On Date'], format='%d/%m/%Y')
+        history = df[days < days.max() - pd.Timedelta(days=1)]
+        # One new day: the rows of yesterday, plus today's first rows that close it off
+        new_rows = df[days >= days.max() - pd.Timedelta(days=2)]
+
+        _, refit_ms = timed(forecast_case_volumes, df, group_by=GROUP_BY, horizon=args.horizon, max_series=None)
+        forecaster, start_ms = timed(OnlineVolumeForecaster.from_history, history, group_by=GROUP_BY)
+        _, update_ms = timed(forecaster.update, new_rows)
+        _, forecast_ms = timed(forecaster.forecast, args.horizon)
+        print(f"{n_rows:>9} {len(forecaster.keys):>7} {refit_ms:>9.1f} {start_ms:>9.1f} {update_ms:>10.2f} "
+              f"{len(new_rows):>9} {forecast_ms:>12.2f} {refit_ms / (update_ms + forecast_ms):>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark cold-start import time with python -X importtime
+
+Run from the project directory:
+    python -m benchmarks.bench_startup --target cli --budget 4.0
+
+Each run starts a fresh interpreter, so nothing is served from an already
+warm sys.modules. Exits with status 1 when the median import time exceeds
+the budget or a module that should load lazily is imported at startup.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# What each mode imports and builds before it can answer the first query
+TARGETS = {
+    'cli': (
+        "import app\n"
+        "from src.tools.factory import get_all_tools\n"
+        "get_all_tools({'tools': {'powerbi': {'enabled': False}, 'ahp': {'enabled': False}}})\n"
+    ),
+    'tools': (
+        "from src.tools.factory import get_all_tools\n"
+        "get_all_tools({'tools': {'powerbi': {'enabled': False}, 'ahp': {'enabled': False}}})\n"
+    )
+}
+DEFAULT_BUDGETS = {'cli': 4.0, 'tools': 1.5}
+# Only needed by specific analyses; importing them at startup is a regression
+LAZY_MODULES = ['matplotlib', 'seaborn', 'sklearn', 'scipy', 'plotly', 'streamlit']
+
+_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def measure(code: str, cwd: str):
+    """Run code in a fresh interpreter and parse its import timings
+
+    Returns the total import seconds, {module: cumulative seconds} for
+    top-level imports, the set of all imported modules and the exit error.
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=cwd, capture_output=True, text=True)
+    top_level, modules, total = {}, set(), 0.0
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)) / 1e6, len(match.group(3)), match.group(4)
+        modules.add(name)
+        if indent == 1:
+            top_level[name] = cumulative
+            total += cumulative
+    error = None
+    if proc.returncode != 0:
+        messages = [line for line in proc.stderr.splitlines() if line.strip() and not _LINE.match(line)]
+        error = messages[-1] if messages else "unknown error"
+    return total, top_level, modules, error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time benchmark")
+    parser.add_argument("--target", choices=list(TARGETS), default="cli")
+    parser.add_argument("--budget", type=float, default=None, help="Maximum median import seconds")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to show")
+    args = parser.parse_args()
+    budget = args.budget if args.budget is not None else DEFAULT_BUDGETS[args.target]
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    totals = []
+    for _ in range(args.repeat):
+        total, top_level, modules, error = measure(TARGETS[args.target], cwd)
+        if error:
+            print(f"Startup of '{args.target}' failed: {error}")
+            sys.exit(2)
+        totals.append(total)
+
+    median = statistics.median(totals)
+    print(f"target={args.target} runs={args.repeat} median={median:.3f}s "
+          f"min={min(totals):.3f}s max={max(totals):.3f}s budget={budget:.3f}s")
+    print(f"{'seconds':>9}  module")
+    for name, seconds in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{seconds:>9.3f}  {name}")
+
+    eager = [name for name in LAZY_MODULES if name in modules]
+    failed = False
+    if eager:
+        print(f"FAIL: imported at startup but only needed on demand: {', '.join(eager)}")
+        failed = True
+    if median > budget:
+        print(f"FAIL: median import time {median:.3f}s exceeds the {budget:.3f}s budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Synthetic case exports for benchmarks"""
+import os
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+GEOS = {'North America': ['Canada', 'United States'], 'EMEA': ['France', 'Morocco'], 'APAC': ['India']}
+CALL_CENTERS = ['Call Center : Rabat CA', 'Call Center : Rabat US', 'Call Center : Casablanca', 'Call Center : Pune']
+AGENTS = [f"Agent {i:03d}" for i in range(120)]
+STATUSES = ['Resolved', 'Active']
+AGREEMENTS = ['Concession', 'Extended Warranty', 'MPS', 'Base Warranty']
+CATEGORIES = ['Print Quality', 'Paper Feed Issues', 'Numeric Error Codes', 'Software', 'Connectivity Issues',
+              'Supply Item Issues', 'Scan Image Quality', 'Fax Issues']
+FAMILIES = [f"MX{i}x" for i in range(20, 95)]
+ORIGINS = ['Phone', 'Chat', 'Email', 'HDIS', 'Portal']
+
+
+def make_case_frame(n_rows: int, seed: int = 0, start: str = "2024-10-01", days: int = 90) -> pd.DataFrame:
+    """Build a frame with the case export schema and realistic cardinalities"""
+    rng = np.random.default_rng(seed)
+    geo_names = list(GEOS)
+    geo = rng.choice(geo_names, n_rows, p=[0.7, 0.2, 0.1])
+    country = np.array([GEOS[g][i % len(GEOS[g])] for g, i in zip(geo, rng.integers(0, 2, n_rows))])
+    created = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, n_rows), unit='D')
+    completed = created + pd.to_timedelta(rng.exponential(3.0, n_rows).astype(int), unit='D')
+    return pd.DataFrame({
+        'Geo Hierarchy - Geo': geo,
+        'Geo Hierarchy - Country': country,
+        'Call Center': rng.choice(CALL_CENTERS, n_rows),
+        'Case Number': [f"CAS-{seed:02d}{i:07d}" for i in range(n_rows)],
+        'Case Status': rng.choice(STATUSES, n_rows, p=[0.95, 0.05]),
+        'Case Created On Date': created.strftime('%d/%m/%Y'),
+        'Completion Date': completed.strftime('%d/%m/%Y'),
+        'Agent Name': rng.choice(AGENTS, n_rows),
+        'Service Account': [f"Account {i}" for i in rng.integers(0, 2000, n_rows)],
+        'Agreement Type': rng.choice(AGREEMENTS, n_rows),
+        'Problem Code Category': rng.choice(CATEGORIES, n_rows),
+        'Problem Code': [f"{i}.{j:02d}" for i, j in zip(rng.integers(10, 300, n_rows), rng.integers(0, 99, n_rows))],
+        'Resolution Code': rng.choice(['Supplies Issue', 'Replaced Failed Parts', 'No Defect Found'], n_rows),
+        'Product Family': rng.choice(FAMILIES, n_rows),
+        'Model Name': [f"M{i}" for i in rng.integers(0, 250, n_rows)],
+        'Origin': rng.choice(ORIGINS, n_rows),
+        'First Work Order Number': np.where(rng.random(n_rows) < 0.3, rng.integers(1e7, 2e7, n_rows), np.nan),
+        'Work Order Number': np.where(rng.random(n_rows) < 0.3, rng.integers(1e7, 2e7, n_rows), np.nan),
+        'Work Order Address': [f"{i} Main St" for i in rng.integers(0, 1000, n_rows)],
+        'Serial Number': [f"SN{i:010d}" for i in rng.integers(0, 10 ** 9, n_rows)],
+        '# of TSC Break Fix Resolved Cases': 1,
+        '# of Service Fix Resolved Cases': rng.integers(0, 2, n_rows)
+    })
+
+
+def write_case_exports(directory: str, n_files: int, rows_per_file: int) -> List[str]:
+    """Write semicolon-delimited synthetic exports and return their paths"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(n_files):
+        path = os.path.join(directory, f"cases_{i:02d}.csv")
+        make_case_frame(rows_per_file, seed=i).to_csv(path, sep=';', index=False)
+        paths.append(path)
+    return paths
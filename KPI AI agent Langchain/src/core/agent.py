@@ -51,6 +51,14 @@ class KPIAgent:
             4. Multi-criteria decision analysis using AHP
             5. Actionable recommendation generation
             
+            Data tools return dataset handles such as 'ds:cases_Q4_2024'. Pass the handle to
+            other tools instead of copying rows into tool inputs. For case counts, resolved
+            counts and resolution times by geo, country, call center, agent or period, use
+            kpi_cube before scanning raw rows. For other aggregations over loaded data, write
+            SQL for sql_query rather than passing rows between tools. To find unusual days in
+            volume or resolution time per call center and problem code category, use
+            anomaly_alerts; it remembers what it has seen, so pass the latest export each time.
+            
             Always provide clear, data-driven insights and maintain professional communication.
             When uncertainty exists, acknowledge it and suggest verification steps.
             """),
@@ -4,6 +4,7 @@ from datetime import datetime
 from langchain.chat_models import ChatOpenAI
 from .agent import KPIAgent
 from ..tools.factory import get_all_tools
+from ..tools.result_cache import get_default_result_cache
 from ..memory.factory import create_memory_system
 
 class KPIAgentOrchestrator:
@@ -80,5 +81,6 @@ class KPIAgentOrchestrator:
             "model": self.config.get("llm", {}).get("model", "gpt-4"),
             "tools_count": len(self.agent.tools) if self.agent else 0,
             "memory_enabled": self.agent.memory is not None if self.agent else False,
+            "result_cache": get_default_result_cache().get_stats(),
             "timestamp": datetime.now().isoformat()
         }
\ No newline at end of file
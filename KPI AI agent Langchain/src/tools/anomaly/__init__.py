@@ -0,0 +1 @@
+"""Anomaly detection tools for KPI AI Agent"""
\ No newline at end of file
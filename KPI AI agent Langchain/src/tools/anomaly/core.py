@@ -0,0 +1,293 @@
+"""Streaming anomaly detection on per-series daily case volume and resolution time"""
+import os
+from collections import deque
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..data.dates import CASE_COMPLETED_COLUMN, CASE_CREATED_COLUMN, RESOLUTION_DAYS_COLUMN, to_datetime_array
+from ..kpi.core import LEVEL_ALIASES
+from ..predictive.registry import ModelRecord, ModelRegistry
+from ..predictive.timeseries import group_keys
+
+DEFAULT_GROUP_BY = ['Call Center', 'Problem Code Category']
+METRICS = ('volume', 'resolution_days')
+METHODS = ('ewma', 'mad')
+DEFAULT_THRESHOLD = 3.5
+# Each weekday has its own baseline
+SEASON_LENGTH = 7
+# Observations after a weekday baseline's first value before a series can alert
+WARMUP_PERIODS = 28
+# Weight of a new value in its weekday baseline; until a baseline has seen 1 / SMOOTHING
+# values it is their plain mean
+SMOOTHING = 0.2
+# Weight of a new deviation in the EWMA variance and multiplicative step of the streaming MAD.
+# The k-th deviation before 1 / SCALE_SMOOTHING weighs 1 / k, so the first estimates settle quickly
+SCALE_SMOOTHING = 0.05
+# MAD of normal data times this is its standard deviation
+MAD_TO_STD = 1.4826
+# Smallest standard deviation per metric, so near-constant series do not alert on tiny changes:
+# Poisson noise for transformed counts, about 10% per case for log resolution time
+MIN_SCALE = {'volume': 1.0, 'resolution_days': 0.1}
+# Most recent alerts kept with a detector
+MAX_ALERTS = 1000
+
+
+def anscombe(counts: np.ndarray) -> np.ndarray:
+    """Variance-stabilized counts: Poisson noise has unit standard deviation at any level"""
+    return 2 * np.sqrt(counts + 3 / 8)
+
+
+def inverse_anscombe(values: np.ndarray) -> np.ndarray:
+    return (values / 2) ** 2 - 3 / 8
+
+
+def resolution_days(df: pd.DataFrame) -> np.ndarray:
+    """Resolution days per row, from the column or the case dates; NaN when unknown"""
+    if RESOLUTION_DAYS_COLUMN in df.columns:
+        return pd.to_numeric(df[RESOLUTION_DAYS_COLUMN], errors='coerce').to_numpy(dtype=np.float64)
+    if CASE_COMPLETED_COLUMN in df.columns and CASE_CREATED_COLUMN in df.columns:
+        delta = to_datetime_array(df[CASE_COMPLETED_COLUMN]) - to_datetime_array(df[CASE_CREATED_COLUMN])
+        return delta / np.timedelta64(1, 'D')
+    return np.full(len(df), np.nan)
+
+
+class StreamingDetector:
+    """Per-series anomaly scores for daily case volume and mean resolution days
+
+    Every series keeps a fixed-size state per metric: one baseline per
+    weekday, updated as an EWMA, plus an EWMA variance and a streaming MAD
+    of the deviations from it. Counts are compared after an Anscombe
+    transform, and resolution time as the day's mean log1p(days) weighted
+    by the square root of its resolved cases, so busy weekdays, quiet
+    weekends and the long tail of slow cases share one scale; alerts report
+    counts and geometric mean resolution days.
+
+    A day's value is scored against the state before the state learns from
+    it: the deviation over the EWMA standard deviation (method 'ewma') or
+    over 1.4826 * MAD (method 'mad'). Days scoring at least threshold in
+    absolute value raise an alert. Deviations are clipped to the threshold
+    before they update the state, so a spike does not become the new normal.
+
+    Rows are ingested up to a watermark, the last complete day: the latest
+    day of a batch may still be filling up and is scored once a later day
+    arrives, and rows at or before the watermark are ignored.
+    """
+
+    def __init__(self, group_by: Sequence[str] = DEFAULT_GROUP_BY, method: str = 'ewma',
+                 threshold: float = DEFAULT_THRESHOLD, max_alerts: int = MAX_ALERTS,
+                 date_column: str = CASE_CREATED_COLUMN):
+        if method not in METHODS:
+            raise ValueError(f"Unknown method: {method}. Use one of {list(METHODS)}")
+        self.group_by = list(group_by)
+        self.method = method
+        self.threshold = threshold
+        self.date_column = date_column
+        self.keys: List[tuple] = []
+        self.key_rows: Dict[tuple, int] = {}
+        self.floor = np.array([MIN_SCALE[metric] for metric in METRICS])
+        self.baseline = np.empty((0, len(METRICS), SEASON_LENGTH))
+        self.seen = np.empty((0, len(METRICS), SEASON_LENGTH), dtype=np.int32)
+        self.mad = np.empty((0, len(METRICS)))
+        self.variance = np.empty((0, len(METRICS)))
+        self.observations = np.empty((0, len(METRICS)), dtype=np.int64)
+        self.watermark: Optional[np.datetime64] = None
+        self.alerts: deque = deque(maxlen=max_alerts)
+        self.rows_ingested = 0
+        self.updates = 0
+
+    def _add_series(self, keys: List[tuple]) -> None:
+        for key in keys:
+            self.key_rows[key] = len(self.keys)
+            self.keys.append(key)
+        n = len(keys)
+        self.baseline = np.concatenate([self.baseline, np.full((n, len(METRICS), SEASON_LENGTH), np.nan)])
+        self.seen = np.concatenate([self.seen, np.zeros((n, len(METRICS), SEASON_LENGTH), dtype=np.int32)])
+        self.mad = np.concatenate([self.mad, np.tile(self.floor / MAD_TO_STD, (n, 1))])
+        self.variance = np.concatenate([self.variance, np.tile(self.floor ** 2, (n, 1))])
+        self.observations = np.concatenate([self.observations, np.zeros((n, len(METRICS)), dtype=np.int64)])
+
+    def _series_rows(self, df: pd.DataFrame) -> np.ndarray:
+        """State row of every case, adding series seen for the first time"""
+        if not self.group_by:
+            if not self.keys:
+                self._add_series([()])
+            return np.zeros(len(df), dtype=np.int64)
+        # Missing group values are keyed '(missing)', which stays equal after a reload, unlike NaN
+        codes, key_frame = group_keys(df, self.group_by, sort=False)
+        keys = list(key_frame.itertuples(index=False, name=None))
+        self._add_series([key for key in keys if key not in self.key_rows])
+        return np.array([self.key_rows[key] for key in keys], dtype=np.int64)[codes]
+
+    def update(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Score and learn every complete day after the watermark, one vectorized step per day"""
+        missing = [col for col in [self.date_column, *self.group_by] if col not in df.columns]
+        if missing:
+            raise ValueError(f"Columns not found in data: {missing}")
+        days = to_datetime_array(df[self.date_column]).astype('datetime64[D]')
+        valid = ~np.isnat(days)
+        if not valid.any():
+            return {'days_added': 0, 'rows_used': 0, 'new_series': 0, 'alerts': 0}
+        latest = days[valid].max()
+        new = valid & (days < latest)
+        if self.watermark is not None:
+            new &= days > self.watermark
+        if not new.any():
+            return {'days_added': 0, 'rows_used': 0, 'new_series': 0, 'alerts': 0}
+
+        first = days[new].min() if self.watermark is None else self.watermark + np.timedelta64(1, 'D')
+        n_days = int((latest - first).astype(np.int64))
+        known = len(self.keys)
+        rows = self._series_rows(df[new])
+        n = len(self.keys)
+        offsets = (days[new] - first).astype(np.int64)
+        cells = rows * n_days + offsets
+        volume = np.bincount(cells, minlength=n * n_days).astype(np.float64)
+        with np.errstate(invalid='ignore'):
+            resolution = np.log1p(np.clip(resolution_days(df[new]), 0, None))
+        timed = ~np.isnan(resolution)
+        resolved = np.bincount(cells[timed], minlength=n * n_days)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_resolution = np.bincount(cells[timed], weights=resolution[timed], minlength=n * n_days) / resolved
+        values = np.stack([anscombe(volume), mean_resolution], axis=1).reshape(n, n_days, len(METRICS))
+        weights = np.stack([np.ones(n * n_days), np.sqrt(resolved)], axis=1).reshape(n, n_days, len(METRICS))
+
+        # New series start on their first case rather than with zero-volume days
+        start = np.full(n, n_days)
+        np.minimum.at(start, rows, offsets)
+        before_start = (np.arange(n_days)[None, :] < start[:, None]) & (np.arange(n) >= known)[:, None]
+        values[before_start] = np.nan
+
+        alerts = 0
+        for offset in range(n_days):
+            alerts += self._step(values[:, offset], weights[:, offset], first + np.timedelta64(offset, 'D'))
+        self.watermark = latest - np.timedelta64(1, 'D')
+        self.rows_ingested += int(new.sum())
+        self.updates += 1
+        return {'days_added': n_days, 'rows_used': int(new.sum()), 'new_series': n - known, 'alerts': alerts}
+
+    def _step(self, x: np.ndarray, weight: np.ndarray, day: np.datetime64) -> int:
+        """Score one day's (series x metric) values against the state, then learn from them"""
+        weekday = int((day.astype(np.int64) + 3) % SEASON_LENGTH)
+        observed = ~np.isnan(x)
+        baseline = self.baseline[:, :, weekday]
+        seen = self.seen[:, :, weekday]
+        fresh = observed & (seen == 0)
+        baseline = np.where(fresh, x, baseline)
+        deviation = np.where(observed, (x - baseline) * weight, 0.0)
+        scale = self.mad * MAD_TO_STD if self.method == 'mad' else np.sqrt(self.variance)
+        scale = np.maximum(scale, self.floor)
+        score = deviation / scale
+        learn = observed & ~fresh
+        warm = self.observations >= WARMUP_PERIODS
+        flagged = np.argwhere(learn & warm & (np.abs(score) >= self.threshold))
+        for row, metric in flagged:
+            value, expected = x[row, metric], baseline[row, metric]
+            if METRICS[metric] == 'volume':
+                value, expected = inverse_anscombe(value), max(inverse_anscombe(expected), 0.0)
+            else:
+                value, expected = np.expm1(value), np.expm1(expected)
+            self.alerts.append({
+                'key': dict(zip(self.group_by, self.keys[row])),
+                'metric': METRICS[metric],
+                'period': str(day),
+                'value': round(float(value), 3),
+                'expected': round(float(expected), 3),
+                'score': round(float(score[row, metric]), 2)
+            })
+
+        limit = self.threshold * scale
+        clipped = np.where(warm, np.clip(deviation, -limit, limit), deviation)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            step = np.maximum(SMOOTHING, 1 / (seen + 1))
+            self.baseline[:, :, weekday] = np.where(observed, baseline + step * clipped / weight, baseline)
+        self.seen[:, :, weekday] = seen + observed
+        rate = np.maximum(SCALE_SMOOTHING, 1 / (self.observations + 1))
+        mad = np.maximum(self.mad * np.exp(rate * np.sign(np.abs(clipped) - self.mad)), self.floor / MAD_TO_STD)
+        self.mad = np.where(learn, mad, self.mad)
+        self.variance = np.where(learn, (1 - rate) * self.variance + rate * clipped ** 2, self.variance)
+        self.observations += learn
+        return len(flagged)
+
+    def recent_alerts(self, days: Optional[int] = 7, metric: Optional[str] = None,
+                      top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Alerts of the last days up to the watermark, strongest first"""
+        alerts = list(self.alerts)
+        if days is not None and self.watermark is not None:
+            since = str(self.watermark - np.timedelta64(days - 1, 'D'))
+            alerts = [alert for alert in alerts if alert['period'] >= since]
+        if metric is not None:
+            alerts = [alert for alert in alerts if alert['metric'] == metric]
+        alerts.sort(key=lambda alert: -abs(alert['score']))
+        return alerts if top is None else alerts[:top]
+
+    def describe(self) -> Dict[str, Any]:
+        state_bytes = self.baseline.nbytes + self.seen.nbytes + self.mad.nbytes + self.variance.nbytes + self.observations.nbytes
+        return {
+            'series': len(self.keys),
+            'group_by': self.group_by,
+            'method': self.method,
+            'threshold': self.threshold,
+            'watermark': str(self.watermark) if self.watermark is not None else None,
+            'rows_ingested': self.rows_ingested,
+            'updates': self.updates,
+            'alerts_kept': len(self.alerts),
+            'state_bytes_per_series': state_bytes // max(len(self.keys), 1)
+        }
+
+
+def detect_anomalies(df: Optional[pd.DataFrame] = None, name: str = 'default', levels: Optional[list] = None,
+                     method: str = 'ewma', threshold: float = DEFAULT_THRESHOLD, days: Optional[int] = 7,
+                     metric: Optional[str] = None, top: Optional[int] = 50, reset: bool = False) -> Dict[str, Any]:
+    """Feed new case rows to a stored detector and report its recent alerts
+
+    Detectors are stored by name, levels, method and threshold, so repeated
+    calls with a growing export only process the days after the watermark.
+    Without df the stored alerts are reported as they are; reset starts over.
+    """
+    group_by = DEFAULT_GROUP_BY if levels is None else [LEVEL_ALIASES.get(level, level) for level in levels]
+    store = get_default_detector_store()
+    params = {'method': method, 'threshold': threshold}
+    detector_id = store.make_model_id('', name, group_by, 'anomaly_detector', params)
+    stored = None if reset else store.get(detector_id)
+    if stored is None:
+        detector = StreamingDetector(group_by, method=method, threshold=threshold)
+        record = ModelRecord(model_id=detector_id, target_column=name, feature_columns=group_by,
+                             data_fingerprint='', model_type='anomaly_detector', params=params)
+    else:
+        detector, record = stored
+    update = detector.update(df) if df is not None else {'days_added': 0, 'rows_used': 0}
+    if df is not None:
+        record.results = detector.describe()
+        store.put(detector, record)
+    alerts = detector.recent_alerts(days=days, metric=metric)
+    return {
+        'detector_id': detector_id,
+        **update,
+        'detector': detector.describe(),
+        'alert_count': len(alerts),
+        'alerts': alerts if top is None else alerts[:top],
+        'truncated': top is not None and len(alerts) > top
+    }
+
+
+_default_store: Optional[ModelRegistry] = None
+
+
+def get_default_detector_store() -> ModelRegistry:
+    """Get the process-wide store of detector states configured from the environment"""
+    global _default_store
+    if _default_store is None:
+        _default_store = ModelRegistry(
+            store_dir=os.getenv("ANOMALY_STORE_DIR", "./kpi_cache/anomaly"),
+            persist=os.getenv("ANOMALY_STORE_PERSIST", "True").lower() == "true"
+        )
+    return _default_store
+
+
+def configure_default_detector_store(**kwargs) -> ModelRegistry:
+    """Replace the process-wide store of detector states, e.g. from tool configuration"""
+    global _default_store
+    _default_store = ModelRegistry(**kwargs)
+    return _default_store
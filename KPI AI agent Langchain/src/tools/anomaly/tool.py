@@ -0,0 +1,57 @@
+"""LangChain tool for streaming anomaly alerts"""
+from langchain.tools import BaseTool
+from langchain.callbacks.manager import CallbackManagerForToolRun
+from typing import Optional
+import json
+import time
+
+from ..data.registry import dataset_registry
+from .core import DEFAULT_THRESHOLD, detect_anomalies
+
+class AnomalyAlertTool(BaseTool):
+    """LangChain tool for anomalies in per-series case volume and resolution time"""
+
+    name = "anomaly_alerts"
+    description = (
+        "Flags days where a series' case volume or mean resolution days deviates from its "
+        "usual level for that weekday. data_json is a dataset handle from data_retrieval or "
+        "JSON records; only days after those already seen are processed, so pass the latest "
+        "export each time (or '' to list alerts without new data). level is a comma-separated "
+        "list of group columns (default 'Call Center,Problem Code Category'; 'total' for all "
+        "cases). days is how many days back to report (7 for 'this week'); metric is "
+        "'volume' or 'resolution_days' (default both); method is 'ewma' (default) or 'mad' "
+        "(more robust for series with frequent outliers). Alerts carry a score in standard "
+        "deviations, strongest first"
+    )
+
+    def _run(
+        self,
+        data_json: str = "",
+        level: Optional[str] = None,
+        days: int = 7,
+        metric: Optional[str] = None,
+        method: str = "ewma",
+        threshold: float = DEFAULT_THRESHOLD,
+        detector: str = "default",
+        max_alerts: int = 50,
+        reset: bool = False,
+        run_manager: Optional[CallbackManagerForToolRun] = None
+    ) -> str:
+        """Ingest new rows and report recent alerts; never cached, as the detector state moves on"""
+        try:
+            start = time.perf_counter()
+            levels = None
+            if level is not None:
+                levels = [] if level.strip() == 'total' else [part.strip() for part in level.split(',') if part.strip()]
+            df = dataset_registry.resolve(data_json) if data_json else None
+            results = detect_anomalies(df, name=detector, levels=levels, method=method, threshold=float(threshold),
+                                       days=int(days) if days else None, metric=metric, top=int(max_alerts),
+                                       reset=reset)
+            results['total_seconds'] = round(time.perf_counter() - start, 4)
+            return json.dumps(results, indent=2, default=str)
+
+        except Exception as e:
+            return f"Anomaly detection failed: {str(e)}"
+
+    async def _arun(self, *args, **kwargs) -> str:
+        return self._run(*args, **kwargs)
@@ -0,0 +1,298 @@
+"""Columnar on-disk cache for parsed CSV data"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+INDEX_FILE = "index.json"
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+@dataclass
+class LoadMetrics:
+    """Timing breakdown for a single data load"""
+    source_path: str
+    source: str = "parse"  # parse or cache
+    rows: int = 0
+    columns: int = 0
+    hash_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    cache_read_seconds: float = 0.0
+    cache_write_seconds: float = 0.0
+    total_seconds: float = 0.0
+    memory_bytes: int = 0
+    rows_scanned: int = 0
+    rows_skipped: int = 0
+    columns_skipped: int = 0
+    bytes_skipped: int = 0
+    encoding: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert metrics to a JSON-serializable dict"""
+        return asdict(self)
+
+
+def file_content_hash(file_path: str) -> str:
+    """Hash file contents in fixed-size blocks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ColumnarCache:
+    """Size-bounded LRU cache of parsed frames stored as Arrow IPC files
+
+    Entries are keyed by source path and loader variant, and are valid while
+    the source file's size and mtime match. When only the mtime changes the
+    content hash is recomputed, so touched-but-unchanged files still hit.
+    Cached files are uncompressed Arrow IPC so reads are memory-mapped.
+    """
+
+    def __init__(self, cache_dir: str = "./kpi_cache/columnar",
+                 max_bytes: int = 1024 * 1024 * 1024,
+                 enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled and self._arrow_available()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0,
+                      'parse_seconds': 0.0, 'cache_read_seconds': 0.0}
+
+    @staticmethod
+    def _arrow_available() -> bool:
+        """Check whether pyarrow is installed"""
+        try:
+            import pyarrow  # noqa: F401
+            return True
+        except ImportError:
+            logger.warning("pyarrow not installed; columnar cache disabled")
+            return False
+
+    @staticmethod
+    def _entry_key(file_path: str, variant: str) -> str:
+        """Build the index key for a source file and loader variant"""
+        return f"{os.path.abspath(file_path)}|{variant}|v{CACHE_FORMAT_VERSION}"
+
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, INDEX_FILE)
+
+    def _load_index(self) -> Dict[str, Any]:
+        """Load cache index from disk"""
+        try:
+            with open(self._index_path(), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'entries': {}}
+
+    def _save_index(self, index: Dict[str, Any]) -> None:
+        """Atomically write cache index to disk"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self._index_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self._index_path())
+
+    def _remove_entry(self, index: Dict[str, Any], key: str) -> None:
+        """Delete an entry and its data file"""
+        entry = index['entries'].pop(key, None)
+        if entry:
+            try:
+                os.remove(os.path.join(self.cache_dir, entry['file']))
+            except FileNotFoundError:
+                pass
+
+    def _validate_entry(self, entry: Dict[str, Any], file_path: str,
+                        metrics: Optional[LoadMetrics]) -> bool:
+        """Check an entry against the current state of its source file"""
+        stat = os.stat(file_path)
+        if entry['size'] != stat.st_size:
+            return False
+        if entry['mtime_ns'] == stat.st_mtime_ns:
+            return True
+        # mtime changed: fall back to the content hash
+        start = time.perf_counter()
+        content_hash = file_content_hash(file_path)
+        if metrics:
+            metrics.hash_seconds += time.perf_counter() - start
+        if content_hash != entry['content_hash']:
+            return False
+        entry['mtime_ns'] = stat.st_mtime_ns
+        return True
+
+    def read_table(self, file_path: str, variant: str = "",
+                   metrics: Optional[LoadMetrics] = None):
+        """Return the cached Arrow table for a file, memory-mapped, or None on a miss"""
+        if not self.enabled:
+            return None
+        key = self._entry_key(file_path, variant)
+        with self._lock:
+            index = self._load_index()
+            entry = index['entries'].get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            data_path = os.path.join(self.cache_dir, entry['file'])
+            if not os.path.exists(data_path) or not self._validate_entry(entry, file_path, metrics):
+                self._remove_entry(index, key)
+                self._save_index(index)
+                self.stats['misses'] += 1
+                self.stats['invalidations'] += 1
+                return None
+            entry['last_access'] = time.time()
+            self._save_index(index)
+
+        from pyarrow import feather
+        self.stats['hits'] += 1
+        if metrics:
+            metrics.source = "cache"
+        return feather.read_table(data_path, memory_map=True)
+
+    def get(self, file_path: str, variant: str = "",
+            metrics: Optional[LoadMetrics] = None) -> Optional[pd.DataFrame]:
+        """Return the cached frame for a file, or None on a miss"""
+        start = time.perf_counter()
+        table = self.read_table(file_path, variant=variant, metrics=metrics)
+        if table is None:
+            return None
+        df = table.to_pandas(split_blocks=True)
+        elapsed = time.perf_counter() - start
+
+        self.stats['cache_read_seconds'] += elapsed
+        if metrics:
+            metrics.cache_read_seconds = elapsed
+        return df
+
+    def put(self, file_path: str, df: pd.DataFrame, variant: str = "",
+            metrics: Optional[LoadMetrics] = None) -> bool:
+        """Store a parsed frame for a file; returns False if it was not cached"""
+        if not self.enabled:
+            return False
+        start = time.perf_counter()
+        stat = os.stat(file_path)
+        hash_start = time.perf_counter()
+        content_hash = file_content_hash(file_path)
+        hash_seconds = time.perf_counter() - hash_start
+
+        key = self._entry_key(file_path, variant)
+        file_name = hashlib.blake2b(f"{key}|{content_hash}".encode(), digest_size=12).hexdigest() + ".arrow"
+        data_path = os.path.join(self.cache_dir, file_name)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        tmp_path = f"{data_path}.{os.getpid()}.tmp"
+        try:
+            from pyarrow import feather
+            feather.write_feather(df.reset_index(drop=True), tmp_path, compression='uncompressed')
+            os.replace(tmp_path, data_path)
+        except Exception as e:
+            # Mixed-type object columns cannot always be represented in Arrow
+            logger.warning(f"Could not cache {file_path}: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+        nbytes = os.path.getsize(data_path)
+        with self._lock:
+            index = self._load_index()
+            old_entry = index['entries'].get(key)
+            if old_entry and old_entry['file'] != file_name:
+                self._remove_entry(index, key)
+            index['entries'][key] = {
+                'source_path': os.path.abspath(file_path),
+                'variant': variant,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'content_hash': content_hash,
+                'file': file_name,
+                'nbytes': nbytes,
+                'last_access': time.time()
+            }
+            self._evict(index, keep=key)
+            self._save_index(index)
+
+        if metrics:
+            metrics.hash_seconds += hash_seconds
+            metrics.cache_write_seconds = time.perf_counter() - start
+        return key in index['entries']
+
+    def _evict(self, index: Dict[str, Any], keep: Optional[str] = None) -> None:
+        """Evict least recently used entries until the cache fits its budget"""
+        entries = index['entries']
+        if keep in entries and entries[keep]['nbytes'] > self.max_bytes:
+            # A single entry larger than the whole budget is never kept
+            self._remove_entry(index, keep)
+            self.stats['evictions'] += 1
+        total = sum(e['nbytes'] for e in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]['last_access']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= entries[key]['nbytes']
+            self._remove_entry(index, key)
+            self.stats['evictions'] += 1
+
+    def invalidate(self, file_path: Optional[str] = None) -> int:
+        """Drop cached entries for a file, or the whole cache if no file is given"""
+        with self._lock:
+            index = self._load_index()
+            if file_path is None:
+                keys = list(index['entries'])
+            else:
+                source = os.path.abspath(file_path)
+                keys = [k for k, e in index['entries'].items() if e['source_path'] == source]
+            for key in keys:
+                self._remove_entry(index, key)
+            self._save_index(index)
+        self.stats['invalidations'] += len(keys)
+        return len(keys)
+
+    def list_entries(self) -> List[Dict[str, Any]]:
+        """Describe cached entries (source path, variant, size)"""
+        with self._lock:
+            index = self._load_index()
+        return [{'source_path': e['source_path'], 'variant': e['variant'], 'nbytes': e['nbytes']}
+                for e in index['entries'].values()]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters and current size"""
+        index = self._load_index()
+        return {
+            **self.stats,
+            'enabled': self.enabled,
+            'entries': len(index['entries']),
+            'size_bytes': sum(e['nbytes'] for e in index['entries'].values()),
+            'max_bytes': self.max_bytes
+        }
+
+
+_default_cache: Optional[ColumnarCache] = None
+
+
+def get_default_cache() -> ColumnarCache:
+    """Get the process-wide cache configured from the environment"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ColumnarCache(
+            cache_dir=os.getenv("DATA_CACHE_DIR", "./kpi_cache/columnar"),
+            max_bytes=int(os.getenv("DATA_CACHE_MAX_MB", "1024")) * 1024 * 1024,
+            enabled=os.getenv("DATA_CACHE_ENABLED", "True").lower() == "true"
+        )
+    return _default_cache
+
+
+def configure_default_cache(**kwargs) -> ColumnarCache:
+    """Replace the process-wide cache, e.g. from tool configuration"""
+    global _default_cache
+    _default_cache = ColumnarCache(**kwargs)
+    return _default_cache
@@ -1,25 +1,243 @@
 """Core data retrieval functionality"""
 import pandas as pd
 import os
-from typing import Dict, Any
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Union
 import json
 
+from .cache import ColumnarCache, LoadMetrics, get_default_cache
+from .dates import CASE_DATE_COLUMNS, RESOLUTION_DAYS_COLUMN
+from .encoding import drop_export_footer, optimize_dtypes
+from .multifile import resolve_paths, concat_frames, deduplicate_cases, CASE_ID_COLUMN, CASE_VERSION_COLUMN
+from .pushdown import normalize_filters, select_from_table, parse_filtered
+from .streaming import stream_summary
+
+# Case exports come out of Power BI as semicolon-delimited Windows-1252 text
+CSV_DELIMITERS = [';', ',', '\t', '|']
+CSV_ENCODINGS = ['utf-8', 'cp1252']
+
+# Bump when parsing changes so stale cache entries are not reused
+CSV_LOADER_VARIANT = "csv-v3"
+
+def _load_csv_worker(file_path: str, cache_config: Optional[Dict[str, Any]], optimize: bool,
+                     columns: Optional[List[str]] = None,
+                     filters: Optional[Dict[str, Any]] = None) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+    """Parse one file in a worker process
+
+    When a full file is cached the worker only populates the cache and the
+    parent memory-maps the result, so frames are not pickled between
+    processes.
+    """
+    cache = ColumnarCache(**cache_config) if cache_config else ColumnarCache(enabled=False)
+    df, metrics = DataRetriever.load_csv_with_metrics(file_path, cache=cache, optimize=optimize,
+                                                      columns=columns, filters=filters)
+    handoff = (cache.enabled and not columns and not filters and
+               cache.read_table(file_path, variant=DataRetriever._variant(optimize)) is not None)
+    return (None if handoff else df), metrics.to_dict()
+
 class DataRetriever:
     """Retrieve data from various sources"""
-    
+
     @staticmethod
-    def load_csv_data(file_path: str) -> pd.DataFrame:
+    def load_csv_data(file_path: str, use_cache: bool = True, optimize: bool = True,
+                      columns: Optional[List[str]] = None,
+                      filters: Optional[Dict[str, Any]] = None,
+                      cache: Optional[ColumnarCache] = None) -> pd.DataFrame:
         """Load data from CSV file"""
+        df, _ = DataRetriever.load_csv_with_metrics(file_path, use_cache=use_cache, cache=cache, optimize=optimize,
+                                                    columns=columns, filters=filters)
+        return df
+
+    @staticmethod
+    def load_csv_with_metrics(file_path: str, use_cache: bool = True,
+                              cache: Optional[ColumnarCache] = None,
+                              optimize: bool = True,
+                              columns: Optional[List[str]] = None,
+                              filters: Optional[Dict[str, Any]] = None) -> Tuple[pd.DataFrame, LoadMetrics]:
+        """Load data from CSV file, serving unchanged files from the columnar cache
+
+        With optimize=True low-cardinality text columns are dictionary-encoded
+        as categoricals, resolved-case counters are downcast to small ints and
+        the dd/mm/yyyy date columns are parsed, adding Resolution Days.
+        columns and filters (see pushdown.py) are applied while reading, so
+        other columns and non-matching rows are never materialized.
+        """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
-        return pd.read_csv(file_path)
-    
+
+        cache = cache or get_default_cache()
+        use_cache = use_cache and cache.enabled
+        variant = DataRetriever._variant(optimize)
+        metrics = LoadMetrics(source_path=file_path)
+        start = time.perf_counter()
+
+        if columns or filters:
+            df = DataRetriever._load_subset(file_path, cache if use_cache else None, variant,
+                                            optimize, columns, normalize_filters(filters), metrics)
+            metrics.rows, metrics.columns = df.shape
+            metrics.memory_bytes = int(df.memory_usage(deep=True).sum())
+            metrics.total_seconds = time.perf_counter() - start
+            return df, metrics
+
+        df = cache.get(file_path, variant=variant, metrics=metrics) if use_cache else None
+        if df is None:
+            parse_start = time.perf_counter()
+            df = drop_export_footer(DataRetriever._parse_csv(file_path))
+            if optimize:
+                df, metrics.encoding = optimize_dtypes(df)
+            metrics.parse_seconds = time.perf_counter() - parse_start
+            cache.stats['parse_seconds'] += metrics.parse_seconds
+            if use_cache:
+                cache.put(file_path, df, variant=variant, metrics=metrics)
+
+        metrics.rows, metrics.columns = df.shape
+        metrics.memory_bytes = int(df.memory_usage(deep=True).sum())
+        metrics.total_seconds = time.perf_counter() - start
+        return df, metrics
+
+    @staticmethod
+    def _load_subset(file_path: str, cache: Optional[ColumnarCache], variant: str, optimize: bool,
+                     columns: Optional[List[str]], filters: Dict[str, Dict[str, Any]],
+                     metrics: LoadMetrics) -> pd.DataFrame:
+        """Load selected columns and matching rows from the cache or the CSV"""
+        read_start = time.perf_counter()
+        table = cache.read_table(file_path, variant=variant, metrics=metrics) if cache else None
+        if table is not None:
+            df = select_from_table(table, columns, filters, metrics)
+            metrics.cache_read_seconds = time.perf_counter() - read_start
+            return df
+
+        # Resolution Days is derived, so read the date columns it comes from
+        parse_columns = columns
+        if columns and RESOLUTION_DAYS_COLUMN in columns:
+            parse_columns = [c for c in columns if c != RESOLUTION_DAYS_COLUMN]
+            parse_columns += [c for c in CASE_DATE_COLUMNS if c not in parse_columns]
+
+        # Partial results are not cached; a full load populates the cache
+        sep = DataRetriever._detect_delimiter(file_path)
+        for encoding in CSV_ENCODINGS:
+            try:
+                df = parse_filtered(file_path, parse_columns, filters, metrics, sep=sep, encoding=encoding)
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            raise ValueError(f"Unsupported file encoding: {file_path}")
+        if optimize:
+            df, metrics.encoding = optimize_dtypes(df)
+        if columns:
+            df = df[list(columns)]
+        metrics.parse_seconds = time.perf_counter() - read_start
+        return df
+
+    @staticmethod
+    def _variant(optimize: bool) -> str:
+        """Cache variant for the loader options"""
+        return CSV_LOADER_VARIANT if optimize else f"{CSV_LOADER_VARIANT}-raw"
+
+    @staticmethod
+    def load_csv_files(paths: Union[str, List[str]], max_workers: Optional[int] = None,
+                       deduplicate: bool = True, use_cache: bool = True,
+                       cache: Optional[ColumnarCache] = None,
+                       optimize: bool = True,
+                       columns: Optional[List[str]] = None,
+                       filters: Optional[Dict[str, Any]] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Load several exports (glob or list) in parallel and combine them
+
+        Files are parsed in a process pool, concatenated on a shared category
+        vocabulary and, with deduplicate=True, reduced to one row per
+        Case Number keeping the latest Completion Date.
+        """
+        start = time.perf_counter()
+        file_paths = resolve_paths(paths)
+        cache = cache or get_default_cache()
+        workers = min(max_workers or os.cpu_count() or 1, len(file_paths))
+
+        # Deduplication needs the case id and version even if not requested
+        load_columns = columns
+        if columns and deduplicate:
+            load_columns = list(columns) + [c for c in (CASE_ID_COLUMN, CASE_VERSION_COLUMN) if c not in columns]
+
+        if workers <= 1:
+            results = [DataRetriever.load_csv_with_metrics(p, use_cache=use_cache, cache=cache, optimize=optimize,
+                                                           columns=load_columns, filters=filters)
+                       for p in file_paths]
+            frames = [df for df, _ in results]
+            file_metrics = [m.to_dict() for _, m in results]
+        else:
+            cache_config = None
+            if use_cache and cache.enabled:
+                cache_config = {'cache_dir': cache.cache_dir, 'max_bytes': cache.max_bytes}
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_load_csv_worker, file_paths,
+                                            [cache_config] * len(file_paths),
+                                            [optimize] * len(file_paths),
+                                            [load_columns] * len(file_paths),
+                                            [filters] * len(file_paths)))
+            frames = [df if df is not None else
+                      DataRetriever.load_csv_data(p, use_cache=use_cache, optimize=optimize, cache=cache)
+                      for p, (df, _) in zip(file_paths, results)]
+            file_metrics = [m for _, m in results]
+
+        combined = concat_frames(frames)
+        rows_before = len(combined)
+        if deduplicate:
+            combined = deduplicate_cases(combined)
+            if columns:
+                combined = combined[list(columns)]
+
+        return combined, {
+            'files': file_metrics,
+            'workers': workers,
+            'rows_before_dedup': rows_before,
+            'rows': len(combined),
+            'duplicates_removed': rows_before - len(combined),
+            'total_seconds': time.perf_counter() - start
+        }
+
+    @staticmethod
+    def summarize_csv_streaming(file_path: str, max_memory_mb: Optional[float] = None,
+                                chunk_rows: Optional[int] = None) -> Dict[str, Any]:
+        """Summarize a CSV file in bounded-size chunks without loading it whole"""
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        sep = DataRetriever._detect_delimiter(file_path)
+        for encoding in CSV_ENCODINGS:
+            try:
+                return stream_summary(file_path, max_memory_mb=max_memory_mb, chunk_rows=chunk_rows,
+                                      sep=sep, encoding=encoding)
+            except UnicodeDecodeError:
+                continue
+        raise ValueError(f"Unsupported file encoding: {file_path}")
+
+    @staticmethod
+    def _parse_csv(file_path: str, **kwargs) -> pd.DataFrame:
+        """Parse a CSV file, detecting its delimiter and encoding"""
+        sep = kwargs.pop('sep', None) or DataRetriever._detect_delimiter(file_path)
+        for encoding in CSV_ENCODINGS:
+            try:
+                return pd.read_csv(file_path, sep=sep, encoding=encoding, **kwargs)
+            except UnicodeDecodeError:
+                continue
+        raise ValueError(f"Unsupported file encoding: {file_path}")
+
+    @staticmethod
+    def _detect_delimiter(file_path: str) -> str:
+        """Detect the delimiter from the header line"""
+        with open(file_path, 'rb') as f:
+            header = f.readline().decode('latin-1')
+        counts = {sep: header.count(sep) for sep in CSV_DELIMITERS}
+        best = max(counts, key=counts.get)
+        return best if counts[best] > 0 else ','
+
     @staticmethod
     def load_json_data(json_string: str) -> pd.DataFrame:
         """Load data from JSON string"""
         data = json.loads(json_string)
         return pd.DataFrame(data)
-    
+
     @staticmethod
     def get_data_summary(df: pd.DataFrame) -> Dict[str, Any]:
         """Get summary of data"""
@@ -27,6 +245,6 @@ class DataRetriever:
             'shape': df.shape,
             'columns': list(df.columns),
             'numeric_columns': list(df.select_dtypes(include=['number']).columns),
-            'categorical_columns': list(df.select_dtypes(include=['object']).columns),
+            'categorical_columns': list(df.select_dtypes(include=['object', 'category']).columns),
             'missing_values': df.isnull().sum().to_dict()
         }
\ No newline at end of file
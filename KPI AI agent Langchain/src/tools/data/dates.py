@@ -0,0 +1,113 @@
+"""Fixed-format date parsing and calendar dimension for case data"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+CASE_DATE_FORMAT = '%d/%m/%Y'
+CASE_CREATED_COLUMN = 'Case Created On Date'
+CASE_COMPLETED_COLUMN = 'Completion Date'
+CASE_DATE_COLUMNS = [CASE_CREATED_COLUMN, CASE_COMPLETED_COLUMN]
+RESOLUTION_DAYS_COLUMN = 'Resolution Days'
+
+# A quarter has a few hundred distinct dates, so the mapping stays small
+MAX_CACHED_DATES = 100000
+
+_date_cache: Dict[str, np.datetime64] = {}
+_date_cache_lock = threading.Lock()
+_NAT = np.datetime64('NaT', 'ns')
+
+
+def _parse_unique(values: List[str], date_format: str) -> np.ndarray:
+    """Parse distinct date strings, reusing previously parsed values"""
+    with _date_cache_lock:
+        cached = [_date_cache.get(v) for v in values]
+    missing = [v for v, parsed in zip(values, cached) if parsed is None]
+    if missing:
+        parsed = pd.to_datetime(missing, format=date_format,
+                                errors='coerce').values.astype('datetime64[ns]')
+        new = dict(zip(missing, parsed))
+        with _date_cache_lock:
+            if len(_date_cache) + len(new) > MAX_CACHED_DATES:
+                _date_cache.clear()
+            _date_cache.update(new)
+        cached = [new[v] if c is None else c for v, c in zip(values, cached)]
+    return np.array(cached, dtype='datetime64[ns]')
+
+
+def to_datetime_array(series: pd.Series, date_format: str = CASE_DATE_FORMAT) -> np.ndarray:
+    """Parse dd/mm/yyyy values to a datetime64 array
+
+    Each distinct string is parsed once with an explicit format and the
+    result expanded through integer codes, so day and month are never
+    swapped by inference.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.values.astype('datetime64[ns]')
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.values
+        uniques = [str(v) for v in series.cat.categories]
+    else:
+        codes, uniques = pd.factorize(series)
+        uniques = [str(v) for v in uniques]
+    # Code -1 (missing) picks the trailing NaT
+    values = np.append(_parse_unique(uniques, date_format), _NAT)
+    return values[codes]
+
+
+def parse_case_dates(df: pd.DataFrame, columns: Optional[List[str]] = None,
+                     add_resolution_days: bool = True) -> Tuple[pd.DataFrame, List[str]]:
+    """Convert known date columns to datetime64 and derive resolution time"""
+    parsed = []
+    for col in CASE_DATE_COLUMNS if columns is None else columns:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = to_datetime_array(df[col])
+            parsed.append(col)
+    if (add_resolution_days and RESOLUTION_DAYS_COLUMN not in df.columns and
+            CASE_CREATED_COLUMN in df.columns and CASE_COMPLETED_COLUMN in df.columns):
+        delta = df[CASE_COMPLETED_COLUMN] - df[CASE_CREATED_COLUMN]
+        df[RESOLUTION_DAYS_COLUMN] = (delta / np.timedelta64(1, 'D')).astype('float32')
+    return df, parsed
+
+
+_calendar_cache: Dict[Tuple[np.datetime64, np.datetime64], pd.DataFrame] = {}
+
+
+def build_calendar_dimension(start, end) -> pd.DataFrame:
+    """Calendar attributes for every day between start and end, indexed by date
+
+    Join on a parsed date column (or use .loc with its values) to group by
+    week, month, quarter or business day without recomputing them per row.
+    """
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    key = (start.to_datetime64(), end.to_datetime64())
+    if key in _calendar_cache:
+        return _calendar_cache[key]
+
+    days = pd.date_range(start, end, freq='D', name='date')
+    iso = days.isocalendar()
+    calendar = pd.DataFrame({
+        'year': days.year.astype('int16'),
+        'quarter': days.quarter.astype('int8'),
+        'month': days.month.astype('int8'),
+        'iso_week': iso['week'].values.astype('int8'),
+        'day_of_week': days.dayofweek.astype('int8'),
+        'is_business_day': days.dayofweek < 5,
+        'week_start': days - pd.to_timedelta(days.dayofweek, unit='D'),
+        'month_start': days.to_period('M').to_timestamp(),
+        'quarter_label': days.to_period('Q').astype(str)
+    }, index=days)
+    # Business-day ordinal, e.g. for business-day resolution times
+    calendar['business_day_number'] = np.cumsum(calendar['is_business_day'].values).astype('int32')
+    _calendar_cache[key] = calendar
+    return calendar
+
+
+def calendar_for(df: pd.DataFrame, column: str = CASE_CREATED_COLUMN) -> pd.DataFrame:
+    """Calendar dimension covering the dates in a column"""
+    dates = to_datetime_array(df[column])
+    dates = dates[~np.isnat(dates)]
+    if len(dates) == 0:
+        return build_calendar_dimension(pd.Timestamp.today(), pd.Timestamp.today()).iloc[:0]
+    return build_calendar_dimension(dates.min(), dates.max())
@@ -0,0 +1,82 @@
+"""Compact in-memory representation for case data"""
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+
+from .dates import parse_case_dates
+
+# Low-cardinality descriptive fields of the case exports
+CASE_CATEGORICAL_COLUMNS = [
+    'Geo Hierarchy - Geo',
+    'Geo Hierarchy - Country',
+    'Call Center',
+    'Agent Name',
+    'Case Status',
+    'Agreement Type',
+    'Problem Code Category',
+    'Product Family',
+    'Origin'
+]
+
+CASE_COUNTER_COLUMNS = [
+    '# of TSC Break Fix Resolved Cases',
+    '# of Service Fix Resolved Cases'
+]
+
+# Power BI appends a grand total row and the applied filters after the data
+EXPORT_FOOTER_MARKERS = ('Total', 'Applied filters')
+
+# Other text columns are encoded when at most this share of values is distinct
+MAX_UNIQUE_RATIO = 0.5
+
+
+def drop_export_footer(df: pd.DataFrame) -> pd.DataFrame:
+    """Remove trailing Power BI total, blank and filter rows from an export"""
+    if df.empty or df.columns[0] not in CASE_CATEGORICAL_COLUMNS:
+        return df
+    end = len(df)
+    while end > 0:
+        row = df.iloc[end - 1]
+        is_marker = str(row.iloc[0]).startswith(EXPORT_FOOTER_MARKERS) and row.iloc[1:].isnull().any()
+        if not (is_marker or row.isnull().all()):
+            break
+        end -= 1
+    return df.iloc[:end] if end < len(df) else df
+
+
+def optimize_dtypes(df: pd.DataFrame, categorical_columns: Optional[List[str]] = None,
+                    max_unique_ratio: float = MAX_UNIQUE_RATIO,
+                    parse_dates: bool = True) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Dictionary-encode low-cardinality text columns and downcast counters
+
+    With parse_dates=True the case date columns become datetime64 and a
+    numeric resolution time in days is added.
+    """
+    memory_before = int(df.memory_usage(deep=True).sum())
+    known = CASE_CATEGORICAL_COLUMNS if categorical_columns is None else categorical_columns
+    encoded, downcast = [], []
+    df = df.copy()
+    date_columns = parse_case_dates(df)[1] if parse_dates else []
+
+    for col in df.columns:
+        series = df[col]
+        if col in CASE_COUNTER_COLUMNS:
+            numeric = pd.to_numeric(series, errors='coerce')
+            if numeric.isnull().sum() == series.isnull().sum():
+                kind = 'integer' if numeric.notnull().all() else 'float'
+                df[col] = pd.to_numeric(numeric, downcast=kind)
+                downcast.append(col)
+        elif series.dtype == object:
+            if col in known or (len(series) > 0 and series.nunique() <= max_unique_ratio * len(series)):
+                df[col] = series.astype('category')
+                encoded.append(col)
+
+    memory_after = int(df.memory_usage(deep=True).sum())
+    return df, {
+        'memory_before_bytes': memory_before,
+        'memory_after_bytes': memory_after,
+        'reduction_pct': round(100 * (1 - memory_after / memory_before), 1) if memory_before else 0.0,
+        'categorical_columns': encoded,
+        'downcast_columns': downcast,
+        'date_columns': date_columns
+    }
@@ -0,0 +1,225 @@
+"""Incremental tail ingestion for append-only case exports"""
+import hashlib
+import io
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from .dates import parse_case_dates, to_datetime_array
+from .encoding import drop_export_footer, optimize_dtypes
+from .multifile import concat_frames
+
+# Bytes just before the last offset that must be unchanged for an append
+ANCHOR_BYTES = 64 * 1024
+
+
+def _hash_bytes(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@dataclass
+class TailState:
+    """What has been ingested from one file so far"""
+    file_path: str
+    df: pd.DataFrame
+    sep: str
+    encoding: str
+    header: bytes
+    offset: int
+    rows: int
+    anchor_hash: str
+    full_loads: int = 0
+    appends: int = 0
+    aggregates: Dict[str, Any] = field(default_factory=dict)
+
+
+class IncrementalIngestor:
+    """Re-reads only the rows appended to a file since the last refresh
+
+    For each file the ingestor remembers the byte offset after the last
+    complete line and the number of rows parsed. On refresh the header and
+    the bytes just before that offset are hashed and compared; if they still
+    match, only the new tail is parsed and appended to the in-memory frame
+    and to any registered aggregates. If the file shrank or its prefix
+    changed, the file is reloaded in full.
+    """
+
+    def __init__(self, optimize: bool = True, anchor_bytes: int = ANCHOR_BYTES):
+        self.optimize = optimize
+        self.anchor_bytes = anchor_bytes
+        self._states: Dict[str, TailState] = {}
+        self._factories: Dict[str, Dict[str, Callable[[], Any]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return os.path.abspath(file_path)
+
+    def register_aggregate(self, file_path: str, name: str, factory: Callable[[], Any]) -> Any:
+        """Keep an aggregate up to date with a file
+
+        factory() must return an object with an update(chunk) method, such as
+        StreamingSummary. It is fed the full frame on a full load and only the
+        appended rows afterwards.
+        """
+        key = self._key(file_path)
+        with self._lock:
+            self._factories.setdefault(key, {})[name] = factory
+            state = self._states.get(key)
+            if state is None:
+                return None
+            aggregate = factory()
+            aggregate.update(state.df)
+            state.aggregates[name] = aggregate
+            return aggregate
+
+    def get_aggregate(self, file_path: str, name: str) -> Any:
+        """Get the current value of a registered aggregate"""
+        state = self._states.get(self._key(file_path))
+        return state.aggregates.get(name) if state else None
+
+    def refresh(self, file_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Bring the frame for a file up to date, parsing only appended rows"""
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        start = time.perf_counter()
+        key = self._key(file_path)
+        with self._lock:
+            state = self._states.get(key)
+            reason = self._check_prefix(state) if state else "first load"
+            if reason:
+                state, bytes_read, rows_appended = self._full_load(file_path, key)
+                mode = "full"
+            else:
+                bytes_read, rows_appended = self._append_tail(state)
+                mode = "append" if rows_appended else "unchanged"
+
+        return state.df, {
+            'mode': mode,
+            'reason': reason,
+            'rows': state.rows,
+            'rows_appended': rows_appended,
+            'bytes_read': bytes_read,
+            'offset': state.offset,
+            'full_loads': state.full_loads,
+            'appends': state.appends,
+            'total_seconds': time.perf_counter() - start
+        }
+
+    def _check_prefix(self, state: TailState) -> Optional[str]:
+        """Return why a full reload is needed, or None if the file was only appended to"""
+        if os.path.getsize(state.file_path) < state.offset:
+            return "file truncated"
+        with open(state.file_path, 'rb') as f:
+            if f.read(len(state.header)) != state.header:
+                return "header changed"
+            anchor_start = max(len(state.header), state.offset - self.anchor_bytes)
+            f.seek(anchor_start)
+            if _hash_bytes(f.read(state.offset - anchor_start)) != state.anchor_hash:
+                return "prefix changed"
+        return None
+
+    def _anchor_hash(self, data: bytes, header_len: int) -> str:
+        """Hash the bytes just before the end of the ingested region"""
+        return _hash_bytes(data[max(header_len, len(data) - self.anchor_bytes):])
+
+    def _parse(self, data: bytes, sep: str, encoding: str) -> pd.DataFrame:
+        return drop_export_footer(pd.read_csv(io.BytesIO(data), sep=sep, encoding=encoding))
+
+    def _full_load(self, file_path: str, key: str) -> Tuple[TailState, int, int]:
+        """Parse the whole file up to its last complete line"""
+        from .core import CSV_ENCODINGS, DataRetriever
+
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        # A line still being written is picked up by the next refresh
+        data = data[:data.rfind(b'\n') + 1]
+        header = data[:data.find(b'\n') + 1]
+        sep = DataRetriever._detect_delimiter(file_path)
+
+        for encoding in CSV_ENCODINGS:
+            try:
+                df = self._parse(data, sep, encoding)
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            raise ValueError(f"Unsupported file encoding: {file_path}")
+        if self.optimize:
+            df, _ = optimize_dtypes(df)
+
+        previous = self._states.get(key)
+        state = TailState(file_path=file_path, df=df, sep=sep, encoding=encoding, header=header,
+                          offset=len(data), rows=len(df), anchor_hash=self._anchor_hash(data, len(header)),
+                          full_loads=(previous.full_loads if previous else 0) + 1,
+                          appends=previous.appends if previous else 0)
+        for name, factory in self._factories.get(key, {}).items():
+            aggregate = factory()
+            aggregate.update(df)
+            state.aggregates[name] = aggregate
+        self._states[key] = state
+        return state, len(data), len(df)
+
+    def _append_tail(self, state: TailState) -> Tuple[int, int]:
+        """Parse complete lines written after the stored offset and append them"""
+        with open(state.file_path, 'rb') as f:
+            f.seek(state.offset)
+            tail = f.read()
+        tail = tail[:tail.rfind(b'\n') + 1]
+        if not tail:
+            return 0, 0
+
+        new_rows = self._parse(state.header + tail, state.sep, state.encoding)
+        if self.optimize:
+            new_rows, _ = parse_case_dates(new_rows)
+        new_rows = self._conform(new_rows, state.df)
+        state.df = concat_frames([state.df, new_rows])
+        for aggregate in state.aggregates.values():
+            aggregate.update(new_rows)
+
+        # Keep the anchor window aligned with the new offset
+        with open(state.file_path, 'rb') as f:
+            end = state.offset + len(tail)
+            anchor_start = max(len(state.header), end - self.anchor_bytes)
+            f.seek(anchor_start)
+            state.anchor_hash = _hash_bytes(f.read(end - anchor_start))
+        state.offset += len(tail)
+        state.rows += len(new_rows)
+        state.appends += 1
+        return len(tail), len(new_rows)
+
+    @staticmethod
+    def _conform(new_rows: pd.DataFrame, base: pd.DataFrame) -> pd.DataFrame:
+        """Match the appended rows to the existing column dtypes where lossless"""
+        for col in new_rows.columns:
+            dtype = base[col].dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                values = new_rows[col]
+                if values.dtype != dtype.categories.dtype:
+                    # e.g. a column that is empty in the tail parses as float
+                    values = values.astype(dtype.categories.dtype if values.isnull().all() else object)
+                new_rows[col] = values.astype('category')
+            elif pd.api.types.is_datetime64_any_dtype(dtype):
+                new_rows[col] = to_datetime_array(new_rows[col])
+            elif pd.api.types.is_numeric_dtype(dtype) and new_rows[col].dtype != dtype:
+                values = pd.to_numeric(new_rows[col], errors='coerce')
+                if values.notnull().all() and (values.astype(dtype) == values).all():
+                    values = values.astype(dtype)
+                new_rows[col] = values
+        return new_rows
+
+    def forget(self, file_path: Optional[str] = None) -> None:
+        """Drop ingestion state for a file, or for all files"""
+        with self._lock:
+            if file_path is None:
+                self._states.clear()
+            else:
+                self._states.pop(self._key(file_path), None)
+
+
+incremental_ingestor = IncrementalIngestor()
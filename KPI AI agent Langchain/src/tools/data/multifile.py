@@ -0,0 +1,69 @@
+"""Helpers for loading and combining several case exports"""
+import glob
+import os
+from typing import List, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .dates import to_datetime_array
+
+CASE_ID_COLUMN = 'Case Number'
+CASE_VERSION_COLUMN = 'Completion Date'
+
+
+def resolve_paths(paths: Union[str, List[str]]) -> List[str]:
+    """Expand a glob pattern or list of paths/patterns into existing files"""
+    patterns = [paths] if isinstance(paths, str) else list(paths)
+    resolved = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"File not found: {path}")
+            if path not in resolved:
+                resolved.append(path)
+    if not resolved:
+        raise FileNotFoundError(f"No files matched: {paths}")
+    return resolved
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate frames, keeping categorical columns categorical
+
+    Each file carries its own category vocabulary; recoding every frame onto
+    the union vocabulary first lets concat stitch the integer codes together
+    instead of falling back to object columns.
+    """
+    if len(frames) == 1:
+        return frames[0]
+    # Shallow copies, so recoding a column leaves the caller's frames untouched
+    frames = [f.copy(deep=False) for f in frames]
+    columns = frames[0].columns
+    for col in columns:
+        if all(col in f.columns and isinstance(f[col].dtype, pd.CategoricalDtype) for f in frames):
+            categories = union_categoricals([f[col] for f in frames], ignore_order=True).categories
+            for f in frames:
+                if not f[col].cat.categories.equals(categories):
+                    f[col] = f[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True, copy=False)
+
+
+def deduplicate_cases(df: pd.DataFrame, id_column: str = CASE_ID_COLUMN,
+                      version_column: str = CASE_VERSION_COLUMN) -> pd.DataFrame:
+    """Keep one row per case, preferring the latest completion date"""
+    if id_column not in df.columns:
+        return df
+    if version_column in df.columns:
+        versions = to_datetime_array(df[version_column])
+        # NaT sorts first, so undated rows lose to dated ones; ties keep file order
+        order = np.argsort(versions.view('int64'), kind='stable')
+    else:
+        order = np.arange(len(df))
+    ids = df[id_column].take(order)
+    keep = ~ids.duplicated(keep='last').values | ids.isnull().values
+    positions = np.sort(order[keep])
+    if len(positions) == len(df):
+        return df
+    return df.take(positions).reset_index(drop=True)
@@ -0,0 +1,162 @@
+"""Projection and predicate pushdown for case data loads
+
+Filters are a dict keyed by column name. A scalar or list value keeps rows
+equal to one of the values; a dict with ``from``/``to`` keeps rows inside an
+inclusive range. Ranges on the case date columns take dd/mm/yyyy or ISO
+dates, e.g.::
+
+    {'Geo Hierarchy - Geo': 'North America',
+     'Call Center': ['Call Center : Rabat CA'],
+     'Case Created On Date': {'from': '01/01/2025', 'to': '31/01/2025'}}
+"""
+import os
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .cache import LoadMetrics
+from .encoding import drop_export_footer
+from .dates import CASE_DATE_COLUMNS, CASE_DATE_FORMAT, to_datetime_array
+
+PUSHDOWN_CHUNK_ROWS = 100000
+
+
+def _parse_bound(value: Any, is_date: bool) -> Any:
+    """Parse a range bound for comparison against column values"""
+    if value is None:
+        return None
+    if is_date:
+        try:
+            return np.datetime64(pd.to_datetime(value, format=CASE_DATE_FORMAT), 'ns')
+        except (ValueError, TypeError):
+            return np.datetime64(pd.to_datetime(value), 'ns')
+    return float(value)
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]],
+                      date_columns: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Normalize a filter spec into {'in': [...]} or {'from', 'to'} conditions"""
+    date_columns = CASE_DATE_COLUMNS if date_columns is None else date_columns
+    normalized = {}
+    for col, cond in (filters or {}).items():
+        if isinstance(cond, dict):
+            is_date = col in date_columns
+            normalized[col] = {
+                'from': _parse_bound(cond.get('from', cond.get('min')), is_date),
+                'to': _parse_bound(cond.get('to', cond.get('max')), is_date),
+                'is_date': is_date
+            }
+        elif isinstance(cond, (list, tuple, set)):
+            normalized[col] = {'in': list(cond)}
+        else:
+            normalized[col] = {'in': [cond]}
+    return normalized
+
+
+def _isin(series: pd.Series, values: List[Any]) -> np.ndarray:
+    """Equality match that compares numbers as numbers, however the column was parsed
+
+    On a fresh parse, counter columns are still text when the export's total
+    row (e.g. "6 837") made them so; the cached table has them as ints.
+    """
+    numbers = [v for v in values if isinstance(v, (int, float, np.number)) and not isinstance(v, bool)]
+    if pd.api.types.is_numeric_dtype(series):
+        coerced = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').dropna()
+        return series.isin(coerced.tolist()).values
+    mask = series.isin(values).values
+    if numbers:
+        mask |= pd.to_numeric(series.astype(object), errors='coerce').isin(numbers).values
+    return mask
+
+
+def build_mask(df: pd.DataFrame, filters: Dict[str, Dict[str, Any]]) -> np.ndarray:
+    """Evaluate normalized filters against a frame"""
+    mask = np.ones(len(df), dtype=bool)
+    for col, cond in filters.items():
+        series = df[col]
+        if 'in' in cond:
+            mask &= _isin(series, cond['in'])
+            continue
+        if cond['is_date']:
+            values = to_datetime_array(series)
+        else:
+            values = pd.to_numeric(series, errors='coerce').values
+        # NaN/NaT never satisfy a range
+        if cond['from'] is not None:
+            mask &= values >= cond['from']
+        if cond['to'] is not None:
+            mask &= values <= cond['to']
+    return mask
+
+
+def _check_columns(available: List[str], wanted: List[str]) -> None:
+    missing = [col for col in wanted if col not in available]
+    if missing:
+        raise ValueError(f"Unknown columns: {missing}")
+
+
+def select_from_table(table, columns: Optional[List[str]], filters: Dict[str, Dict[str, Any]],
+                      metrics: LoadMetrics) -> pd.DataFrame:
+    """Apply projection and filters to a memory-mapped Arrow table
+
+    Only the filter columns are converted to evaluate the predicate; the
+    projected columns are filtered in Arrow before conversion, so skipped
+    rows and columns are never materialized in pandas.
+    """
+    import pyarrow as pa
+
+    names = table.column_names
+    columns = columns or names
+    _check_columns(names, list(columns) + list(filters))
+
+    projected = table.select(columns)
+    if filters:
+        mask = build_mask(table.select(list(filters)).to_pandas(), filters)
+        projected = projected.filter(pa.array(mask))
+
+    metrics.rows_scanned = table.num_rows
+    metrics.rows_skipped = table.num_rows - projected.num_rows
+    metrics.columns_skipped = len(names) - len(columns)
+    metrics.bytes_skipped = int(table.nbytes - projected.nbytes)
+    return projected.to_pandas(split_blocks=True)
+
+
+def select_from_frame(df: pd.DataFrame, columns: Optional[List[str]],
+                      filters: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """Apply projection and filters to a frame that is already in memory"""
+    columns = list(columns or df.columns)
+    _check_columns(list(df.columns), columns + list(filters))
+    if filters:
+        return df.loc[build_mask(df, filters), columns].reset_index(drop=True)
+    return df[columns]
+
+
+def parse_filtered(file_path: str, columns: Optional[List[str]], filters: Dict[str, Dict[str, Any]],
+                   metrics: LoadMetrics, chunk_rows: int = PUSHDOWN_CHUNK_ROWS,
+                   **read_kwargs) -> pd.DataFrame:
+    """Parse only the needed columns and keep matching rows chunk by chunk
+
+    Skipped bytes are estimated from the row and column shares of the file.
+    """
+    header = list(pd.read_csv(file_path, nrows=0, **read_kwargs).columns)
+    columns = list(columns or header)
+    _check_columns(header, columns + list(filters))
+
+    # The first column marks Power BI footer rows, so it is always read
+    needed = [col for col in header if col in columns or col in filters or col == header[0]]
+    kept, rows_scanned = [], 0
+    for chunk in pd.read_csv(file_path, usecols=needed, chunksize=chunk_rows, **read_kwargs):
+        chunk = drop_export_footer(chunk[needed])
+        rows_scanned += len(chunk)
+        if filters:
+            chunk = chunk[build_mask(chunk, filters)]
+        kept.append(chunk[columns])
+
+    df = pd.concat(kept, ignore_index=True) if kept else pd.DataFrame(columns=columns)
+    metrics.rows_scanned = rows_scanned
+    metrics.rows_skipped = rows_scanned - len(df)
+    metrics.columns_skipped = len(header) - len(columns)
+    row_share = len(df) / rows_scanned if rows_scanned else 0.0
+    metrics.bytes_skipped = int(os.path.getsize(file_path) * (1 - row_share * len(columns) / len(header)))
+    return df
@@ -0,0 +1,122 @@
+"""In-process registry of loaded datasets shared between tools"""
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+HANDLE_PREFIX = "ds:"
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """Hash a frame's schema and contents"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+@dataclass
+class DatasetEntry:
+    """A registered dataset and its metadata"""
+    handle: str
+    df: pd.DataFrame
+    source: str = ""
+    created_at: datetime = field(default_factory=datetime.now)
+    fingerprint: Optional[str] = None
+
+    def get_fingerprint(self) -> str:
+        """Content fingerprint, computed on first use"""
+        if self.fingerprint is None:
+            self.fingerprint = dataframe_fingerprint(self.df)
+        return self.fingerprint
+
+    def describe(self) -> Dict[str, Any]:
+        """Short description suitable for tool output"""
+        return {
+            'handle': self.handle,
+            'source': self.source,
+            'shape': self.df.shape,
+            'columns': list(self.df.columns),
+            'created_at': self.created_at.isoformat()
+        }
+
+
+class DatasetRegistry:
+    """Keeps loaded DataFrames in memory and hands out short handles
+
+    Tools receive a handle such as ``ds:cases_Q4_2024`` instead of the rows
+    themselves and all operate on the same DataFrame object, so callers must
+    treat registered frames as read-only.
+    """
+
+    def __init__(self, max_datasets: int = 16):
+        self.max_datasets = max_datasets
+        self._entries: "OrderedDict[str, DatasetEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_handle(value: Any) -> bool:
+        """Check whether a value looks like a dataset handle"""
+        return isinstance(value, str) and value.strip().startswith(HANDLE_PREFIX)
+
+    @staticmethod
+    def make_handle(name: str) -> str:
+        """Normalize a dataset name into a handle"""
+        slug = re.sub(r'[^A-Za-z0-9_]+', '_', name).strip('_') or "dataset"
+        return f"{HANDLE_PREFIX}{slug}"
+
+    def register(self, df: pd.DataFrame, name: str, source: str = "",
+                 fingerprint: Optional[str] = None) -> str:
+        """Register a frame under a name, replacing any previous version"""
+        handle = self.make_handle(name)
+        with self._lock:
+            self._entries.pop(handle, None)
+            self._entries[handle] = DatasetEntry(handle=handle, df=df, source=source,
+                                                 fingerprint=fingerprint)
+            while len(self._entries) > self.max_datasets:
+                self._entries.popitem(last=False)
+        return handle
+
+    def get_entry(self, handle: str) -> DatasetEntry:
+        """Get the registry entry for a handle"""
+        handle = handle.strip()
+        with self._lock:
+            if handle not in self._entries:
+                available = ", ".join(self._entries) or "none"
+                raise KeyError(f"Unknown dataset handle: {handle} (available: {available})")
+            self._entries.move_to_end(handle)
+            return self._entries[handle]
+
+    def get(self, handle: str) -> pd.DataFrame:
+        """Get the DataFrame registered under a handle"""
+        return self.get_entry(handle).df
+
+    def resolve(self, data_ref: str) -> pd.DataFrame:
+        """Resolve a dataset handle or a JSON records string to a DataFrame"""
+        if self.is_handle(data_ref):
+            return self.get(data_ref)
+        return pd.DataFrame(json.loads(data_ref))
+
+    def remove(self, handle: str) -> bool:
+        """Drop a dataset from the registry"""
+        with self._lock:
+            return self._entries.pop(handle.strip(), None) is not None
+
+    def list_datasets(self) -> List[Dict[str, Any]]:
+        """Describe all registered datasets"""
+        with self._lock:
+            return [entry.describe() for entry in self._entries.values()]
+
+    def clear(self):
+        """Remove all datasets"""
+        with self._lock:
+            self._entries.clear()
+
+
+dataset_registry = DatasetRegistry()
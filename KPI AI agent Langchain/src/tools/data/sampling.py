@@ -0,0 +1,198 @@
+"""Bounded-size samples and sketches of datasets for LLM context"""
+import json
+import os
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Rough tokenizer-free estimate; JSON records of case data average ~4 chars per token
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = int(os.getenv("DATA_SAMPLE_TOKEN_BUDGET", "3000"))
+MIN_SAMPLE_ROWS = 5
+SKETCH_TOP_K = 5
+SKETCH_QUANTILES = [0.0, 0.05, 0.25, 0.5, 0.75, 0.95, 1.0]
+DEFAULT_STRATA = ['Geo Hierarchy - Geo', 'Call Center']
+# The sketch may use at most this share of the budget; the rest goes to rows
+MAX_SKETCH_SHARE = 0.6
+
+
+def estimate_tokens(value: Any) -> int:
+    """Estimate the tokens needed to show a value as JSON"""
+    return len(json.dumps(value, default=str)) // CHARS_PER_TOKEN + 1
+
+
+def _records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert rows to JSON-friendly records with None for missing values"""
+    return df.astype(object).where(df.notnull(), None).to_dict(orient='records')
+
+
+def allocate_proportional(counts: np.ndarray, n: int) -> np.ndarray:
+    """Split n sample rows across strata in proportion to their sizes
+
+    Every stratum gets at least one row when n allows it, and the rest is
+    shared by largest remainder so the total is exactly min(n, counts.sum()).
+    """
+    total = int(counts.sum())
+    n = min(n, total)
+    alloc = np.zeros(len(counts), dtype=np.int64)
+    if n == 0:
+        return alloc
+    if n >= len(counts):
+        alloc[:] = np.minimum(1, counts)
+    remaining = n - alloc.sum()
+    capacity = counts - alloc
+    if remaining > 0 and capacity.sum() > 0:
+        share = remaining * capacity / capacity.sum()
+        extra = np.minimum(np.floor(share).astype(np.int64), capacity)
+        left = remaining - extra.sum()
+        if left > 0:
+            # Largest remainders first, skipping full strata
+            order = np.argsort(-(share - extra), kind='stable')
+            order = order[extra[order] < capacity[order]][:left]
+            extra[order] += 1
+        alloc += extra
+    return alloc
+
+
+def stratified_sample(df: pd.DataFrame, n: int, strata: Optional[List[str]] = None,
+                      seed: int = 0) -> pd.DataFrame:
+    """Sample n rows with every stratum represented in proportion to its size"""
+    strata = [col for col in (strata or DEFAULT_STRATA) if col in df.columns]
+    if n >= len(df):
+        return df
+    rng = np.random.default_rng(seed)
+    if not strata:
+        return df.iloc[np.sort(rng.choice(len(df), size=n, replace=False))]
+
+    groups = df.groupby(strata, observed=True, dropna=False, sort=False).ngroup().values
+    counts = np.bincount(groups)
+    alloc = allocate_proportional(counts, n)
+
+    # Random order within each stratum, then keep the first alloc[g] rows
+    order = np.lexsort((rng.random(len(df)), groups))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    ranks = np.arange(len(df)) - starts[groups[order]]
+    keep = order[ranks < alloc[groups[order]]]
+    return df.iloc[np.sort(keep)]
+
+
+class ReservoirSample:
+    """Uniform sample of fixed size over a stream of chunks
+
+    Each row gets a random key and the rows with the smallest keys are kept,
+    which gives the same distribution as classic reservoir sampling while
+    processing whole chunks at once.
+    """
+
+    def __init__(self, size: int, seed: int = 0):
+        self.size = size
+        self.rows_seen = 0
+        self._rng = np.random.default_rng(seed)
+        self._sample: Optional[pd.DataFrame] = None
+        self._keys = np.empty(0)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Fold one chunk into the sample"""
+        keys = self._rng.random(len(chunk))
+        chunk = chunk.reset_index(drop=True)
+        chunk.index = pd.RangeIndex(self.rows_seen, self.rows_seen + len(chunk))
+        self.rows_seen += len(chunk)
+        if self._sample is not None:
+            chunk = pd.concat([self._sample, chunk])
+            keys = np.concatenate([self._keys, keys])
+        if len(chunk) > self.size:
+            keep = np.argpartition(keys, self.size)[:self.size]
+            chunk, keys = chunk.iloc[keep], keys[keep]
+        self._sample, self._keys = chunk, keys
+
+    def to_frame(self) -> pd.DataFrame:
+        """Sampled rows in their original order"""
+        if self._sample is None:
+            return pd.DataFrame()
+        return self._sample.sort_index()
+
+
+def build_sketch(df: pd.DataFrame, top_k: int = SKETCH_TOP_K) -> Dict[str, Any]:
+    """Compact per-column description: heavy hitters, quantiles and distinct counts"""
+    sketch = {}
+    for col in df.columns:
+        series = df[col]
+        info = {'missing': int(series.isnull().sum()), 'distinct': int(series.nunique())}
+        if pd.api.types.is_bool_dtype(series) or not (
+                pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series)):
+            counts = series.value_counts()
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                counts = counts[counts > 0]
+            top = counts.head(top_k)
+            info['top'] = [[str(value), int(count)] for value, count in top.items()]
+            info['top_share'] = round(float(top.sum() / len(series)), 3) if len(series) else 0.0
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            info['min'], info['max'] = series.min(), series.max()
+        else:
+            values = series.dropna()
+            if len(values):
+                quantiles = np.quantile(values.astype('float64'), SKETCH_QUANTILES)
+                info['quantiles'] = {str(q): round(float(v), 4) for q, v in zip(SKETCH_QUANTILES, quantiles)}
+                info['mean'] = round(float(values.mean()), 4)
+        sketch[col] = info
+    return sketch
+
+
+def shrink_sketch(sketch: Dict[str, Any], top_k: int) -> Dict[str, Any]:
+    """Keep fewer heavy hitters and only min/median/max quantiles"""
+    shrunk = {}
+    for col, info in sketch.items():
+        info = dict(info)
+        if 'top' in info:
+            info['top'] = info['top'][:top_k]
+        if 'quantiles' in info:
+            info['quantiles'] = {q: v for q, v in info['quantiles'].items() if q in ('0.0', '0.5', '1.0')}
+        shrunk[col] = info
+    return shrunk
+
+
+def represent(df: pd.DataFrame, token_budget: int = DEFAULT_TOKEN_BUDGET,
+              strata: Optional[List[str]] = None, seed: int = 0) -> Dict[str, Any]:
+    """Describe a frame within a token budget: a sketch plus as many sample rows as fit
+
+    Small frames are returned whole. Otherwise the sketch is built first,
+    shrunk if it takes too much of the budget, and the rest is spent on a
+    stratified sample sized from the measured per-row token cost. At least
+    MIN_SAMPLE_ROWS rows are returned, so very small budgets can be exceeded.
+    """
+    probe = _records(df.head(20))
+    row_tokens = max(1.0, estimate_tokens(probe) / max(1, len(probe)))
+    if row_tokens * len(df) <= token_budget:
+        records = _records(df)
+        return {'data': records, 'sampling': {'method': 'all', 'rows': len(df), 'total_rows': len(df),
+                                              'estimated_tokens': estimate_tokens(records)}}
+
+    sketch = build_sketch(df)
+    for top_k in (3, 1):
+        if estimate_tokens(sketch) <= MAX_SKETCH_SHARE * token_budget:
+            break
+        sketch = shrink_sketch(sketch, top_k)
+    sketch_tokens = estimate_tokens(sketch)
+    n = max(MIN_SAMPLE_ROWS, int((token_budget - sketch_tokens) / row_tokens))
+
+    records = _records(stratified_sample(df, n, strata=strata, seed=seed))
+    sample_tokens = estimate_tokens(records)
+    if sketch_tokens + sample_tokens > token_budget and n > MIN_SAMPLE_ROWS:
+        # The probe rows were shorter than the sampled ones; scale down once
+        n = max(MIN_SAMPLE_ROWS, int(n * (token_budget - sketch_tokens) / sample_tokens))
+        records = _records(stratified_sample(df, n, strata=strata, seed=seed))
+        sample_tokens = estimate_tokens(records)
+    used_strata = [col for col in (strata or DEFAULT_STRATA) if col in df.columns]
+    return {
+        'data': records,
+        'sketch': sketch,
+        'sampling': {
+            'method': 'stratified' if used_strata else 'uniform',
+            'strata': used_strata,
+            'rows': len(records),
+            'total_rows': len(df),
+            'token_budget': token_budget,
+            'estimated_tokens': sample_tokens + sketch_tokens
+        }
+    }
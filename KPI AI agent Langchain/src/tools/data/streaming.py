@@ -0,0 +1,133 @@
+"""Streaming chunked ingestion with one-pass summaries"""
+import os
+import sys
+import time
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+from .sampling import ReservoirSample
+
+DEFAULT_STREAM_MAX_MB = 256
+SAMPLE_ROWS = 1000
+MIN_CHUNK_ROWS = 100
+# read_csv holds tokenizer buffers alongside the chunk it is building
+PARSER_OVERHEAD = 2.0
+
+_KIND_NAMES = {'b': 'bool', 'i': 'int64', 'u': 'uint64', 'f': 'float64',
+               'M': 'datetime64[ns]', 'O': 'object'}
+
+
+def get_peak_rss_mb() -> Optional[float]:
+    """Get the process peak resident set size in MB, if the platform reports it"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return peak / divisor
+
+
+class StreamingSummary:
+    """Data summary accumulated one chunk at a time in constant memory"""
+
+    def __init__(self):
+        self.rows = 0
+        self.columns: List[str] = []
+        self.kinds: Dict[str, str] = {}
+        self.missing: Dict[str, int] = {}
+        self.chunks = 0
+        self.peak_chunk_bytes = 0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Fold one chunk into the summary"""
+        if not self.columns:
+            self.columns = list(chunk.columns)
+            self.missing = {col: 0 for col in self.columns}
+
+        self.rows += len(chunk)
+        self.chunks += 1
+        self.peak_chunk_bytes = max(self.peak_chunk_bytes, int(chunk.memory_usage(deep=True).sum()))
+
+        for col, count in chunk.isnull().sum().items():
+            self.missing[col] += int(count)
+
+        for col, dtype in chunk.dtypes.items():
+            # An all-missing chunk carries no type information
+            if chunk[col].isnull().all():
+                continue
+            kind = dtype.kind if dtype.kind in 'biufM' else 'O'
+            previous = self.kinds.get(col)
+            if previous is None:
+                self.kinds[col] = kind
+            elif previous != kind:
+                # Numbers widen to float; any other mix ends up as object
+                if previous in 'iuf' and kind in 'iuf':
+                    self.kinds[col] = 'f' if 'f' in (previous, kind) else previous
+                else:
+                    self.kinds[col] = 'O'
+
+    def _kind(self, col: str) -> str:
+        """Final dtype kind for a column, matching a full read"""
+        kind = self.kinds.get(col, 'f')
+        if self.missing[col] > 0:
+            if kind in 'iu':
+                return 'f'
+            if kind == 'b':
+                return 'O'
+        return kind
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the DataRetriever.get_data_summary schema"""
+        kinds = {col: self._kind(col) for col in self.columns}
+        return {
+            'shape': (self.rows, len(self.columns)),
+            'columns': list(self.columns),
+            'numeric_columns': [col for col in self.columns if kinds[col] in 'iuf'],
+            'categorical_columns': [col for col in self.columns if kinds[col] == 'O'],
+            'missing_values': dict(self.missing),
+            'dtypes': {col: _KIND_NAMES[kinds[col]] for col in self.columns}
+        }
+
+
+def estimate_chunk_rows(file_path: str, max_memory_mb: float, **read_kwargs) -> int:
+    """Pick a chunk size that keeps a parsed chunk within the memory budget"""
+    sample = pd.read_csv(file_path, nrows=SAMPLE_ROWS, **read_kwargs)
+    if sample.empty:
+        return MIN_CHUNK_ROWS
+    bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+    budget = max_memory_mb * 1024 * 1024 / PARSER_OVERHEAD
+    return max(MIN_CHUNK_ROWS, int(budget / bytes_per_row))
+
+
+def stream_summary(file_path: str, max_memory_mb: Optional[float] = None,
+                   chunk_rows: Optional[int] = None, preview_rows: int = 10,
+                   **read_kwargs) -> Dict[str, Any]:
+    """Summarize a CSV file by streaming it in bounded-size chunks"""
+    max_memory_mb = max_memory_mb or float(os.getenv("DATA_STREAM_MAX_MB", DEFAULT_STREAM_MAX_MB))
+    chunk_rows = chunk_rows or estimate_chunk_rows(file_path, max_memory_mb, **read_kwargs)
+
+    start = time.perf_counter()
+    summary = StreamingSummary()
+    # A uniform sample over the whole file rather than its first rows
+    sample = ReservoirSample(preview_rows)
+    for chunk in pd.read_csv(file_path, chunksize=chunk_rows, **read_kwargs):
+        summary.update(chunk)
+        sample.update(chunk)
+
+    peak_chunk_mb = summary.peak_chunk_bytes / (1024 * 1024)
+    return {
+        'summary': summary.to_dict(),
+        'preview': sample.to_frame() if sample.rows_seen else pd.DataFrame(columns=summary.columns),
+        'stream_metrics': {
+            'chunks': summary.chunks,
+            'chunk_rows': chunk_rows,
+            'max_memory_mb': max_memory_mb,
+            'peak_chunk_mb': round(peak_chunk_mb, 3),
+            'peak_rss_mb': get_peak_rss_mb(),
+            'within_budget': peak_chunk_mb * PARSER_OVERHEAD <= max_memory_mb,
+            'seconds': time.perf_counter() - start
+        }
+    }
@@ -1,53 +1,122 @@
 """LangChain tool for data retrieval"""
 from langchain.tools import BaseTool
 from langchain.callbacks.manager import CallbackManagerForToolRun
+from typing import Any, Dict, List, Optional
+import glob
 import pandas as pd
 import json
 import os
 
 from .core import DataRetriever
+from .incremental import incremental_ingestor
+from .pushdown import normalize_filters, select_from_frame
+from .registry import dataset_registry
+from .sampling import DEFAULT_TOKEN_BUDGET, estimate_tokens, represent
+
+# Tokens taken by the sampling block and the keys around the rows and sketch
+SAMPLING_INFO_TOKENS = 60
+
+
+def _describe(df: pd.DataFrame, handle: str, token_budget: int, **extra: Any) -> str:
+    """Dataset handle, sample and sketch, with the summary and metrics counted in the token budget"""
+    extra_tokens = estimate_tokens({'dataset': handle, **extra}) + SAMPLING_INFO_TOKENS
+    result = represent(df, token_budget=max(0, token_budget - extra_tokens))
+    result['sampling'].update(token_budget=token_budget,
+                              estimated_tokens=result['sampling']['estimated_tokens'] + extra_tokens)
+    # Compact, like estimate_tokens measures it; indentation would add ~50% to a sample
+    return json.dumps({'dataset': handle, **result, **extra}, default=str)
+
 
 class DataRetrievalTool(BaseTool):
     """LangChain tool for data retrieval"""
     
     name = "data_retrieval"
-    description = "Retrieves data from CSV files or JSON input"
+    description = (
+        "Retrieves data from CSV files or JSON input and returns a dataset handle "
+        "(e.g. 'ds:cases_Q4_2024') to pass to other tools instead of the rows. "
+        "file_path may be a glob (e.g. 'data/cases_*.csv') or pass file_paths to "
+        "combine several quarterly exports, de-duplicated by Case Number. "
+        "Pass columns and filters (equality, e.g. {'Geo Hierarchy - Country': 'Canada'}, "
+        "or date ranges, e.g. {'Case Created On Date': {'from': '01/01/2025', 'to': '31/01/2025'}}) "
+        "to load only what the question needs. "
+        "Use source_type='datasets' to list loaded handles. "
+        "Rows are returned as a stratified sample plus per-column sketches sized to a "
+        "token budget, never the full dataset. "
+        "Set streaming=True to summarize very large CSV files in bounded memory. "
+        "Set incremental=True for a file that is still being appended to, so "
+        "refreshes only read the new rows."
+    )
+    token_budget: int = DEFAULT_TOKEN_BUDGET
     
     def _run(
         self,
         source_type: str = "csv",
         file_path: str = None,
-        json_ str = None,
+        file_paths: Optional[List[str]] = None,
+        json_data: str = None,
+        dataset_name: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        streaming: bool = False,
+        incremental: bool = False,
+        max_memory_mb: Optional[float] = None,
+        token_budget: Optional[int] = None,
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
         """Retrieve data"""
+        token_budget = token_budget or self.token_budget
         try:
-            if source_type == "csv":
+            if source_type == "csv" and (file_paths or (file_path and glob.has_magic(file_path))):
+                df, load_metrics = DataRetriever.load_csv_files(file_paths or file_path, columns=columns, filters=filters)
+                default_name = "cases_combined_subset" if columns or filters else "cases_combined"
+                handle = dataset_registry.register(df, dataset_name or default_name,
+                                                   source=", ".join(f['source_path'] for f in load_metrics['files']))
+                return _describe(df, handle, token_budget, summary=DataRetriever.get_data_summary(df),
+                                 load_metrics=load_metrics)
+                
+            elif source_type == "csv":
                 if not file_path:
                     return "File path required for CSV source"
                 if not os.path.exists(file_path):
                     return f"File not found: {file_path}"
                 
-                df = DataRetriever.load_csv_data(file_path)
-                summary = DataRetriever.get_data_summary(df)
-                return json.dumps({
-                    'data': df.head(10).to_dict(orient='records'),
-                    'summary': summary
-                }, indent=2, default=str)
+                if streaming:
+                    result = DataRetriever.summarize_csv_streaming(file_path, max_memory_mb=max_memory_mb)
+                    return json.dumps({
+                        'data': result['preview'].to_dict(orient='records'),
+                        'summary': result['summary'],
+                        'stream_metrics': result['stream_metrics']
+                    }, indent=2, default=str)
+                
+                name = dataset_name or os.path.splitext(os.path.basename(file_path))[0]
+                if incremental:
+                    # The whole file stays in memory for the next refresh; select from it afterwards
+                    df, load_metrics = incremental_ingestor.refresh(file_path)
+                    if columns or filters:
+                        df = select_from_frame(df, columns, normalize_filters(filters))
+                        load_metrics['rows_selected'] = len(df)
+                else:
+                    df, metrics = DataRetriever.load_csv_with_metrics(file_path, columns=columns, filters=filters)
+                    load_metrics = metrics.to_dict()
+                if not dataset_name and (columns or filters):
+                    name = f"{name}_subset"
+                handle = dataset_registry.register(df, name, source=file_path)
+                return _describe(df, handle, token_budget, summary=DataRetriever.get_data_summary(df),
+                                 load_metrics=load_metrics)
                 
             elif source_type == "json":
-                if not json_
+                if not json_data:
                     return "JSON data required for JSON source"
                 
                 df = DataRetriever.load_json_data(json_data)
-                summary = DataRetriever.get_data_summary(df)
-                return json.dumps({
-                    'data': df.to_dict(orient='records'),
-                    'summary': summary
-                }, indent=2, default=str)
+                handle = dataset_registry.register(df, dataset_name or "json_data", source="json")
+                return _describe(df, handle, token_budget, summary=DataRetriever.get_data_summary(df))
+                
+            elif source_type == "datasets":
+                return json.dumps(dataset_registry.list_datasets(), indent=2, default=str)
                 
             else:
-                return "Unsupported source type. Use 'csv' or 'json'"
+                return "Unsupported source type. Use 'csv', 'json' or 'datasets'"
                 
         except Exception as e:
             return f"Data retrieval failed: {str(e)}"
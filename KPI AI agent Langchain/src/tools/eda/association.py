@@ -0,0 +1,226 @@
+"""Association matrices over mixed numeric and categorical columns"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+NUMERIC_METHODS = ('pearson', 'spearman')
+# Columns with more distinct values than this (case numbers, serials) carry no association signal
+MAX_CATEGORIES = 500
+# Columns per block for the numeric cross-products; bounds memory at 4 * rows * BLOCK_COLUMNS floats
+BLOCK_COLUMNS = 64
+
+
+def encode_columns(df: pd.DataFrame, max_categories: int = MAX_CATEGORIES
+                   ) -> Tuple[Dict[str, np.ndarray], Dict[str, Tuple[np.ndarray, int]], Dict[str, str]]:
+    """Split columns into float arrays and integer codes
+
+    Returns numeric arrays (NaN for missing), categorical (codes, size)
+    pairs (-1 for missing) and the reason each remaining column was skipped.
+    """
+    numeric, categorical, skipped = {}, {}, {}
+    for col, dtype in df.dtypes.items():
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            values = series.to_numpy(dtype='float64', na_value=np.nan)
+            present = values[~np.isnan(values)]
+            if len(present) > 1 and present.min() < present.max():
+                numeric[col] = values
+            else:
+                skipped[col] = 'constant'
+        elif dtype == object or isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype):
+            if isinstance(dtype, pd.CategoricalDtype):
+                codes, size = series.cat.codes.to_numpy().astype(np.int64), len(series.cat.categories)
+            else:
+                codes, uniques = pd.factorize(series)
+                size = len(uniques)
+            if size > max_categories:
+                skipped[col] = 'too many categories'
+            elif len(np.unique(codes[codes >= 0])) < 2:
+                skipped[col] = 'constant'
+            else:
+                categorical[col] = (codes, size)
+        else:
+            skipped[col] = 'unsupported type'
+    return numeric, categorical, skipped
+
+
+def _rank(values: np.ndarray) -> np.ndarray:
+    """Average ranks of the non-missing values, NaN elsewhere"""
+    ranks = np.full(len(values), np.nan)
+    valid = ~np.isnan(values)
+    ranks[valid] = pd.Series(values[valid]).rank(method='average').to_numpy()
+    return ranks
+
+
+def correlation_matrix(columns: List[np.ndarray], block: int = BLOCK_COLUMNS) -> np.ndarray:
+    """Pairwise-complete Pearson correlations, one block of columns at a time
+
+    With M the non-missing indicators and X the centred values (0 where
+    missing), every pair's complete-case sums are entries of M'M, X'M,
+    (X*X)'M and X'X, so each block pair costs a few matrix products instead
+    of a Python loop over column pairs.
+    """
+    p = len(columns)
+    result = np.full((p, p), np.nan)
+    if p == 0:
+        return result
+
+    def prepare(cols):
+        values = np.column_stack(cols)
+        mask = ~np.isnan(values)
+        # Centring first keeps the sums small and the subtraction below stable
+        values = np.where(mask, values - np.nanmean(values, axis=0), 0.0)
+        return values, mask.astype(np.float64)
+
+    starts = range(0, p, block)
+    for i in starts:
+        xi, mi = prepare(columns[i:i + block])
+        for j in starts:
+            if j < i:
+                continue
+            xj, mj = (xi, mi) if j == i else prepare(columns[j:j + block])
+            n = mi.T @ mj
+            sx, sy = xi.T @ mj, mi.T @ xj
+            sxx, syy = (xi * xi).T @ mj, mi.T @ (xj * xj)
+            sxy = xi.T @ xj
+            with np.errstate(invalid='ignore', divide='ignore'):
+                corr = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+            corr[n < 2] = np.nan
+            corr = np.clip(corr, -1.0, 1.0)
+            result[i:i + len(corr), j:j + corr.shape[1]] = corr
+            result[j:j + corr.shape[1], i:i + len(corr)] = corr.T
+    np.fill_diagonal(result, 1.0)
+    return result
+
+
+def cramers_v(a: np.ndarray, size_a: int, b: np.ndarray, size_b: int) -> float:
+    """Cramér's V from the contingency table of two code arrays"""
+    valid = (a >= 0) & (b >= 0)
+    n = int(valid.sum())
+    if n == 0:
+        return np.nan
+    table = np.bincount(a[valid] * size_b + b[valid], minlength=size_a * size_b).reshape(size_a, size_b)
+    rows, cols = table.sum(axis=1), table.sum(axis=0)
+    table = table[rows > 0][:, cols > 0]
+    rows, cols = rows[rows > 0], cols[cols > 0]
+    k = min(len(rows), len(cols))
+    if k < 2:
+        return np.nan
+    # chi2 / n = sum(O^2 / (row * col)) - 1
+    phi2 = float((table * table / np.outer(rows, cols)).sum()) - 1.0
+    return float(np.sqrt(max(phi2, 0.0) / (k - 1)))
+
+
+def correlation_ratio(codes: np.ndarray, size: int, values: np.ndarray) -> float:
+    """Correlation ratio (eta) of a numeric column given a categorical one"""
+    valid = (codes >= 0) & ~np.isnan(values)
+    if valid.sum() < 2:
+        return np.nan
+    codes, values = codes[valid], values[valid]
+    counts = np.bincount(codes, minlength=size)
+    sums = np.bincount(codes, weights=values, minlength=size)
+    present = counts > 0
+    mean = values.mean()
+    between = float((np.square(sums[present] / counts[present] - mean) * counts[present]).sum())
+    total = float(np.square(values - mean).sum())
+    return float(np.sqrt(between / total)) if total > 0 else np.nan
+
+
+def association_matrix(df: pd.DataFrame, method: str = 'pearson',
+                       max_categories: int = MAX_CATEGORIES, block: int = BLOCK_COLUMNS) -> Dict[str, Any]:
+    """Association between every pair of usable columns on a 0-1 (or -1 to 1) scale
+
+    Numeric pairs use Pearson or Spearman correlation, categorical pairs
+    Cramér's V and mixed pairs the correlation ratio. Missing values are
+    dropped pair by pair; for Spearman, ranks are taken over each column's
+    non-missing values.
+    """
+    if method not in NUMERIC_METHODS:
+        raise ValueError(f"Unknown method: {method}. Use one of {list(NUMERIC_METHODS)}")
+    start = time.perf_counter()
+    numeric, categorical, skipped = encode_columns(df, max_categories=max_categories)
+    numeric_cols, categorical_cols = list(numeric), list(categorical)
+    columns = numeric_cols + categorical_cols
+    matrix = np.full((len(columns), len(columns)), np.nan)
+
+    arrays = [numeric[col] for col in numeric_cols]
+    if method == 'spearman':
+        arrays = [_rank(values) for values in arrays]
+    p = len(numeric_cols)
+    matrix[:p, :p] = correlation_matrix(arrays, block=block)
+
+    for i, col in enumerate(categorical_cols):
+        codes, size = categorical[col]
+        for j, other in enumerate(categorical_cols[i:], start=i):
+            value = 1.0 if i == j else cramers_v(codes, size, *categorical[other])
+            matrix[p + i, p + j] = matrix[p + j, p + i] = value
+        for k, num in enumerate(numeric_cols):
+            matrix[p + i, k] = matrix[k, p + i] = correlation_ratio(codes, size, numeric[num])
+
+    frame = pd.DataFrame(matrix, index=columns, columns=columns).round(6)
+    frame = frame.astype(object).where(frame.notnull(), None)
+    return {
+        'method': method,
+        'measures': {
+            'numeric-numeric': method,
+            'categorical-categorical': 'cramers_v',
+            'categorical-numeric': 'correlation_ratio'
+        },
+        'columns': {'numeric': numeric_cols, 'categorical': categorical_cols},
+        'skipped': skipped,
+        'matrix': frame.to_dict(),
+        'seconds': round(time.perf_counter() - start, 4)
+    }
+
+
+def strongest_pairs(result: Dict[str, Any], top: int = 10) -> List[Dict[str, Any]]:
+    """The most strongly associated distinct column pairs of a result"""
+    matrix = result['matrix']
+    columns = list(matrix)
+    pairs = []
+    for i, a in enumerate(columns):
+        for b in columns[i + 1:]:
+            value = matrix[a][b]
+            if value is not None:
+                pairs.append({'columns': [a, b], 'value': value})
+    return sorted(pairs, key=lambda pair: abs(pair['value']), reverse=True)[:top]
+
+
+class AssociationStore:
+    """Keeps computed association matrices per dataset version and method"""
+
+    def __init__(self, max_results: int = 16):
+        self.max_results = max_results
+        self._results: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'builds': 0, 'hits': 0}
+
+    def get_or_compute(self, fingerprint: str, df: pd.DataFrame,
+                       method: str = 'pearson') -> Tuple[Dict[str, Any], bool]:
+        """Return the association matrix for a dataset version, computing it on first use"""
+        key = (fingerprint, method)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.stats['hits'] += 1
+                return self._results[key], False
+
+        result = association_matrix(df, method=method)
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+            self.stats['builds'] += 1
+        return result, True
+
+    def clear(self):
+        """Drop all results"""
+        with self._lock:
+            self._results.clear()
+
+
+association_store = AssociationStore()
@@ -1,41 +1,52 @@
 """Core EDA functionality"""
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import json
-from typing import Dict, Any
-import io
-import base64
+from typing import Dict, Any, List, Optional
+
+from .association import association_store
+from .profiler import profile_summary
+from .profiles import APPROX_CHUNK_ROWS, build_profile, diff_profiles, get_default_profile_store, \
+    merge_profiles
+from .sketches import ApproxProfile
+from ..data.registry import dataframe_fingerprint
 
 class EDAProcessor:
     """Process exploratory data analysis"""
     
     @staticmethod
-    def generate_summary_stats(df: pd.DataFrame) -> Dict[str, Any]:
-        """Generate comprehensive summary statistics"""
-        numeric_cols = df.select_dtypes(include=['number']).columns
-        categorical_cols = df.select_dtypes(include=['object']).columns
-        
-        summary = {
-            'shape': df.shape,
-            'numeric_summary': {},
-            'categorical_summary': {},
-            'missing_data': df.isnull().sum().to_dict(),
-            'data_types': df.dtypes.to_dict()
-        }
+    def generate_summary_stats(df: pd.DataFrame, workers: Optional[int] = None) -> Dict[str, Any]:
+        """Generate comprehensive summary statistics
         
-        # Numeric columns summary
-        if len(numeric_cols) > 0:
-            summary['numeric_summary'] = df[numeric_cols].describe().to_dict()
-        
-        # Categorical columns summary
-        for col in categorical_cols:
-            summary['categorical_summary'][col] = {
-                'unique_count': df[col].nunique(),
-                'top_values': df[col].value_counts().head(5).to_dict()
-            }
+        Numeric columns get describe() statistics, text and dictionary-encoded
+        columns their distinct count and top values; see profiler.py.
+        """
+        return profile_summary(df, workers=workers)
+    
+    @staticmethod
+    def generate_summary_stats_approx(df: pd.DataFrame, chunk_rows: int = APPROX_CHUNK_ROWS) -> Dict[str, Any]:
+        """Generate summary statistics from mergeable sketches
         
-        return summary
+        The frame is profiled chunk by chunk with constant memory per column;
+        distinct counts, quartiles and top values are approximate and the
+        result carries their error bounds. See sketches.py.
+        """
+        return build_profile(df, chunk_rows=chunk_rows).to_summary()
+    
+    @staticmethod
+    def profile_dataset(df: pd.DataFrame, fingerprint: Optional[str] = None) -> ApproxProfile:
+        """Get the mergeable profile of a dataset, from the profile cache when possible"""
+        fingerprint = fingerprint or dataframe_fingerprint(df)
+        profile, _ = get_default_profile_store().get_or_build(fingerprint, df)
+        return profile
+    
+    @staticmethod
+    def combine_profiles(profiles: List[ApproxProfile]) -> ApproxProfile:
+        """Merge profiles of several datasets, e.g. two quarterly exports"""
+        return merge_profiles(profiles)
+    
+    @staticmethod
+    def compare_profiles(base: ApproxProfile, other: ApproxProfile) -> Dict[str, Any]:
+        """Distribution shift, category and missing-rate changes from base to other"""
+        return diff_profiles(base, other)
     
     @staticmethod
     def generate_correlation_matrix(df: pd.DataFrame) -> Dict[str, Any]:
@@ -44,4 +55,17 @@ class EDAProcessor:
         if len(numeric_df.columns) > 1:
             corr_matrix = numeric_df.corr().to_dict()
             return corr_matrix
-        return {}
\ No newline at end of file
+        return {}
+    
+    @staticmethod
+    def generate_association_matrix(df: pd.DataFrame, method: str = "pearson",
+                                    fingerprint: Optional[str] = None) -> Dict[str, Any]:
+        """Generate associations between numeric and categorical columns
+        
+        Pearson or Spearman for numeric pairs, Cramér's V for categorical
+        pairs and the correlation ratio for mixed pairs; see association.py.
+        Results are cached per dataset fingerprint and method.
+        """
+        fingerprint = fingerprint or dataframe_fingerprint(df)
+        result, computed = association_store.get_or_compute(fingerprint, df, method=method)
+        return {**result, 'cached': not computed}
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""Fused single-pass column profiling for summary statistics"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DESCRIBE_PERCENTILES = [0.25, 0.5, 0.75]
+TOP_VALUES = 5
+# Below this many cells a thread pool costs more than it saves
+PARALLEL_MIN_CELLS = 1_000_000
+
+
+def _describe_numeric(series: pd.Series) -> Tuple[int, Dict[str, float]]:
+    """describe() statistics and the missing count from one pass over the values
+
+    The order statistics come from a single np.partition call for all of
+    min, the quartiles and max, instead of a full sort or one selection each.
+    """
+    values = series.to_numpy(dtype='float64', na_value=np.nan)
+    missing_mask = np.isnan(values)
+    missing = int(missing_mask.sum())
+    if missing:
+        values = values[~missing_mask]
+    n = len(values)
+    stats = {'count': float(n)}
+    if n == 0:
+        stats.update({key: np.nan for key in ['mean', 'std', 'min', '25%', '50%', '75%', 'max']})
+        return missing, stats
+
+    # Moments are accumulated in float64 and, like describe(), reported at the column's float width
+    result_type = series.dtype.type if series.dtype.kind == 'f' else np.float64
+    mean = values.sum() / n
+    stats['mean'] = float(result_type(mean))
+    stats['std'] = float(result_type(np.sqrt(np.square(values - mean).sum() / (n - 1)))) if n > 1 else np.nan
+
+    # Linear interpolation between the neighbouring order statistics, as in describe()
+    positions = np.array(DESCRIBE_PERCENTILES) * (n - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, n - 1)
+    kth = np.unique(np.concatenate(([0, n - 1], lower, upper)))
+    ordered = np.partition(values, kth) if n > 1 else values
+    stats['min'] = float(ordered[0])
+    for pct, pos, lo, hi in zip(DESCRIBE_PERCENTILES, positions, lower, upper):
+        stats[f"{pct:.0%}"] = float(ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo))
+    stats['max'] = float(ordered[n - 1])
+    return missing, {key: stats[key] for key in ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']}
+
+
+def _describe_categorical(series: pd.Series, top: int) -> Tuple[int, Dict[str, Any]]:
+    """Distinct count, top values and missing count from one factorization"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        labels = series.cat.categories
+    else:
+        codes, labels = pd.factorize(series)
+    present = codes >= 0
+    missing = int(len(codes) - present.sum())
+    counts = np.bincount(codes[present], minlength=len(labels))
+
+    # Same ordering as value_counts(): first-seen (or category) order, sorted by count
+    ranked = pd.Series(counts, index=labels, copy=False).sort_values(ascending=False)
+    return missing, {
+        'unique_count': int((counts > 0).sum()),
+        'top_values': ranked.head(top).to_dict()
+    }
+
+
+def _profile_column(series: pd.Series, kind: str, top: int) -> Tuple[int, Optional[Dict[str, Any]]]:
+    if kind == 'numeric':
+        return _describe_numeric(series)
+    if kind == 'categorical':
+        return _describe_categorical(series, top)
+    return int(series.isnull().sum()), None
+
+
+def profile_summary(df: pd.DataFrame, workers: Optional[int] = None, top: int = TOP_VALUES) -> Dict[str, Any]:
+    """Summary statistics in the EDAProcessor.generate_summary_stats schema
+
+    Each column is visited once and yields its missing count together with
+    either its describe() statistics or its distinct count and top values.
+    Columns are profiled on a thread pool when the frame is large; the
+    numpy kernels release the GIL, so this scales with cores.
+    """
+    kinds = {}
+    for col, dtype in df.dtypes.items():
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            kinds[col] = 'numeric'
+        elif dtype == object or isinstance(dtype, pd.CategoricalDtype):
+            kinds[col] = 'categorical'
+        else:
+            kinds[col] = 'other'
+
+    columns = list(df.columns)
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(columns)) if df.size >= PARALLEL_MIN_CELLS else 1
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda col: _profile_column(df[col], kinds[col], top), columns))
+    else:
+        results = [_profile_column(df[col], kinds[col], top) for col in columns]
+
+    summary = {
+        'shape': df.shape,
+        'numeric_summary': {},
+        'categorical_summary': {},
+        'missing_data': {col: missing for col, (missing, _) in zip(columns, results)},
+        'data_types': df.dtypes.to_dict()
+    }
+    for col, (_, stats) in zip(columns, results):
+        if kinds[col] == 'numeric':
+            summary['numeric_summary'][col] = stats
+        elif kinds[col] == 'categorical':
+            summary['categorical_summary'][col] = stats
+    return summary
@@ -0,0 +1,270 @@
+"""Persistent dataset profiles and quarter-over-quarter profile diffs"""
+import copy
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .sketches import ApproxProfile, TOP_VALUES
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FORMAT_VERSION = 2
+APPROX_CHUNK_ROWS = 250_000
+SHIFT_QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+# New and disappeared values listed per column; the counts are always complete
+MAX_LISTED_VALUES = 20
+# Columns with at least this many distinct values per non-missing row are IDs and list none
+ID_LIKE_SHARE = 0.9
+
+
+def build_profile(df: pd.DataFrame, chunk_rows: int = APPROX_CHUNK_ROWS) -> ApproxProfile:
+    """Profile a frame chunk by chunk"""
+    chunks = (df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows))
+    return ApproxProfile.from_chunks(chunks)
+
+
+def merge_profiles(profiles: Iterable[ApproxProfile]) -> ApproxProfile:
+    """Combine profiles of several datasets without touching their rows
+
+    The inputs are left unchanged, so cached profiles can be merged freely.
+    """
+    profiles = list(profiles)
+    if not profiles:
+        raise ValueError("No profiles to merge")
+    merged = copy.deepcopy(profiles[0])
+    for profile in profiles[1:]:
+        merged.merge(profile)
+    return merged
+
+
+def _rate(count: int, total: int) -> Optional[float]:
+    return round(count / total, 6) if total else None
+
+
+def _numeric_shift(base: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    """Moment and quantile changes plus a Kolmogorov-Smirnov statistic from the KLL sketches"""
+    base_moments, other_moments = base['moments'], other['moments']
+    base_kll, other_kll = base['kll'], other['kll']
+    shift = {
+        'count': [base_moments.n, other_moments.n],
+        'mean': [base_moments.mean if base_moments.n else None, other_moments.mean if other_moments.n else None],
+        'quantiles': {
+            str(q): [a, b] for q, a, b in zip(SHIFT_QUANTILES, base_kll.quantiles(SHIFT_QUANTILES),
+                                              other_kll.quantiles(SHIFT_QUANTILES))
+        },
+        'ks_statistic': None
+    }
+    if base_kll.n and other_kll.n:
+        points = np.concatenate(base_kll.levels + other_kll.levels)
+        shift['ks_statistic'] = round(float(np.max(np.abs(base_kll.cdf(points) - other_kll.cdf(points)))), 6)
+    return shift
+
+
+def _categorical_shift(base: Dict[str, Any], other: Dict[str, Any], top: int) -> Dict[str, Any]:
+    """Distinct-count change, new and disappeared values, and top-value share changes
+
+    New and disappeared values are counted when both domains are exact; only
+    the first MAX_LISTED_VALUES of each (sorted) are listed, and none for
+    ID-like columns such as Case Number.
+    """
+    base_top, other_top = base['top'], other['top']
+    unique_count = [int(round(base['hll'].estimate())), int(round(other['hll'].estimate()))]
+    shift = {
+        'unique_count': unique_count,
+        'domain_exact': not (base['domain'].overflowed or other['domain'].overflowed),
+        'id_like': any(top.n and count >= ID_LIKE_SHARE * top.n
+                       for top, count in zip((base_top, other_top), unique_count)),
+        'new_count': None,
+        'disappeared_count': None
+    }
+    if shift['domain_exact']:
+        base_values, other_values = base['domain'].values, other['domain'].values
+        new, disappeared = other_values - base_values, base_values - other_values
+        shift['new_count'], shift['disappeared_count'] = len(new), len(disappeared)
+        if not shift['id_like']:
+            shift['new_values'] = sorted(new, key=str)[:MAX_LISTED_VALUES]
+            shift['disappeared_values'] = sorted(disappeared, key=str)[:MAX_LISTED_VALUES]
+
+    values = list(dict.fromkeys(list(base_top.top(top)) + list(other_top.top(top))))
+    shares = {}
+    for value in values:
+        before = _rate(int(base_top.counters.get(value, 0)), base_top.n)
+        after = _rate(int(other_top.counters.get(value, 0)), other_top.n)
+        shares[value] = {'base': before, 'other': after,
+                         'change': None if before is None or after is None else round(after - before, 6)}
+    shift['top_value_shares'] = shares
+    return shift
+
+
+def diff_profiles(base: ApproxProfile, other: ApproxProfile, top: int = TOP_VALUES) -> Dict[str, Any]:
+    """Describe how the dataset behind one profile differs from another
+
+    Reports schema changes, missing-rate changes for every shared column,
+    distribution shift for numeric columns (moments, quantiles and a KS
+    statistic) and for text columns new and disappeared values (counts plus
+    the first few) and changes in the share of the most frequent values.
+    """
+    common = [col for col in base.dtypes if col in other.dtypes]
+    diff = {
+        'rows': {'base': base.rows, 'other': other.rows, 'change': other.rows - base.rows},
+        'columns': {
+            'added': [col for col in other.dtypes if col not in base.dtypes],
+            'removed': [col for col in base.dtypes if col not in other.dtypes],
+            'type_changed': {col: [str(base.dtypes[col]), str(other.dtypes[col])]
+                             for col in common if base.kinds[col] != other.kinds[col]}
+        },
+        'missing_rate': {},
+        'numeric_shift': {},
+        'categorical_shift': {}
+    }
+    for col in common:
+        before, after = _rate(base.missing[col], base.rows), _rate(other.missing[col], other.rows)
+        diff['missing_rate'][col] = {
+            'base': before, 'other': after,
+            'change': None if before is None or after is None else round(after - before, 6)
+        }
+        if col in base.numeric and col in other.numeric:
+            diff['numeric_shift'][col] = _numeric_shift(base.numeric[col], other.numeric[col])
+        elif col in base.categorical and col in other.categorical:
+            diff['categorical_shift'][col] = _categorical_shift(base.categorical[col], other.categorical[col], top)
+
+    kll_error = max([s['kll'].rank_error for s in list(base.numeric.values()) + list(other.numeric.values())],
+                    default=0.0)
+    diff['error_bounds'] = {
+        # Each CDF is off by at most the rank error, so the KS statistic by twice that
+        'ks_statistic_max_error': round(2 * kll_error, 5),
+        'top_value_share_max_undercount': {
+            col: [round(1 / (base.categorical[col]['top'].capacity + 1), 6),
+                  round(1 / (other.categorical[col]['top'].capacity + 1), 6)]
+            for col in diff['categorical_shift']
+        },
+        'exact': ['rows', 'columns', 'missing_rate', 'count', 'mean', 'new_count', 'disappeared_count']
+    }
+    return diff
+
+
+class ProfileStore:
+    """Dataset profiles kept in memory and as JSON files, keyed by content fingerprint
+
+    A profile depends only on the dataset's contents, so a fingerprint seen
+    before (in this process or, with persistence, an earlier one) is served
+    without reading any rows.
+    """
+
+    def __init__(self, profile_dir: str = "./kpi_cache/profiles", max_profiles: int = 32,
+                 persist: bool = True):
+        self.profile_dir = profile_dir
+        self.max_profiles = max_profiles
+        self.persist = persist
+        self._profiles: "OrderedDict[str, ApproxProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'builds': 0, 'memory_hits': 0, 'disk_hits': 0}
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.profile_dir, f"{fingerprint}.json")
+
+    def _remember(self, fingerprint: str, profile: ApproxProfile) -> None:
+        with self._lock:
+            self._profiles[fingerprint] = profile
+            self._profiles.move_to_end(fingerprint)
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def _read(self, fingerprint: str) -> Optional[ApproxProfile]:
+        """Load a persisted profile, ignoring unreadable or outdated files"""
+        try:
+            with open(self._path(fingerprint), 'r') as f:
+                data = json.load(f)
+            if data.get('version') != PROFILE_FORMAT_VERSION:
+                return None
+            return ApproxProfile.from_dict(data['profile'])
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable profile {fingerprint}: {e}")
+            return None
+
+    def _write(self, fingerprint: str, profile: ApproxProfile) -> None:
+        """Atomically persist a profile"""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        tmp_path = f"{self._path(fingerprint)}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': PROFILE_FORMAT_VERSION, 'profile': profile.to_dict()}, f, default=str)
+        os.replace(tmp_path, self._path(fingerprint))
+
+    def get(self, fingerprint: str) -> Optional[ApproxProfile]:
+        """Return the stored profile for a fingerprint, if any"""
+        with self._lock:
+            if fingerprint in self._profiles:
+                self._profiles.move_to_end(fingerprint)
+                self.stats['memory_hits'] += 1
+                return self._profiles[fingerprint]
+        profile = self._read(fingerprint) if self.persist else None
+        if profile is not None:
+            self._remember(fingerprint, profile)
+            with self._lock:
+                self.stats['disk_hits'] += 1
+        return profile
+
+    def put(self, fingerprint: str, profile: ApproxProfile) -> None:
+        """Store a profile in memory and, with persistence, on disk"""
+        self._remember(fingerprint, profile)
+        if self.persist:
+            self._write(fingerprint, profile)
+
+    def get_or_build(self, fingerprint: str, df: pd.DataFrame,
+                     chunk_rows: int = APPROX_CHUNK_ROWS) -> Tuple[ApproxProfile, bool]:
+        """Return the profile for a dataset version, building it on first use
+
+        Callers must not modify the returned profile; use merge_profiles()
+        to combine it with others.
+        """
+        profile = self.get(fingerprint)
+        if profile is not None:
+            return profile, False
+        profile = build_profile(df, chunk_rows=chunk_rows)
+        self.put(fingerprint, profile)
+        with self._lock:
+            self.stats['builds'] += 1
+        return profile, True
+
+    def list_fingerprints(self) -> List[str]:
+        """Fingerprints held in memory, least recently used first"""
+        with self._lock:
+            return list(self._profiles)
+
+    def clear(self, remove_files: bool = False) -> None:
+        """Drop profiles from memory and optionally from disk"""
+        with self._lock:
+            self._profiles.clear()
+        if remove_files and os.path.isdir(self.profile_dir):
+            for name in os.listdir(self.profile_dir):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.profile_dir, name))
+
+
+_default_store: Optional[ProfileStore] = None
+
+
+def get_default_profile_store() -> ProfileStore:
+    """Get the process-wide profile store configured from the environment"""
+    global _default_store
+    if _default_store is None:
+        _default_store = ProfileStore(
+            profile_dir=os.getenv("PROFILE_CACHE_DIR", "./kpi_cache/profiles"),
+            persist=os.getenv("PROFILE_CACHE_PERSIST", "True").lower() == "true"
+        )
+    return _default_store
+
+
+def configure_default_profile_store(**kwargs) -> ProfileStore:
+    """Replace the process-wide profile store, e.g. from tool configuration"""
+    global _default_store
+    _default_store = ProfileStore(**kwargs)
+    return _default_store
@@ -1,28 +1,85 @@
 """LangChain tool for EDA"""
 from langchain.tools import BaseTool
 from langchain.callbacks.manager import CallbackManagerForToolRun
-import pandas as pd
+from typing import Optional
 import json
 
+from ..data.registry import dataset_registry, dataframe_fingerprint
+from ..result_cache import get_default_result_cache
+from .association import strongest_pairs
 from .core import EDAProcessor
+from .sketches import ApproxProfile
 
 class EDATool(BaseTool):
     """LangChain tool for exploratory data analysis"""
     
     name = "eda_analysis"
-    description = "Performs exploratory data analysis on provided data"
+    description = (
+        "Performs exploratory data analysis. data_json is a dataset handle "
+        "from data_retrieval (e.g. 'ds:cases_Q4_2024') or JSON records. analysis_type "
+        "is 'summary', 'summary_approx' (sketch-based, with error bounds; for very "
+        "large datasets), 'compare', 'correlation' or 'association' (numeric and "
+        "categorical columns; method 'pearson' or 'spearman'). For summary_approx and compare, "
+        "data_json may list several handles separated by commas to combine them. "
+        "'compare' reports distribution shift, new/disappeared categories (counts and "
+        "the first few) and missing-rate changes from data_json to compare_to (e.g. data_json="
+        "'ds:cases_Q4_2024', compare_to='ds:cases_Q1_current_year')"
+    )
+    
+    @staticmethod
+    def _profile(data_ref: str) -> ApproxProfile:
+        """Cached profile of one dataset, or the merged profiles of several handles"""
+        refs = [ref.strip() for ref in data_ref.split(',')] if dataset_registry.is_handle(data_ref) else [data_ref]
+        profiles = []
+        for ref in refs:
+            if dataset_registry.is_handle(ref):
+                entry = dataset_registry.get_entry(ref)
+                profiles.append(EDAProcessor.profile_dataset(entry.df, entry.get_fingerprint()))
+            else:
+                df = dataset_registry.resolve(ref)
+                profiles.append(EDAProcessor.profile_dataset(df, dataframe_fingerprint(df)))
+        return profiles[0] if len(profiles) == 1 else EDAProcessor.combine_profiles(profiles)
     
     def _run(
         self,
         data_json: str,
         analysis_type: str = "summary",
+        compare_to: Optional[str] = None,
+        method: str = "pearson",
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
-        """Execute EDA analysis"""
+        """Execute EDA analysis, reusing the result of an identical earlier call"""
+        return get_default_result_cache().get_or_run(
+            self.name, [data_json, compare_to],
+            {'analysis_type': analysis_type, 'method': method},
+            lambda: self._analyze(data_json, analysis_type, compare_to, method)
+        )
+    
+    def _analyze(self, data_json: str, analysis_type: str, compare_to: Optional[str], method: str) -> str:
+        """Run the requested analysis"""
         try:
-            # Parse data
-            data = json.loads(data_json)
-            df = pd.DataFrame(data)
+            # Profile-based analyses never need the rows of cached datasets
+            if analysis_type == "summary_approx":
+                summary = self._profile(data_json).to_summary()
+                return json.dumps(summary, indent=2, default=str)
+            elif analysis_type == "compare":
+                if not compare_to:
+                    return "compare needs compare_to, the dataset to compare data_json against"
+                diff = EDAProcessor.compare_profiles(self._profile(data_json), self._profile(compare_to))
+                return json.dumps(diff, indent=2, default=str)
+            
+            elif analysis_type == "association":
+                if dataset_registry.is_handle(data_json):
+                    entry = dataset_registry.get_entry(data_json)
+                    df, fingerprint = entry.df, entry.get_fingerprint()
+                else:
+                    df = dataset_registry.resolve(data_json)
+                    fingerprint = dataframe_fingerprint(df)
+                result = EDAProcessor.generate_association_matrix(df, method=method, fingerprint=fingerprint)
+                return json.dumps({**result, 'strongest_pairs': strongest_pairs(result)}, indent=2, default=str)
+            
+            # Resolve dataset handle or inline JSON records
+            df = dataset_registry.resolve(data_json)
             
             # Perform analysis based on type
             if analysis_type == "summary":
@@ -32,7 +89,7 @@ class EDATool(BaseTool):
                 correlations = EDAProcessor.generate_correlation_matrix(df)
                 return json.dumps(correlations, indent=2)
             else:
-                return "Unsupported analysis type. Use 'summary' or 'correlation'"
+                return "Unsupported analysis type. Use 'summary', 'summary_approx', 'compare', 'correlation' or 'association'"
                 
         except Exception as e:
             return f"EDA analysis failed: {str(e)}"
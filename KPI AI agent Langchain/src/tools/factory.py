@@ -7,6 +7,11 @@ def get_all_tools(config: Dict[str, Any]) -> List[BaseTool]:
     tools = []
     tool_config = config.get("tools", {})
     
+    result_cache_config = tool_config.get("result_cache")
+    if result_cache_config:
+        from .result_cache import configure_default_result_cache
+        configure_default_result_cache(**result_cache_config)
+    
     if tool_config.get("powerbi", {}).get("enabled", True):
         from .powerbi.tool import PowerBITool, PowerBIMetadataTool
         from ...config.settings import get_powerbi_config
@@ -22,14 +27,55 @@ def get_all_tools(config: Dict[str, Any]) -> List[BaseTool]:
     
     if tool_config.get("eda", {}).get("enabled", True):
         from .eda.tool import EDATool
+        profile_config = tool_config.get("eda", {}).get("profiles")
+        if profile_config:
+            from .eda.profiles import configure_default_profile_store
+            configure_default_profile_store(**profile_config)
         tools.append(EDATool())
     
     if tool_config.get("predictive", {}).get("enabled", True):
         from .predictive.tool import PredictiveAnalysisTool
+        model_config = tool_config.get("predictive", {}).get("models")
+        if model_config:
+            from .predictive.registry import configure_default_model_registry
+            configure_default_model_registry(**model_config)
+        feature_config = tool_config.get("predictive", {}).get("features")
+        if feature_config:
+            from .predictive.features import configure_default_feature_store
+            configure_default_feature_store(**feature_config)
+        online_config = tool_config.get("predictive", {}).get("online")
+        if online_config:
+            from .predictive.online import configure_default_online_store
+            configure_default_online_store(**online_config)
         tools.append(PredictiveAnalysisTool())
     
     if tool_config.get("data", {}).get("enabled", True):
         from .data.tool import DataRetrievalTool
-        tools.append(DataRetrievalTool())
+        cache_config = tool_config.get("data", {}).get("cache")
+        if cache_config:
+            from .data.cache import configure_default_cache
+            configure_default_cache(**cache_config)
+        token_budget = tool_config.get("data", {}).get("token_budget")
+        tools.append(DataRetrievalTool(token_budget=token_budget) if token_budget else DataRetrievalTool())
+    
+    if tool_config.get("sql", {}).get("enabled", True):
+        from .sql.tool import SQLQueryTool
+        from .sql.core import SQLQueryEngine
+        sql_config = tool_config.get("sql", {})
+        engine = SQLQueryEngine(max_rows=sql_config.get("max_rows", 1000),
+                                timeout_seconds=sql_config.get("timeout_seconds", 30.0))
+        tools.append(SQLQueryTool(engine))
+    
+    if tool_config.get("kpi", {}).get("enabled", True):
+        from .kpi.tool import KPICubeTool
+        tools.append(KPICubeTool())
+    
+    if tool_config.get("anomaly", {}).get("enabled", True):
+        from .anomaly.tool import AnomalyAlertTool
+        store_config = tool_config.get("anomaly", {}).get("store")
+        if store_config:
+            from .anomaly.core import configure_default_detector_store
+            configure_default_detector_store(**store_config)
+        tools.append(AnomalyAlertTool())
     
     return tools
\ No newline at end of file
@@ -0,0 +1 @@
+"""KPI cube tools for KPI AI Agent"""
\ No newline at end of file
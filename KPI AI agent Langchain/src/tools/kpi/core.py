@@ -0,0 +1,217 @@
+"""Materialized KPI cube over case data"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..data.dates import CASE_CREATED_COLUMN, CASE_DATE_COLUMNS, RESOLUTION_DAYS_COLUMN, \
+    build_calendar_dimension, parse_case_dates, to_datetime_array
+from ..data.pushdown import build_mask, normalize_filters
+
+# Drill-down order of the organisational hierarchy
+CASE_HIERARCHY = ['Geo Hierarchy - Geo', 'Geo Hierarchy - Country', 'Call Center', 'Agent Name']
+LEVEL_ALIASES = {
+    'geo': 'Geo Hierarchy - Geo',
+    'country': 'Geo Hierarchy - Country',
+    'call_center': 'Call Center',
+    'agent': 'Agent Name'
+}
+
+# Calendar dimension column used for each time grain
+TIME_GRAINS = {'day': None, 'week': 'week_start', 'month': 'month_start'}
+PERIOD_COLUMN = 'period'
+
+# Output measure name -> source column for summed counters
+COUNTER_MEASURES = {
+    'tsc_break_fix_resolved': '# of TSC Break Fix Resolved Cases',
+    'service_fix_resolved': '# of Service Fix Resolved Cases'
+}
+
+
+def _period_values(df: pd.DataFrame, grain: str) -> np.ndarray:
+    """Map case creation dates to the start of their day, week or month"""
+    days = to_datetime_array(df[CASE_CREATED_COLUMN]).astype('datetime64[D]')
+    valid = ~np.isnat(days)
+    periods = np.full(len(days), np.datetime64('NaT', 'ns'))
+    if not valid.any():
+        return periods
+    start, end = days[valid].min(), days[valid].max()
+    column = TIME_GRAINS[grain]
+    if column is None:
+        periods[valid] = days[valid]
+    else:
+        calendar = build_calendar_dimension(start, end)
+        positions = (days[valid] - start).astype('int64')
+        periods[valid] = calendar[column].values[positions]
+    return periods
+
+
+def aggregate_cases(df: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """Compute the KPI measures for each combination of keys"""
+    resolution = RESOLUTION_DAYS_COLUMN in df.columns
+    if keys:
+        # dropna=False keeps cases with a missing agent, so rollups add up
+        grouped = df.groupby(keys, observed=True, dropna=False, sort=True)
+        result = grouped.size().rename('cases').to_frame()
+        for name, col in COUNTER_MEASURES.items():
+            if col in df.columns:
+                result[name] = grouped[col].sum()
+        if resolution:
+            result['resolution_days_mean'] = grouped[RESOLUTION_DAYS_COLUMN].mean()
+            result['resolution_days_median'] = grouped[RESOLUTION_DAYS_COLUMN].median()
+        return result.reset_index()
+
+    result = {'cases': len(df)}
+    for name, col in COUNTER_MEASURES.items():
+        if col in df.columns:
+            result[name] = df[col].sum()
+    if resolution:
+        result['resolution_days_mean'] = df[RESOLUTION_DAYS_COLUMN].mean()
+        result['resolution_days_median'] = df[RESOLUTION_DAYS_COLUMN].median()
+    return pd.DataFrame([result])
+
+
+class KPICube:
+    """Case KPIs pre-aggregated for every hierarchy level and time grain
+
+    One table is materialized per grouping set: each prefix of the hierarchy
+    (total, Geo, Geo/Country, ... down to Agent) crossed with no time grain
+    or a day, week or month period. Drill-down and roll-up queries then read
+    a small table instead of scanning raw rows. Medians are not additive, so
+    every set is computed from the rows rather than rolled up from finer sets.
+    """
+
+    def __init__(self, df: pd.DataFrame, hierarchy: Optional[List[str]] = None,
+                 grains: Optional[List[str]] = None):
+        start = time.perf_counter()
+        self.hierarchy = [col for col in (hierarchy or CASE_HIERARCHY) if col in df.columns]
+        has_dates = CASE_CREATED_COLUMN in df.columns
+        self.grains = [g for g in (grains or list(TIME_GRAINS)) if g in TIME_GRAINS] if has_dates else []
+        self.df = df
+        self.tables: Dict[Tuple[int, Optional[str]], pd.DataFrame] = {}
+
+        frame = self._prepare(df)
+        for depth in range(len(self.hierarchy) + 1):
+            keys = self.hierarchy[:depth]
+            self.tables[(depth, None)] = aggregate_cases(frame, keys)
+            for grain in self.grains:
+                self.tables[(depth, grain)] = aggregate_cases(frame, keys + [grain])
+        self.rows = len(df)
+        self.build_seconds = time.perf_counter() - start
+
+    def _prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Select key and measure columns and add the period columns"""
+        columns = self.hierarchy + [c for c in COUNTER_MEASURES.values() if c in df.columns]
+        frame = df[columns].copy()
+        if RESOLUTION_DAYS_COLUMN in df.columns:
+            frame[RESOLUTION_DAYS_COLUMN] = df[RESOLUTION_DAYS_COLUMN]
+        else:
+            # Frames loaded without dtype optimization still carry date strings
+            dates, _ = parse_case_dates(df[[c for c in CASE_DATE_COLUMNS if c in df.columns]].copy())
+            if RESOLUTION_DAYS_COLUMN in dates.columns:
+                frame[RESOLUTION_DAYS_COLUMN] = dates[RESOLUTION_DAYS_COLUMN]
+        for grain in self.grains:
+            frame[grain] = _period_values(df, grain)
+        return frame
+
+    def resolve_level(self, level: Optional[str]) -> int:
+        """Depth in the hierarchy for a level name or alias"""
+        if level in (None, '', 'total'):
+            return 0
+        column = LEVEL_ALIASES.get(level, level)
+        if column not in self.hierarchy:
+            raise ValueError(f"Unknown level: {level}. Use one of {list(LEVEL_ALIASES)} or 'total'")
+        return self.hierarchy.index(column) + 1
+
+    def query(self, level: Optional[str] = None, grain: Optional[str] = None,
+              filters: Optional[Dict[str, Any]] = None) -> Tuple[pd.DataFrame, str]:
+        """Answer a KPI query, from the cube when possible
+
+        filters may restrict hierarchy columns at or above the requested
+        level, and the period when a grain is given ({'period': {'from': ...,
+        'to': ...}}). Anything else is answered from the raw rows. Returns the
+        result and its source ('cube' or 'raw').
+        """
+        depth = self.resolve_level(level)
+        if grain is not None and grain not in TIME_GRAINS:
+            raise ValueError(f"Unknown grain: {grain}. Use one of {list(TIME_GRAINS)}")
+        filters = {LEVEL_ALIASES.get(col, col): cond for col, cond in (filters or {}).items()}
+        keys = self.hierarchy[:depth]
+
+        materialized = grain is None or grain in self.grains
+        answerable = all(col in keys or (col == PERIOD_COLUMN and grain) for col in filters)
+        if materialized and answerable:
+            table = self.tables[(depth, grain)]
+            if grain:
+                table = table.rename(columns={grain: PERIOD_COLUMN})
+            normalized = normalize_filters(filters, date_columns=[PERIOD_COLUMN])
+            if normalized:
+                table = table[build_mask(table, normalized)]
+            return table.reset_index(drop=True), "cube"
+        return self._query_raw(keys, grain, filters), "raw"
+
+    def _query_raw(self, keys: List[str], grain: Optional[str], filters: Dict[str, Any]) -> pd.DataFrame:
+        """Aggregate raw rows for queries the cube does not cover"""
+        df = self.df
+        raw_filters = normalize_filters({col: cond for col, cond in filters.items() if col != PERIOD_COLUMN})
+        if raw_filters:
+            df = df[build_mask(df, raw_filters)]
+        frame = self._prepare(df)
+        if grain:
+            frame = frame.rename(columns={grain: PERIOD_COLUMN})
+            if grain not in self.grains:
+                frame[PERIOD_COLUMN] = _period_values(df, grain)
+            keys = keys + [PERIOD_COLUMN]
+        result = aggregate_cases(frame, keys)
+        if PERIOD_COLUMN in filters:
+            period_filter = normalize_filters({PERIOD_COLUMN: filters[PERIOD_COLUMN]}, date_columns=[PERIOD_COLUMN])
+            result = result[build_mask(result, period_filter)].reset_index(drop=True)
+        return result
+
+    def describe(self) -> Dict[str, Any]:
+        """Summary of what is materialized"""
+        return {
+            'rows': self.rows,
+            'hierarchy': self.hierarchy,
+            'grains': self.grains,
+            'tables': len(self.tables),
+            'cells': int(sum(len(t) for t in self.tables.values())),
+            'build_seconds': round(self.build_seconds, 4)
+        }
+
+
+class KPICubeStore:
+    """Keeps one cube per dataset version, keyed by content fingerprint"""
+
+    def __init__(self, max_cubes: int = 8):
+        self.max_cubes = max_cubes
+        self._cubes: "OrderedDict[str, KPICube]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'builds': 0, 'hits': 0}
+
+    def get_or_build(self, fingerprint: str, df: pd.DataFrame) -> Tuple[KPICube, bool]:
+        """Return the cube for a dataset version, building it on first use"""
+        with self._lock:
+            if fingerprint in self._cubes:
+                self._cubes.move_to_end(fingerprint)
+                self.stats['hits'] += 1
+                return self._cubes[fingerprint], False
+
+        cube = KPICube(df)
+        with self._lock:
+            self._cubes[fingerprint] = cube
+            while len(self._cubes) > self.max_cubes:
+                self._cubes.popitem(last=False)
+            self.stats['builds'] += 1
+        return cube, True
+
+    def clear(self):
+        """Drop all cubes"""
+        with self._lock:
+            self._cubes.clear()
+
+
+kpi_cube_store = KPICubeStore()
@@ -0,0 +1,64 @@
+"""LangChain tool for KPI cube queries"""
+from langchain.tools import BaseTool
+from langchain.callbacks.manager import CallbackManagerForToolRun
+from typing import Any, Dict, Optional
+import json
+import time
+
+from ..data.registry import dataset_registry, dataframe_fingerprint
+from .core import kpi_cube_store
+
+class KPICubeTool(BaseTool):
+    """LangChain tool for drill-down and roll-up KPI queries"""
+    
+    name = "kpi_cube"
+    description = (
+        "Answers case KPI questions (case counts, TSC break fix and service fix resolved "
+        "counts, mean/median resolution days) from a pre-aggregated cube. data_json is a "
+        "dataset handle from data_retrieval. level is 'total', 'geo', 'country', "
+        "'call_center' or 'agent'; grain is 'day', 'week' or 'month' (optional). "
+        "filters restrict hierarchy values, e.g. {'country': 'Canada'}, or the period, "
+        "e.g. {'period': {'from': '01/01/2025', 'to': '31/03/2025'}}"
+    )
+    
+    def _run(
+        self,
+        data_json: str,
+        level: Optional[str] = None,
+        grain: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        sort_by: Optional[str] = None,
+        max_rows: int = 50,
+        run_manager: Optional[CallbackManagerForToolRun] = None
+    ) -> str:
+        """Query the KPI cube"""
+        try:
+            start = time.perf_counter()
+            if dataset_registry.is_handle(data_json):
+                entry = dataset_registry.get_entry(data_json)
+                df, fingerprint = entry.df, entry.get_fingerprint()
+            else:
+                df = dataset_registry.resolve(data_json)
+                fingerprint = dataframe_fingerprint(df)
+            
+            cube, built = kpi_cube_store.get_or_build(fingerprint, df)
+            query_start = time.perf_counter()
+            result, source = cube.query(level=level, grain=grain, filters=filters)
+            if sort_by:
+                result = result.sort_values(sort_by, ascending=False)
+            
+            return json.dumps({
+                'source': source,
+                'rows': len(result),
+                'data': result.head(max_rows).to_dict(orient='records'),
+                'truncated': len(result) > max_rows,
+                'cube': {**cube.describe(), 'built_now': built},
+                'query_seconds': round(time.perf_counter() - query_start, 4),
+                'total_seconds': round(time.perf_counter() - start, 4)
+            }, indent=2, default=str)
+            
+        except Exception as e:
+            return f"KPI cube query failed: {str(e)}"
+    
+    async def _arun(self, *args, **kwargs) -> str:
+        return self._run(*args, **kwargs)
@@ -0,0 +1,130 @@
+"""Selectable regression backends with a training time budget"""
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+# Default parameters of each backend; they are part of a stored model's id
+BACKEND_PARAMS = {
+    'random_forest': {'n_estimators': 100, 'random_state': 42, 'n_jobs': -1},
+    'hist_gradient_boosting': {'max_iter': 200, 'learning_rate': 0.1, 'random_state': 42},
+    'linear': {'alpha': 1.0}
+}
+# Trees or boosting iterations fitted first under a time budget, and most added per later step
+BUDGET_FIRST_STEP = 2
+BUDGET_STEP = 10
+# Sparse features are densified for tree backends up to this size; forests train ~5x faster on dense input
+DENSE_MAX_BYTES = 256 * 1024 ** 2
+
+
+def as_float32(X):
+    """Feature matrix as float32, dense arrays and sparse matrices alike"""
+    if hasattr(X, 'tocsr'):
+        return X.astype(np.float32)
+    return np.asarray(X, dtype=np.float32)
+
+
+def _tree_input(X, backend: str):
+    """Densify sparse features for tree backends: always for gradient boosting, which needs it,
+    and for forests when the dense matrix fits in DENSE_MAX_BYTES"""
+    if hasattr(X, 'toarray') and (backend == 'hist_gradient_boosting' or
+                                  (backend == 'random_forest' and X.shape[0] * X.shape[1] * 4 <= DENSE_MAX_BYTES)):
+        return X.toarray()
+    return X
+
+
+def _make(backend: str, params: Dict[str, Any]):
+    """Instantiate a backend; scikit-learn is imported on first use"""
+    if backend == 'random_forest':
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(**params)
+    if backend == 'hist_gradient_boosting':
+        from sklearn.ensemble import HistGradientBoostingRegressor
+        return HistGradientBoostingRegressor(**params)
+    from sklearn.linear_model import Ridge
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import MaxAbsScaler
+    # Scaling keeps sparse input sparse and puts work order numbers and one-hot flags on one scale
+    return make_pipeline(MaxAbsScaler(), Ridge(**params))
+
+
+def fit_model(backend: str, X, y, time_budget: Optional[float] = None,
+              params: Optional[Dict[str, Any]] = None) -> Tuple[Any, Dict[str, Any]]:
+    """Fit a backend on float32 features, stopping early when the time budget runs out
+
+    Under a time budget, random forests and gradient boosting fit
+    BUDGET_FIRST_STEP trees, then keep adding trees with warm_start, at most
+    BUDGET_STEP at a time and only as many as still fit in time_budget
+    seconds. The time per tree comes from successive steps, apart from the
+    fixed cost every fit call pays. Linear models fit in one pass.
+    Returns the model and training info (seconds, estimators fitted,
+    whether the budget stopped training).
+    """
+    if backend not in BACKEND_PARAMS:
+        raise ValueError(f"Unknown backend: {backend}. Use one of {list(BACKEND_PARAMS)}")
+    params = {**BACKEND_PARAMS[backend], **(params or {})}
+    X = _tree_input(as_float32(X), backend)
+    start = time.perf_counter()
+
+    if backend == 'linear':
+        model = _make(backend, params).fit(X, y)
+        return model, {'train_seconds': time.perf_counter() - start, 'estimators': None, 'stopped_early': False}
+
+    size_param = 'n_estimators' if backend == 'random_forest' else 'max_iter'
+    target = params[size_param]
+    size = target if time_budget is None else min(BUDGET_FIRST_STEP, target)
+    model = _make(backend, {**params, size_param: size, 'warm_start': True})
+    stopped_early = False
+    fitted_before, previous, per_tree, overhead = 0, None, None, 0.0
+    while True:
+        step_start = time.perf_counter()
+        model.fit(X, y)
+        step_seconds = time.perf_counter() - step_start
+        fitted = getattr(model, 'n_iter_', None) or len(getattr(model, 'estimators_', []))
+        if size >= target or (backend == 'hist_gradient_boosting' and fitted < size):
+            # Done, or gradient boosting stopped on its own validation score
+            break
+        added = fitted - fitted_before
+        if previous and added != previous[0] and (step_seconds - previous[1]) / (added - previous[0]) > 0:
+            # Two steps of different sizes separate the time per tree from the fixed cost of
+            # a fit call (gradient boosting bins the data again on every warm start)
+            per_tree = (step_seconds - previous[1]) / (added - previous[0])
+            overhead = max(0.0, step_seconds - added * per_tree)
+        elif per_tree is None:
+            per_tree = step_seconds / added
+        fitted_before, previous = fitted, (added, step_seconds)
+        remaining = time_budget - (time.perf_counter() - start)
+        affordable = int((remaining - overhead) / per_tree)
+        if affordable < 1:
+            stopped_early = True
+            break
+        size = min(target, size + min(BUDGET_STEP, affordable))
+        model.set_params(**{size_param: size})
+    return model, {'train_seconds': time.perf_counter() - start, 'estimators': int(fitted),
+                   'stopped_early': stopped_early}
+
+
+def predict(model, X) -> np.ndarray:
+    """Predict with any backend from float32 features"""
+    name = type(model).__name__
+    backend = ('hist_gradient_boosting' if name.startswith('HistGradientBoosting') else
+               'random_forest' if name.startswith('RandomForest') else 'linear')
+    return model.predict(_tree_input(as_float32(X), backend))
+
+
+def feature_importances(model, feature_names: List[str]) -> Dict[str, float]:
+    """Impurity importances for forests, normalised absolute coefficients for linear models
+
+    Histogram gradient boosting has no built-in importances and returns {}.
+    """
+    if hasattr(model, 'steps'):
+        # Linear pipelines: coefficients of the scaled features
+        model = model.steps[-1][1]
+    if hasattr(model, 'feature_importances_'):
+        values = model.feature_importances_
+    elif hasattr(model, 'coef_'):
+        values = np.abs(np.ravel(model.coef_))
+        values = values / values.sum() if values.sum() > 0 else values
+    else:
+        return {}
+    return {name: float(value) for name, value in zip(feature_names, values)}
@@ -0,0 +1,148 @@
+"""Rolling- and expanding-origin backtests over time-ordered case data"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..data.dates import to_datetime_array
+from .backends import as_float32, fit_model, predict
+
+SPLIT_MODES = ('expanding', 'rolling')
+METRICS = ('mse', 'mae', 'mape')
+
+# Training data of a pool worker, sent once by the pool initializer instead of pickled per fold
+_shared: Dict[str, Any] = {}
+
+
+@dataclass
+class Fold:
+    """One origin: train rows [train_start, train_end) and test rows [train_end, test_end) by date"""
+    index: int
+    train_start: int
+    train_end: int
+    test_end: int
+    origin: str
+    test_until: str
+
+
+def time_splits(days: np.ndarray, n_folds: int = 5, mode: str = 'expanding',
+                window_days: Optional[int] = None) -> List[Fold]:
+    """Fold boundaries over sorted day values, cut at day boundaries
+
+    The distinct days are split into n_folds + 1 equal blocks; fold k tests
+    on block k + 1. Expanding folds train on everything before the origin,
+    rolling folds on the window_days before it (default: the first block's
+    length), so every fold trains on the same span.
+    """
+    if mode not in SPLIT_MODES:
+        raise ValueError(f"Unknown split mode: {mode}. Use one of {list(SPLIT_MODES)}")
+    unique_days = np.unique(days)
+    if n_folds < 1 or len(unique_days) < n_folds + 1:
+        raise ValueError(f"Need at least {n_folds + 1} distinct dates for {n_folds} folds, "
+                         f"found {len(unique_days)}")
+    cuts = unique_days[np.linspace(0, len(unique_days), n_folds + 2).astype(int)[1:-1]]
+    window = np.timedelta64(window_days if window_days else int((cuts[0] - unique_days[0]).astype(int)), 'D')
+
+    bounds = np.searchsorted(days, cuts)
+    ends = np.append(bounds[1:], len(days))
+    folds = []
+    for k, (origin, train_end, test_end) in enumerate(zip(cuts, bounds, ends)):
+        train_start = int(np.searchsorted(days, origin - window)) if mode == 'rolling' else 0
+        folds.append(Fold(k, train_start, int(train_end), int(test_end), str(origin),
+                          str(days[test_end - 1])))
+    return folds
+
+
+def regression_metrics(actual: np.ndarray, predicted: np.ndarray) -> Dict[str, Any]:
+    """MSE, MAE and MAPE (over rows whose actual value is not zero)"""
+    error = predicted - actual
+    nonzero = actual != 0
+    return {
+        'mse': float(np.mean(error * error)),
+        'mae': float(np.mean(np.abs(error))),
+        'mape': float(np.mean(np.abs(error[nonzero] / actual[nonzero])) * 100) if nonzero.any() else None,
+        'mape_rows': int(nonzero.sum())
+    }
+
+
+def _share(X: np.ndarray, y: np.ndarray, backend: str, time_budget: Optional[float]) -> None:
+    _shared.update(X=X, y=y, backend=backend, time_budget=time_budget,
+                   # Folds already use every core; threaded forests would oversubscribe them
+                   params={'n_jobs': 1} if backend == 'random_forest' else None)
+
+
+def _evaluate_fold(fold: Fold, X: np.ndarray, y: np.ndarray, backend: str,
+                   time_budget: Optional[float] = None, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Fit on a fold's training rows and score its test rows"""
+    train = slice(fold.train_start, fold.train_end)
+    test = slice(fold.train_end, fold.test_end)
+
+    model, training = fit_model(backend, X[train], y[train], time_budget=time_budget, params=params)
+    fit_seconds = training['train_seconds']
+    start = time.perf_counter()
+    predicted = predict(model, X[test])
+    predict_seconds = time.perf_counter() - start
+    return {
+        **asdict(fold),
+        'train_rows': fold.train_end - fold.train_start,
+        'test_rows': fold.test_end - fold.train_end,
+        **regression_metrics(y[test], predicted),
+        'fit_seconds': round(fit_seconds, 4),
+        'predict_seconds': round(predict_seconds, 4),
+        'stopped_early': training['stopped_early']
+    }
+
+
+def _evaluate_fold_worker(fold: Fold) -> Dict[str, Any]:
+    return _evaluate_fold(fold, _shared['X'], _shared['y'], _shared['backend'], _shared['time_budget'],
+                          _shared['params'])
+
+
+def backtest(X: pd.DataFrame, y: pd.Series, dates: pd.Series, backend: str = 'random_forest',
+             time_budget: Optional[float] = None, n_folds: int = 5, mode: str = 'expanding',
+             window_days: Optional[int] = None, workers: Optional[int] = None) -> Dict[str, Any]:
+    """Evaluate a model backend on successive time-ordered folds
+
+    Rows are sorted by date once, so every fold is a pair of contiguous
+    slices and no fold trains on rows dated after its origin. Rows without a
+    date are dropped. Folds run on a process pool when workers > 1 (default:
+    one per CPU, up to the number of folds); the data is sent to each worker
+    once.
+    """
+    start = time.perf_counter()
+    days = to_datetime_array(dates).astype('datetime64[D]')
+    dated = ~np.isnat(days)
+    order = np.argsort(days[dated], kind='stable')
+    days = days[dated][order]
+    X_sorted = as_float32(X.to_numpy())[dated][order]
+    y_sorted = y.to_numpy(dtype=np.float64)[dated][order]
+    folds = time_splits(days, n_folds=n_folds, mode=mode, window_days=window_days)
+
+    workers = min(workers or os.cpu_count() or 1, len(folds))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_share,
+                                 initargs=(X_sorted, y_sorted, backend, time_budget)) as executor:
+            results = list(executor.map(_evaluate_fold_worker, folds))
+    else:
+        results = [_evaluate_fold(fold, X_sorted, y_sorted, backend, time_budget) for fold in folds]
+
+    summary = {}
+    for metric in METRICS:
+        values = [r[metric] for r in results if r[metric] is not None]
+        summary[metric] = {'mean': float(np.mean(values)), 'std': float(np.std(values)),
+                           'min': float(np.min(values)), 'max': float(np.max(values))} if values else None
+    return {
+        'mode': mode,
+        'backend': backend,
+        'folds': results,
+        'summary': summary,
+        'rows': int(dated.sum()),
+        'rows_without_date': int((~dated).sum()),
+        'features': list(X.columns),
+        'workers': workers,
+        'total_seconds': round(time.perf_counter() - start, 4)
+    }
@@ -1,11 +1,23 @@
 """Core predictive analysis functionality"""
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, r2_score
 import json
-from typing import Dict, Any, Tuple
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from ..data.dates import CASE_CREATED_COLUMN
+from ..data.registry import dataframe_fingerprint
+from ..kpi.core import LEVEL_ALIASES
+from .registry import ModelRecord, get_default_model_registry
+from .backends import BACKEND_PARAMS, as_float32, feature_importances, fit_model, predict
+from .backtest import backtest
+from .features import FeaturePipeline, get_default_feature_store
+from .intervals import DEFAULT_LEVELS, DEFAULT_PATHS, MAX_PATHS, bootstrap_intervals, error_weights
+from .online import OnlineRegressor, OnlineVolumeForecaster, get_default_online_store
+from .timeseries import forecast_case_volumes
+
+DEFAULT_BACKEND = 'random_forest'
 
 class PredictiveAnalyzer:
     """Perform predictive analysis on KPI data"""
@@ -30,28 +42,59 @@ class PredictiveAnalyzer:
         return X, y
     
     @staticmethod
-    def train_forecast_model(X: pd.DataFrame, y: pd.Series) -> Dict[str, Any]:
+    def train_forecast_model(X: pd.DataFrame, y: pd.Series, backend: str = DEFAULT_BACKEND,
+                             time_budget: Optional[float] = None) -> Dict[str, Any]:
         """Train predictive model and return results"""
+        _, results = PredictiveAnalyzer.fit_forecast_model(X, y, backend=backend, time_budget=time_budget)
+        return results
+    
+    @staticmethod
+    def fit_forecast_model(X: pd.DataFrame, y: pd.Series, feature_names: Optional[list] = None,
+                           backend: str = DEFAULT_BACKEND,
+                           time_budget: Optional[float] = None) -> Tuple[Any, Dict[str, Any]]:
+        """Train predictive model and return it with its results
+        
+        X may also be a sparse matrix from a FeaturePipeline, with its
+        feature_names. Features are converted to float32 once; training stops
+        early when time_budget seconds would be exceeded. The results include
+        training and inference wall time.
+        """
+        # scikit-learn takes ~2s to import, so it is loaded on first training
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import mean_squared_error, r2_score
+        
+        feature_names = list(feature_names or X.columns)
+        
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
+            as_float32(X), y, test_size=0.2, random_state=42
         )
         
         # Train model
-        model = RandomForestRegressor(n_estimators=100, random_state=42)
-        model.fit(X_train, y_train)
+        model, training = fit_model(backend, X_train, y_train, time_budget=time_budget)
         
         # Make predictions
-        y_pred = model.predict(X_test)
+        start = time.perf_counter()
+        y_pred = predict(model, X_test)
+        predict_seconds = time.perf_counter() - start
         
         # Calculate metrics
         mse = mean_squared_error(y_test, y_pred)
         r2 = r2_score(y_test, y_pred)
         
         # Feature importance
-        feature_importance = dict(zip(X.columns, model.feature_importances_))
+        feature_importance = feature_importances(model, feature_names)
         
-        return {
+        return model, {
+            'backend': backend,
+            'timing': {
+                'train_seconds': round(training['train_seconds'], 4),
+                'predict_seconds': round(predict_seconds, 4),
+                'predict_rows_per_second': round(len(y_test) / predict_seconds) if predict_seconds > 0 else None,
+                'estimators': training['estimators'],
+                'stopped_early': training['stopped_early'],
+                'time_budget': time_budget
+            },
             'model_performance': {
                 'mse': float(mse),
                 'rmse': float(np.sqrt(mse)),
@@ -64,10 +107,230 @@ class PredictiveAnalyzer:
             }
         }
     
+    @staticmethod
+    def backtest_model(df: pd.DataFrame, target_column: str, feature_columns: list = None,
+                       date_column: str = CASE_CREATED_COLUMN, n_folds: int = 5, mode: str = 'expanding',
+                       window_days: Optional[int] = None, workers: Optional[int] = None,
+                       backend: str = DEFAULT_BACKEND, time_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Backtest the forecast model on rolling or expanding origins over a date column
+        
+        Unlike the random split in train_forecast_model, each fold only
+        trains on cases created before the cases it is scored on.
+        """
+        if date_column not in df.columns:
+            raise ValueError(f"Date column {date_column} not found in data")
+        X, y = PredictiveAnalyzer.prepare_data(df, target_column, feature_columns)
+        return backtest(X, y, df.loc[X.index, date_column], backend=backend, time_budget=time_budget,
+                        n_folds=n_folds, mode=mode, window_days=window_days, workers=workers)
+    
+    @staticmethod
+    def fit_feature_pipeline(df: pd.DataFrame, target_column: str, fingerprint: Optional[str] = None,
+                             refresh: bool = False) -> Tuple[FeaturePipeline, ModelRecord, Any]:
+        """Fit the encoding pipeline once per dataset version and target
+        
+        Returns the pipeline, its record in the feature store and, when it
+        was fitted now, the encoded training rows (None for a stored pipeline).
+        """
+        df_clean = df.dropna(subset=[target_column])
+        y = df_clean[target_column]
+        fingerprint = fingerprint or dataframe_fingerprint(df)
+        store = get_default_feature_store()
+        pipeline_id = store.make_model_id(fingerprint, target_column, [], 'feature_pipeline')
+        encoded = {}
+        
+        def fit():
+            start = time.perf_counter()
+            pipeline = FeaturePipeline()
+            encoded['X'] = pipeline.fit_transform(df_clean, y)
+            return pipeline, ModelRecord(
+                model_id=pipeline_id, target_column=target_column, feature_columns=pipeline.feature_names,
+                data_fingerprint=fingerprint, model_type='feature_pipeline', results=pipeline.describe(),
+                train_seconds=round(time.perf_counter() - start, 4)
+            )
+        
+        pipeline, record, _ = store.get_or_train(pipeline_id, fit, refresh=refresh)
+        return pipeline, record, encoded.get('X')
+    
+    @staticmethod
+    def train_or_load_model(df: pd.DataFrame, target_column: str, feature_columns: list = None,
+                            fingerprint: Optional[str] = None, refresh: bool = False,
+                            features: str = 'numeric', backend: str = DEFAULT_BACKEND,
+                            time_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Train the forecast model, or return the stored one for identical data and features
+        
+        Fitted models are kept in the model registry under an id derived from
+        the data fingerprint, target and features; refresh forces a new fit.
+        features='encoded' trains on the FeaturePipeline encoding of the case
+        fields instead of the numeric columns only. backend and time_budget
+        are passed to fit_forecast_model and are part of the model id.
+        """
+        if features not in ('numeric', 'encoded'):
+            raise ValueError(f"Unknown features: {features}. Use 'numeric' or 'encoded'")
+        if backend not in BACKEND_PARAMS:
+            raise ValueError(f"Unknown backend: {backend}. Use one of {list(BACKEND_PARAMS)}")
+        fingerprint = fingerprint or dataframe_fingerprint(df)
+        registry = get_default_model_registry()
+        params = {**BACKEND_PARAMS[backend], 'time_budget': time_budget}
+        if features == 'encoded':
+            pipeline, pipeline_record, X = PredictiveAnalyzer.fit_feature_pipeline(
+                df, target_column, fingerprint=fingerprint, refresh=refresh)
+            df_clean = df.dropna(subset=[target_column])
+            y = df_clean[target_column]
+            feature_names = pipeline.feature_names
+            params['feature_pipeline'] = pipeline_record.model_id
+        else:
+            X, y = PredictiveAnalyzer.prepare_data(df, target_column, feature_columns)
+            feature_names = list(X.columns)
+        model_id = registry.make_model_id(fingerprint, target_column, feature_names, backend, params)
+        
+        def train():
+            start = time.perf_counter()
+            # A stored pipeline re-encodes its training rows; it is not refitted
+            X_train = pipeline.transform_training(df_clean, y) if X is None else X
+            model, results = PredictiveAnalyzer.fit_forecast_model(X_train, y, feature_names, backend=backend,
+                                                                   time_budget=time_budget)
+            return model, ModelRecord(
+                model_id=model_id, target_column=target_column, feature_columns=feature_names,
+                data_fingerprint=fingerprint, model_type=backend, params=params,
+                results=results, train_seconds=round(time.perf_counter() - start, 4)
+            )
+        
+        _, record, trained = registry.get_or_train(model_id, train, refresh=refresh)
+        return {**record.results, 'model': {**record.describe(), 'cached': not trained}}
+    
+    @staticmethod
+    def predict_with_model(model_id: str, df: pd.DataFrame) -> Dict[str, Any]:
+        """Predict new rows with a stored model, without retraining
+        
+        Models trained on encoded features transform the rows with their
+        stored pipeline, which is never refitted here.
+        """
+        start = time.perf_counter()
+        registry = get_default_model_registry()
+        stored = registry.get(model_id)
+        online = get_default_online_store().get(model_id) if stored is None else None
+        if online is not None and isinstance(online[0], OnlineRegressor):
+            predictions = online[0].predict(df)
+            return {
+                'model_id': model_id,
+                'target_column': online[1].target_column,
+                'predictions': predictions.tolist(),
+                'rows': len(predictions),
+                'predict_seconds': round(time.perf_counter() - start, 4)
+            }
+        pipeline_id = stored[1].params.get('feature_pipeline') if stored else None
+        if pipeline_id:
+            pipeline = get_default_feature_store().get(pipeline_id)
+            if pipeline is None:
+                raise KeyError(f"Feature pipeline {pipeline_id} of model {model_id} is no longer stored")
+            model, record = stored
+            predictions = predict(model, pipeline[0].transform(df))
+        else:
+            predictions, record = registry.predict(model_id, df)
+        return {
+            'model_id': model_id,
+            'target_column': record.target_column,
+            'predictions': predictions.tolist(),
+            'rows': len(predictions),
+            'predict_seconds': round(time.perf_counter() - start, 4)
+        }
+    
+    @staticmethod
+    def model_version(model_id: str) -> Optional[str]:
+        """When a stored or online model was last trained or updated; None for an unknown id"""
+        if not model_id:
+            return None
+        stored = get_default_model_registry().get(model_id) or get_default_online_store().get(model_id)
+        return stored[1].trained_at if stored else None
+    
+    @staticmethod
+    def list_models() -> list:
+        """Describe the stored models"""
+        return get_default_model_registry().list_models()
+    
+    @staticmethod
+    def forecast_case_volumes(df: pd.DataFrame, levels: Optional[list] = None, grain: str = 'day',
+                              horizon: int = 14, max_series: Optional[int] = 50,
+                              coverage: tuple = DEFAULT_LEVELS) -> Dict[str, Any]:
+        """Forecast case counts for every group at the given levels in one batch
+        
+        levels are hierarchy aliases ('call_center', 'agent', ...) or column
+        names; none gives a single total series. Each forecast carries
+        bootstrap prediction intervals at the coverage levels.
+        """
+        group_by = [LEVEL_ALIASES.get(level, level) for level in levels or []]
+        missing = [col for col in group_by if col not in df.columns]
+        if missing:
+            raise ValueError(f"Columns not found in data: {missing}")
+        start = time.perf_counter()
+        results = forecast_case_volumes(df, group_by=group_by, freq=grain, horizon=horizon,
+                                        max_series=max_series, levels=coverage)
+        results['fit_seconds'] = round(time.perf_counter() - start, 4)
+        return results
+    
+    @staticmethod
+    def online_update(df: Optional[pd.DataFrame] = None, model_id: Optional[str] = None,
+                      target_column: Optional[str] = None, levels: Optional[list] = None,
+                      grain: str = 'day', horizon: int = 14) -> Dict[str, Any]:
+        """Start an online model, or update a stored one with new case rows only
+        
+        Without model_id, a volume forecaster (no target_column) or an SGD
+        regressor (target_column) is fitted on df and stored. With model_id,
+        the stored state is advanced over the rows after its watermark and
+        saved again; volume forecasts then come straight from the state, so
+        df may be omitted to forecast without updating.
+        """
+        store = get_default_online_store()
+        start = time.perf_counter()
+        if model_id is None:
+            if df is None:
+                raise ValueError("Data is required to start an online model")
+            fingerprint = dataframe_fingerprint(df)
+            if target_column is None:
+                group_by = [LEVEL_ALIASES.get(level, level) for level in levels or []]
+                missing = [col for col in group_by if col not in df.columns]
+                if missing:
+                    raise ValueError(f"Columns not found in data: {missing}")
+                model = OnlineVolumeForecaster.from_history(df, group_by=group_by, freq=grain)
+                model_type, columns = 'online_volume', group_by
+            else:
+                model = OnlineRegressor.from_rows(df, target_column)
+                model_type, columns = 'online_sgd', model.pipeline.feature_names
+            model_id = store.make_model_id(fingerprint, target_column or '', columns, model_type, {'freq': grain})
+            record = ModelRecord(model_id=model_id, target_column=target_column or '', feature_columns=columns,
+                                 data_fingerprint=fingerprint, model_type=model_type)
+            update = {'rows_used': model.rows_ingested}
+        else:
+            stored = store.get(model_id)
+            if stored is None:
+                raise KeyError(f"Unknown online model id: {model_id}")
+            model, record = stored
+            update = model.update(df) if df is not None else {'rows_used': 0}
+        update_seconds = time.perf_counter() - start
+        if df is not None:
+            record.results = model.describe()
+            record.train_seconds = round(update_seconds, 4)
+            # An update is a new version of the model; cached predictions key on it
+            record.trained_at = datetime.now().isoformat()
+            store.put(model, record)
+        
+        results = {'model_id': model_id, 'model_type': record.model_type, **update,
+                   'state': model.describe(), 'update_seconds': round(update_seconds, 4)}
+        if isinstance(model, OnlineVolumeForecaster):
+            start = time.perf_counter()
+            results['forecast'] = model.forecast(horizon)
+            results['forecast_seconds'] = round(time.perf_counter() - start, 4)
+        return results
+    
     @staticmethod
     def forecast_future(df: pd.DataFrame, target_column: str, 
-                       periods: int = 12) -> Dict[str, Any]:
-        """Generate future forecasts"""
+                       periods: int = 12, coverage: tuple = DEFAULT_LEVELS,
+                       n_paths: int = DEFAULT_PATHS, seed: int = 42) -> Dict[str, Any]:
+        """Generate future forecasts with bootstrap prediction intervals
+        
+        Intervals come from n_paths simulated paths that add resampled
+        step-to-step deviations from the trend, one interval per coverage level.
+        """
         # This is a simplified forecasting approach
         # In practice, you'd use more sophisticated time series methods
         
@@ -86,9 +349,19 @@ class PredictiveAnalyzer:
         last_value = target_data.iloc[-1]
         forecasts = [last_value + (i + 1) * trend for i in range(periods)]
         
+        # Random walk with drift: the h-step error is the sum of h step residuals
+        residuals = np.diff(target_data.to_numpy(dtype=np.float64)) - trend
+        intervals = bootstrap_intervals(np.array([forecasts], dtype=np.float64), residuals[None, :],
+                                        error_weights(periods, 1.0, 0.0, 0.0), levels=coverage,
+                                        n_paths=n_paths, seed=seed, workers=1)
+        
         return {
             'forecasts': forecasts,
             'periods': periods,
             'trend': float(trend),
-            'confidence_intervals': []  # Simplified - would include actual CIs
+            'confidence_intervals': [
+                {'level': iv['level'], 'lower': iv['lower'][0].tolist(), 'upper': iv['upper'][0].tolist()}
+                for iv in intervals
+            ],
+            'interval_method': f"residual bootstrap, {min(n_paths, MAX_PATHS)} paths"
         }
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""Fitted feature pipeline for case-level models: one-hot, target and date encodings"""
+import os
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..data.dates import CASE_CREATED_COLUMN, to_datetime_array
+from .registry import ModelRegistry
+
+CATEGORICAL_FEATURES = ['Problem Code', 'Product Family', 'Model Name', 'Origin', 'Agreement Type']
+# Columns with more categories than this are target encoded instead of one-hot encoded
+ONE_HOT_MAX_CATEGORIES = 100
+# Weight of the global mean in a category's target encoding, in rows
+TARGET_SMOOTHING = 20.0
+# Training rows are target encoded out of fold so a row never sees its own target
+TARGET_FOLDS = 5
+DATE_FEATURES = ('dayofweek', 'day', 'month', 'is_weekend')
+
+
+def category_codes(series: pd.Series, vocabulary: pd.Index) -> np.ndarray:
+    """Position of each value in a fitted vocabulary, -1 for missing or unseen values
+
+    Distinct values are looked up once and expanded through integer codes,
+    so the cost per row is one array take.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    # Code -1 (missing) picks the trailing -1
+    mapping = np.append(vocabulary.get_indexer(uniques), -1)
+    return mapping[codes]
+
+
+class FeaturePipeline:
+    """Turns case rows into a sparse float32 feature matrix
+
+    Numeric columns pass through with missing values as 0. Categorical
+    columns with at most one_hot_max_categories values are one-hot encoded,
+    the others replaced by their smoothed mean target. The case creation
+    date adds day of week, day, month and weekend features. Values not seen
+    in fit get all-zero one-hot columns and the global target mean.
+    """
+
+    def __init__(self, categorical_columns: Optional[List[str]] = None,
+                 date_column: Optional[str] = CASE_CREATED_COLUMN,
+                 one_hot_max_categories: int = ONE_HOT_MAX_CATEGORIES,
+                 smoothing: float = TARGET_SMOOTHING):
+        self.categorical_columns = list(CATEGORICAL_FEATURES if categorical_columns is None else categorical_columns)
+        self.date_column = date_column
+        self.one_hot_max_categories = one_hot_max_categories
+        self.smoothing = smoothing
+        self.numeric_columns: List[str] = []
+        self.one_hot: Dict[str, pd.Index] = {}
+        self.target: Dict[str, pd.Index] = {}
+        self.target_encodings: Dict[str, np.ndarray] = {}
+        self.prior = 0.0
+        self.use_dates = False
+        self.fitted = False
+
+    @property
+    def feature_names(self) -> List[str]:
+        """Column names of the transformed matrix, in order"""
+        names = list(self.numeric_columns)
+        names += [f"{col} (target mean)" for col in self.target]
+        if self.use_dates:
+            names += [f"{self.date_column} {part}" for part in DATE_FEATURES]
+        for col, vocabulary in self.one_hot.items():
+            names += [f"{col}={value}" for value in vocabulary]
+        return names
+
+    def fit(self, df: pd.DataFrame, y: pd.Series) -> "FeaturePipeline":
+        """Learn the numeric columns, vocabularies and target encodings from training rows"""
+        target = y.to_numpy(dtype=np.float64)
+        skip = {y.name, self.date_column, *self.categorical_columns}
+        self.numeric_columns = [col for col in df.select_dtypes(include=[np.number]).columns if col not in skip]
+        self.prior = float(target.mean()) if len(target) else 0.0
+        self.use_dates = self.date_column is not None and self.date_column in df.columns
+        self.one_hot, self.target, self.target_encodings = {}, {}, {}
+        for col in self.categorical_columns:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col])
+            if len(uniques) <= self.one_hot_max_categories:
+                self.one_hot[col] = pd.Index(uniques)
+                continue
+            self.target[col] = pd.Index(uniques)
+            sums, counts = self._target_sums(codes, target, len(uniques))
+            self.target_encodings[col] = np.append(self._smooth(sums, counts), self.prior)
+        self.fitted = True
+        return self
+
+    def fit_transform(self, df: pd.DataFrame, y: pd.Series):
+        """Fit, then transform the training rows with out-of-fold target encodings"""
+        return self.fit(df, y).transform_training(df, y)
+
+    def transform_training(self, df: pd.DataFrame, y: pd.Series):
+        """Transform the rows the pipeline was fitted on for model training
+
+        Target encodings are computed out of fold, so no row is encoded with
+        its own target; the fitted state is not changed.
+        """
+        target = y.to_numpy(dtype=np.float64)
+        fold = np.random.default_rng(0).permutation(len(df)) % TARGET_FOLDS
+        encodings = {}
+        for col, vocabulary in self.target.items():
+            codes = category_codes(df[col], vocabulary)
+            sums, counts = self._target_sums(codes, target, len(vocabulary))
+            encoded = np.empty(len(df))
+            for k in range(TARGET_FOLDS):
+                in_fold = fold == k
+                fold_sums, fold_counts = self._target_sums(codes[in_fold], target[in_fold], len(vocabulary))
+                # Each fold's rows are encoded from the statistics of the other folds
+                encoded[in_fold] = np.append(self._smooth(sums - fold_sums, counts - fold_counts),
+                                             self.prior)[codes[in_fold]]
+            encodings[col] = encoded
+        return self._transform(df, target_encodings=encodings)
+
+    @staticmethod
+    def _target_sums(codes: np.ndarray, target: np.ndarray, size: int):
+        known = codes >= 0
+        return (np.bincount(codes[known], weights=target[known], minlength=size),
+                np.bincount(codes[known], minlength=size).astype(np.float64))
+
+    def _smooth(self, sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """Category means shrunk towards the global mean by smoothing rows"""
+        return (sums + self.smoothing * self.prior) / (counts + self.smoothing)
+
+    def _date_features(self, df: pd.DataFrame) -> np.ndarray:
+        days = to_datetime_array(df[self.date_column]).astype('datetime64[D]') if self.date_column in df.columns \
+            else np.full(len(df), np.datetime64('NaT'), dtype='datetime64[D]')
+        missing = np.isnat(days)
+        index = pd.DatetimeIndex(days)
+        # 1970-01-01 was a Thursday, so Monday is 0
+        dayofweek = (days.astype('int64') + 3) % 7
+        features = np.column_stack([dayofweek, index.day, index.month, dayofweek >= 5]).astype(np.float32)
+        features[missing] = 0
+        return features
+
+    def transform(self, df: pd.DataFrame):
+        """Encode rows with the fitted state, as a scipy CSR matrix; never refits"""
+        return self._transform(df)
+
+    def _transform(self, df: pd.DataFrame, target_encodings: Optional[Dict[str, np.ndarray]] = None):
+        import scipy.sparse as sp
+        if not self.fitted:
+            raise ValueError("FeaturePipeline must be fitted before transform")
+        n = len(df)
+        target_encodings = target_encodings or {}
+        dense = [df.reindex(columns=self.numeric_columns).apply(pd.to_numeric, errors='coerce')
+                 .fillna(0).to_numpy(dtype=np.float32)]
+        for col, vocabulary in self.target.items():
+            if col in target_encodings:
+                dense.append(target_encodings[col][:, None])
+            elif col in df.columns:
+                dense.append(self.target_encodings[col][category_codes(df[col], vocabulary)][:, None])
+            else:
+                dense.append(np.full((n, 1), self.prior))
+        if self.use_dates:
+            dense.append(self._date_features(df))
+        blocks = [sp.csr_matrix(np.hstack(dense).astype(np.float32))]
+
+        offset = 0
+        rows, columns = [], []
+        for col, vocabulary in self.one_hot.items():
+            if col in df.columns:
+                codes = category_codes(df[col], vocabulary)
+                known = np.flatnonzero(codes >= 0)
+                rows.append(known)
+                columns.append(codes[known] + offset)
+            offset += len(vocabulary)
+        rows = np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+        columns = np.concatenate(columns) if columns else np.array([], dtype=np.int64)
+        blocks.append(sp.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, columns)), shape=(n, offset)))
+        return sp.hstack(blocks, format='csr')
+
+    def describe(self) -> Dict[str, Any]:
+        """How each input column is encoded"""
+        return {
+            'numeric': self.numeric_columns,
+            'one_hot': {col: len(vocabulary) for col, vocabulary in self.one_hot.items()},
+            'target_encoded': {col: len(vocabulary) for col, vocabulary in self.target.items()},
+            'date_features': [f"{self.date_column} {part}" for part in DATE_FEATURES] if self.use_dates else [],
+            'n_features': len(self.feature_names)
+        }
+
+
+_default_store: Optional[ModelRegistry] = None
+
+
+def get_default_feature_store() -> ModelRegistry:
+    """Get the process-wide store of fitted pipelines configured from the environment"""
+    global _default_store
+    if _default_store is None:
+        _default_store = ModelRegistry(
+            store_dir=os.getenv("FEATURE_STORE_DIR", "./kpi_cache/features"),
+            persist=os.getenv("FEATURE_STORE_PERSIST", "True").lower() == "true"
+        )
+    return _default_store
+
+
+def configure_default_feature_store(**kwargs) -> ModelRegistry:
+    """Replace the process-wide store of fitted pipelines, e.g. from tool configuration"""
+    global _default_store
+    _default_store = ModelRegistry(**kwargs)
+    return _default_store
@@ -0,0 +1,110 @@
+"""Prediction intervals from a vectorized residual bootstrap"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_LEVELS = (0.8, 0.95)
+DEFAULT_PATHS = 2000
+# Simulated values held at once (series x paths x horizon); bounds memory at 8 bytes each
+MAX_SIMULATED_VALUES = 4_000_000
+MAX_PATHS = 10_000
+# Below this many series the process pool costs more than it saves
+PARALLEL_MIN_SERIES = 2000
+
+
+def error_weights(horizon: int, alpha: np.ndarray, beta: np.ndarray, gamma: np.ndarray,
+                  season_length: int = 1) -> np.ndarray:
+    """Weight of the innovation j steps back in the h-step forecast error, per series
+
+    For additive Holt-Winters the weights are 1 for the current step and
+    alpha * (1 + j * beta) + gamma * [j is a multiple of the season] for
+    earlier ones; alpha=1, beta=gamma=0 gives a random walk with drift.
+    Returns a (series x horizon) array.
+    """
+    alpha, beta, gamma = (np.atleast_1d(np.asarray(p, dtype=np.float64))[:, None] for p in (alpha, beta, gamma))
+    j = np.arange(horizon)[None, :]
+    seasonal = (j % season_length == 0) & (j > 0) if season_length > 1 else np.zeros_like(j, dtype=bool)
+    weights = alpha * (1 + j * beta) + gamma * seasonal
+    weights[:, 0] = 1.0
+    return weights
+
+
+def _simulate_chunk(forecasts: np.ndarray, residuals: np.ndarray, weights: np.ndarray,
+                    levels: Sequence[float], n_paths: int, seed: Any) -> Dict[float, np.ndarray]:
+    """Bounds per tail probability for a chunk of series, from n_paths simulated error paths each"""
+    n, horizon = forecasts.shape
+    rng = np.random.default_rng(seed)
+    counts = (~np.isnan(residuals)).sum(axis=1)
+    # Each series draws from its own residuals: NaNs are sorted to the end and never drawn
+    pool = np.sort(residuals, axis=1)
+    draws = (rng.random((n, horizon * n_paths)) * np.maximum(counts, 1)[:, None]).astype(np.int64)
+    innovations = np.take_along_axis(pool, draws, axis=1).reshape(n, horizon, n_paths)
+    innovations[counts == 0] = 0.0
+
+    # errors[:, k] = sum_{j<=k} weights[k - j] * innovations[:, j], as one batched matmul
+    lags = np.arange(horizon)[:, None] - np.arange(horizon)[None, :]
+    kernel = np.where(lags >= 0, weights[:, np.clip(lags, 0, None)], 0.0)
+    errors = np.sort(kernel @ innovations, axis=2)
+
+    # Linear interpolation between order statistics, as np.quantile does
+    tails = sorted({q for level in levels for q in ((1 - level) / 2, (1 + level) / 2)})
+    bounds = {}
+    for q in tails:
+        position = q * (n_paths - 1)
+        below = int(np.floor(position))
+        above = min(below + 1, n_paths - 1)
+        fraction = position - below
+        bounds[q] = forecasts + (1 - fraction) * errors[:, :, below] + fraction * errors[:, :, above]
+    return bounds
+
+
+def _simulate_chunk_worker(args):
+    return _simulate_chunk(*args)
+
+
+def bootstrap_intervals(forecasts: np.ndarray, residuals: np.ndarray, weights: np.ndarray,
+                        levels: Sequence[float] = DEFAULT_LEVELS, n_paths: int = DEFAULT_PATHS,
+                        seed: int = 42, workers: Optional[int] = None,
+                        lower_bound: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Prediction intervals for many series by resampling their one-step residuals
+
+    forecasts is (series x horizon), residuals (series x time, NaN where
+    unavailable) and weights the error_weights() of each series' model.
+    Every series gets n_paths simulated error paths as one array; series are
+    processed in chunks of at most MAX_SIMULATED_VALUES simulated values,
+    which bounds memory, and with workers > 1 the chunks run on a process
+    pool. Chunks are seeded by position, so results do not depend on workers.
+
+    Returns, per level, {'level', 'lower', 'upper'} with (series x horizon)
+    arrays, clipped below at lower_bound when given.
+    """
+    forecasts = np.atleast_2d(np.asarray(forecasts, dtype=np.float64))
+    residuals = np.atleast_2d(np.asarray(residuals, dtype=np.float64))
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    for level in levels:
+        if not 0 < level < 1:
+            raise ValueError(f"Coverage levels must be between 0 and 1, got {level}")
+    n, horizon = forecasts.shape
+    n_paths = int(min(max(n_paths, 1), MAX_PATHS))
+    chunk = max(1, MAX_SIMULATED_VALUES // (n_paths * max(horizon, 1)))
+    tasks = [(forecasts[i:i + chunk], residuals[i:i + chunk], weights[i:i + chunk], levels, n_paths, [seed, i])
+             for i in range(0, n, chunk)]
+
+    if workers is None:
+        workers = min(os.cpu_count() or 1, len(tasks)) if n >= PARALLEL_MIN_SERIES else 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_simulate_chunk_worker, tasks))
+    else:
+        parts = [_simulate_chunk(*task) for task in tasks]
+
+    intervals = []
+    for level in levels:
+        lower = np.concatenate([part[(1 - level) / 2] for part in parts])
+        upper = np.concatenate([part[(1 + level) / 2] for part in parts])
+        if lower_bound is not None:
+            lower, upper = np.maximum(lower, lower_bound), np.maximum(upper, lower_bound)
+        intervals.append({'level': level, 'lower': lower, 'upper': upper})
+    return intervals
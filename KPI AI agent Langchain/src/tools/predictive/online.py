@@ -0,0 +1,238 @@
+"""Incrementally updated forecasters that learn from new case rows only"""
+import os
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..data.dates import CASE_CREATED_COLUMN, to_datetime_array
+from .backtest import regression_metrics
+from .features import FeaturePipeline
+from .registry import ModelRegistry
+from .timeseries import FREQUENCIES, build_case_series, group_keys, holt_winters_batch, holt_winters_forecast, \
+    holt_winters_update
+
+# Smoothing parameters of series first seen in an update, before they have history to tune on
+NEW_SERIES_PARAMS = (0.3, 0.05, 0.2)
+
+
+def _days(df: pd.DataFrame, date_column: str) -> np.ndarray:
+    if date_column not in df.columns:
+        raise ValueError(f"Date column {date_column} not found in data")
+    return to_datetime_array(df[date_column]).astype('datetime64[D]')
+
+
+def _period_index(days: np.ndarray, start: np.datetime64, freq: str) -> np.ndarray:
+    """Period number of each day counted from start; -1 for missing dates"""
+    if freq == 'week':
+        days = days - ((days.astype('int64') + 3) % 7).astype('timedelta64[D]')
+    index = (days - start).astype('int64') // FREQUENCIES[freq][0]
+    return np.where(np.isnat(days), -1, index)
+
+
+class OnlineVolumeForecaster:
+    """Holt-Winters states per group that are advanced with each new period of cases
+
+    The state stops at a watermark, the last complete period ingested.
+    The latest period in any batch may still be filling up, so it is held
+    back until a later batch contains a newer period. An update therefore
+    accepts the full current export or any rows covering every period
+    after the watermark; older rows are ignored, so re-sending a file
+    is harmless.
+    """
+
+    def __init__(self, group_by: Sequence[str], freq: str, keys: List[tuple], start: np.datetime64,
+                 watermark: int, state: Dict[str, np.ndarray], phase: int):
+        self.group_by = list(group_by)
+        self.freq = freq
+        self.keys = keys
+        self.key_rows = {key: i for i, key in enumerate(keys)}
+        self.start = start
+        self.watermark = watermark
+        self.state = state
+        self.phase = phase
+        self.rows_ingested = 0
+        self.updates = 0
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, group_by: Sequence[str] = (), freq: str = 'day',
+                     season_length: Optional[int] = None,
+                     date_column: str = CASE_CREATED_COLUMN) -> "OnlineVolumeForecaster":
+        """Fit every series on the complete periods of a history export"""
+        series = build_case_series(df, group_by=group_by, freq=freq, date_column=date_column)
+        if series.values.shape[1] < 2:
+            raise ValueError("Need at least two periods of dated cases to start an online forecast")
+        season_length = FREQUENCIES[freq][1] if season_length is None else season_length
+        # The last period may be incomplete; it is ingested once a later period appears
+        complete = series.values[:, :-1]
+        fit = holt_winters_batch(complete, season_length=season_length, horizon=1)
+        keys = list(series.keys.itertuples(index=False, name=None)) if group_by else [()]
+        state = {name: np.array(fit[name], dtype=np.float64)
+                 for name in ('level', 'trend', 'seasonal', 'alpha', 'beta', 'gamma')}
+        forecaster = cls(group_by, freq, keys, series.periods[0], complete.shape[1] - 1, state,
+                         complete.shape[1] % fit['season_length'])
+        forecaster.rows_ingested = int(complete.sum())
+        return forecaster
+
+    def _add_series(self, keys: List[tuple]) -> None:
+        """Start new groups at zero volume with default smoothing parameters"""
+        for key in keys:
+            self.key_rows[key] = len(self.keys)
+            self.keys.append(key)
+        n, m = len(keys), self.state['seasonal'].shape[1]
+        for name, values in (('level', np.zeros(n)), ('trend', np.zeros(n)), ('seasonal', np.zeros((n, m))),
+                             ('alpha', np.full(n, NEW_SERIES_PARAMS[0])), ('beta', np.full(n, NEW_SERIES_PARAMS[1])),
+                             ('gamma', np.full(n, NEW_SERIES_PARAMS[2]))):
+            self.state[name] = np.concatenate([self.state[name], values])
+
+    def update(self, df: pd.DataFrame, date_column: str = CASE_CREATED_COLUMN) -> Dict[str, Any]:
+        """Advance the states over the complete periods after the watermark"""
+        periods = _period_index(_days(df, date_column), self.start, self.freq)
+        latest = int(periods.max()) if len(periods) else -1
+        new = (periods > self.watermark) & (periods < latest)
+        n_periods = max(latest - self.watermark - 1, 0)
+        if not new.any() or n_periods == 0:
+            return {'periods_added': 0, 'rows_used': 0, 'new_series': 0}
+
+        if self.group_by:
+            codes, key_frame = group_keys(df[new], self.group_by, sort=False)
+            keys = list(key_frame.itertuples(index=False, name=None))
+            unseen = [key for key in keys if key not in self.key_rows]
+            self._add_series(unseen)
+            rows = np.array([self.key_rows[key] for key in keys], dtype=np.int64)[codes]
+        else:
+            unseen, rows = [], np.zeros(int(new.sum()), dtype=np.int64)
+
+        offsets = periods[new] - self.watermark - 1
+        counts = np.bincount(rows * n_periods + offsets, minlength=len(self.keys) * n_periods)
+        values = counts.reshape(len(self.keys), n_periods).astype(np.float64)
+        state = self.state
+        state['level'], state['trend'], state['seasonal'], self.phase = holt_winters_update(
+            values, state['level'], state['trend'], state['seasonal'], self.phase,
+            state['alpha'], state['beta'], state['gamma'])
+        self.watermark += n_periods
+        self.rows_ingested += int(new.sum())
+        self.updates += 1
+        return {'periods_added': n_periods, 'rows_used': int(new.sum()), 'new_series': len(unseen)}
+
+    def forecast(self, horizon: int = 14) -> Dict[str, Any]:
+        """Forecasts for every series from the current state, without touching any rows"""
+        forecasts = np.clip(holt_winters_forecast(self.state['level'], self.state['trend'],
+                                                  self.state['seasonal'], self.phase, horizon), 0, None)
+        step = np.timedelta64(FREQUENCIES[self.freq][0], 'D')
+        first = self.start + (self.watermark + 1) * step
+        return {
+            'freq': self.freq,
+            'group_by': self.group_by,
+            'forecast_periods': [str(first + i * step) for i in range(horizon)],
+            'series': [{'key': dict(zip(self.group_by, key)), 'forecast': [round(float(v), 3) for v in row]}
+                       for key, row in zip(self.keys, forecasts)]
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        step = np.timedelta64(FREQUENCIES[self.freq][0], 'D')
+        return {'kind': 'volume', 'series': len(self.keys), 'freq': self.freq, 'group_by': self.group_by,
+                'watermark': str(self.start + self.watermark * step), 'rows_ingested': self.rows_ingested,
+                'updates': self.updates}
+
+
+class OnlineRegressor:
+    """Linear SGD model over FeaturePipeline features, trained with partial_fit on new rows
+
+    The pipeline and feature scaling are fitted on the first batch and then
+    fixed, so every update only encodes and learns from its new rows. Rows
+    are taken up to the watermark day as in OnlineVolumeForecaster.
+    """
+
+    def __init__(self, target_column: str, pipeline: FeaturePipeline, scaler, model, watermark: np.datetime64,
+                 date_column: str = CASE_CREATED_COLUMN):
+        self.target_column = target_column
+        self.pipeline = pipeline
+        self.scaler = scaler
+        self.model = model
+        self.watermark = watermark
+        self.date_column = date_column
+        self.rows_ingested = 0
+        self.updates = 0
+
+    def _complete_rows(self, df: pd.DataFrame, after: Optional[np.datetime64]) -> Tuple[pd.DataFrame, np.datetime64]:
+        """Rows with a target, dated after the watermark and before the latest (possibly partial) day"""
+        days = _days(df, self.date_column)
+        latest = days[~np.isnat(days)].max() if (~np.isnat(days)).any() else None
+        if latest is None:
+            return df.iloc[:0], after
+        keep = (days < latest) & df[self.target_column].notna().to_numpy()
+        if after is not None:
+            keep &= days > after
+        return df[keep], latest - np.timedelta64(1, 'D')
+
+    @classmethod
+    def from_rows(cls, df: pd.DataFrame, target_column: str,
+                  date_column: str = CASE_CREATED_COLUMN) -> "OnlineRegressor":
+        """Fit the pipeline, scaling and an initial SGD model on a first batch"""
+        from sklearn.linear_model import SGDRegressor
+        from sklearn.preprocessing import MaxAbsScaler
+        if target_column not in df.columns:
+            raise ValueError(f"Target column {target_column} not found in data")
+        regressor = cls(target_column, FeaturePipeline(), MaxAbsScaler(),
+                        SGDRegressor(random_state=42), None, date_column=date_column)
+        rows, watermark = regressor._complete_rows(df, None)
+        if rows.empty:
+            raise ValueError("Need rows with a target before the latest day to start an online model")
+        y = rows[target_column].to_numpy(dtype=np.float64)
+        X = regressor.scaler.fit_transform(regressor.pipeline.fit_transform(rows, rows[target_column]))
+        # The first batch is fitted to convergence; updates then take one pass over their rows
+        regressor.model.fit(X, y)
+        regressor.watermark = watermark
+        regressor.rows_ingested = len(rows)
+        return regressor
+
+    def _features(self, df: pd.DataFrame):
+        return self.scaler.transform(self.pipeline.transform(df))
+
+    def update(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Score the new rows with the current model, then learn from them
+
+        The scores before learning are an honest estimate of accuracy on
+        unseen rows (test-then-train).
+        """
+        rows, watermark = self._complete_rows(df, self.watermark)
+        if rows.empty:
+            return {'rows_used': 0}
+        X = self._features(rows)
+        y = rows[self.target_column].to_numpy(dtype=np.float64)
+        before = regression_metrics(y, self.model.predict(X))
+        self.model.partial_fit(X, y)
+        self.watermark = max(self.watermark, watermark)
+        self.rows_ingested += len(rows)
+        self.updates += 1
+        return {'rows_used': len(rows), 'metrics_before_update': before}
+
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        return self.model.predict(self._features(df))
+
+    def describe(self) -> Dict[str, Any]:
+        return {'kind': 'regression', 'target_column': self.target_column, 'watermark': str(self.watermark),
+                'rows_ingested': self.rows_ingested, 'updates': self.updates,
+                'features': len(self.pipeline.feature_names)}
+
+
+_default_store: Optional[ModelRegistry] = None
+
+
+def get_default_online_store() -> ModelRegistry:
+    """Get the process-wide store of online model states configured from the environment"""
+    global _default_store
+    if _default_store is None:
+        _default_store = ModelRegistry(
+            store_dir=os.getenv("ONLINE_STORE_DIR", "./kpi_cache/online"),
+            persist=os.getenv("ONLINE_STORE_PERSIST", "True").lower() == "true"
+        )
+    return _default_store
+
+
+def configure_default_online_store(**kwargs) -> ModelRegistry:
+    """Replace the process-wide store of online model states, e.g. from tool configuration"""
+    global _default_store
+    _default_store = ModelRegistry(**kwargs)
+    return _default_store
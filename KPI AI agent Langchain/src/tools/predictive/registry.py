@@ -0,0 +1,214 @@
+"""Persistent registry of fitted predictive models"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .backends import predict
+
+logger = logging.getLogger(__name__)
+
+MODEL_FORMAT_VERSION = 1
+
+
+@dataclass
+class ModelRecord:
+    """Metadata stored next to a fitted model"""
+    model_id: str
+    target_column: str
+    feature_columns: List[str]
+    data_fingerprint: str
+    model_type: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    results: Dict[str, Any] = field(default_factory=dict)
+    train_seconds: float = 0.0
+    trained_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def describe(self) -> Dict[str, Any]:
+        """Metadata without the stored evaluation output"""
+        info = asdict(self)
+        info.pop('results')
+        info['model_performance'] = self.results.get('model_performance')
+        return info
+
+
+class ModelRegistry:
+    """Fitted models kept in memory and persisted with joblib, keyed by model id
+
+    A model id is derived from the training data fingerprint, target,
+    feature list, model type and parameters, so an identical training
+    request returns the stored model instead of fitting a new one.
+    """
+
+    def __init__(self, store_dir: str = "./kpi_cache/models", max_models: int = 16,
+                 persist: bool = True):
+        self.store_dir = store_dir
+        self.max_models = max_models
+        self.persist = persist
+        self._models: "OrderedDict[str, Tuple[Any, ModelRecord]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'trains': 0, 'refreshes': 0, 'memory_hits': 0, 'disk_hits': 0}
+
+    @staticmethod
+    def make_model_id(data_fingerprint: str, target_column: str, feature_columns: List[str],
+                      model_type: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Deterministic id for a training request"""
+        payload = json.dumps({
+            'version': MODEL_FORMAT_VERSION,
+            'data': data_fingerprint,
+            'target': target_column,
+            'features': list(feature_columns),
+            'model_type': model_type,
+            'params': params or {}
+        }, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=12).hexdigest()
+
+    def _paths(self, model_id: str) -> Tuple[str, str]:
+        base = os.path.join(self.store_dir, model_id)
+        return f"{base}.joblib", f"{base}.json"
+
+    def _remember(self, model: Any, record: ModelRecord) -> None:
+        with self._lock:
+            self._models[record.model_id] = (model, record)
+            self._models.move_to_end(record.model_id)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+
+    def _read(self, model_id: str) -> Optional[Tuple[Any, ModelRecord]]:
+        """Load a persisted model, ignoring missing or unreadable files"""
+        import joblib
+        model_path, meta_path = self._paths(model_id)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            if meta.get('version') != MODEL_FORMAT_VERSION:
+                return None
+            return joblib.load(model_path), ModelRecord(**meta['record'])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable model {model_id}: {e}")
+            return None
+
+    def _write(self, model: Any, record: ModelRecord) -> None:
+        """Persist the model, then its metadata, each written atomically"""
+        import joblib
+        os.makedirs(self.store_dir, exist_ok=True)
+        model_path, meta_path = self._paths(record.model_id)
+        for path, write in [
+            (model_path, lambda tmp: joblib.dump(model, tmp)),
+            (meta_path, lambda tmp: self._dump_meta(record, tmp))
+        ]:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            write(tmp_path)
+            os.replace(tmp_path, path)
+
+    @staticmethod
+    def _dump_meta(record: ModelRecord, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump({'version': MODEL_FORMAT_VERSION, 'record': asdict(record)}, f, default=str)
+
+    def get(self, model_id: str) -> Optional[Tuple[Any, ModelRecord]]:
+        """Return a stored model and its record, from memory or disk"""
+        with self._lock:
+            if model_id in self._models:
+                self._models.move_to_end(model_id)
+                self.stats['memory_hits'] += 1
+                return self._models[model_id]
+        loaded = self._read(model_id) if self.persist else None
+        if loaded is not None:
+            self._remember(*loaded)
+            with self._lock:
+                self.stats['disk_hits'] += 1
+        return loaded
+
+    def put(self, model: Any, record: ModelRecord) -> None:
+        """Store a fitted model in memory and, with persistence, on disk"""
+        self._remember(model, record)
+        if self.persist:
+            self._write(model, record)
+
+    def get_or_train(self, model_id: str, train: Callable[[], Tuple[Any, ModelRecord]],
+                     refresh: bool = False) -> Tuple[Any, ModelRecord, bool]:
+        """Return the stored model for an id, training it if missing or refresh is set
+
+        Returns the model, its record and whether it was trained now.
+        """
+        if not refresh:
+            stored = self.get(model_id)
+            if stored is not None:
+                return stored[0], stored[1], False
+        model, record = train()
+        self.put(model, record)
+        with self._lock:
+            self.stats['trains'] += 1
+            if refresh:
+                self.stats['refreshes'] += 1
+        return model, record, True
+
+    def predict(self, model_id: str, df: pd.DataFrame) -> Tuple[np.ndarray, ModelRecord]:
+        """Predict new rows with a stored model, without retraining
+
+        Rows are aligned to the model's feature list; missing features and
+        values are filled with 0 as in training.
+        """
+        stored = self.get(model_id)
+        if stored is None:
+            raise KeyError(f"Unknown model id: {model_id}")
+        model, record = stored
+        X = df.reindex(columns=record.feature_columns).apply(pd.to_numeric, errors='coerce').fillna(0)
+        return predict(model, X.to_numpy(dtype=np.float32)), record
+
+    def list_models(self) -> List[Dict[str, Any]]:
+        """Describe every stored model, in memory or on disk"""
+        with self._lock:
+            records = {model_id: record for model_id, (_, record) in self._models.items()}
+        if self.persist and os.path.isdir(self.store_dir):
+            for name in os.listdir(self.store_dir):
+                model_id = name[:-len('.json')] if name.endswith('.json') else None
+                if model_id and model_id not in records:
+                    try:
+                        with open(os.path.join(self.store_dir, name), 'r') as f:
+                            records[model_id] = ModelRecord(**json.load(f)['record'])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        return sorted((record.describe() for record in records.values()), key=lambda r: r['trained_at'])
+
+    def remove(self, model_id: str) -> bool:
+        """Delete a model from memory and disk"""
+        with self._lock:
+            removed = self._models.pop(model_id, None) is not None
+        for path in self._paths(model_id):
+            if os.path.exists(path):
+                os.remove(path)
+                removed = True
+        return removed
+
+
+_default_registry: Optional[ModelRegistry] = None
+
+
+def get_default_model_registry() -> ModelRegistry:
+    """Get the process-wide model registry configured from the environment"""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ModelRegistry(
+            store_dir=os.getenv("MODEL_STORE_DIR", "./kpi_cache/models"),
+            persist=os.getenv("MODEL_STORE_PERSIST", "True").lower() == "true"
+        )
+    return _default_registry
+
+
+def configure_default_model_registry(**kwargs) -> ModelRegistry:
+    """Replace the process-wide model registry, e.g. from tool configuration"""
+    global _default_registry
+    _default_registry = ModelRegistry(**kwargs)
+    return _default_registry
@@ -0,0 +1,244 @@
+"""Batch exponential-smoothing forecasts for many case-volume series at once"""
+import itertools
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..data.dates import CASE_CREATED_COLUMN, to_datetime_array
+from .intervals import DEFAULT_LEVELS, DEFAULT_PATHS, bootstrap_intervals, error_weights
+
+# Series grain -> days per step and default seasonal period in steps
+FREQUENCIES = {'day': (1, 7), 'week': (7, 1)}
+# Smoothing parameter grid searched for every series in one vectorized pass
+ALPHAS = (0.1, 0.3, 0.5, 0.8)
+BETAS = (0.0, 0.05, 0.2)
+GAMMAS = (0.05, 0.2, 0.5)
+# Key of the group of rows with no value in a group column
+MISSING_KEY = '(missing)'
+
+
+@dataclass
+class CaseSeries:
+    """Case counts as a (series x period) matrix on a shared calendar"""
+    keys: pd.DataFrame
+    periods: np.ndarray
+    values: np.ndarray
+    freq: str
+
+
+def group_keys(df: pd.DataFrame, group_by: Sequence[str], sort: bool = True) -> Tuple[np.ndarray, pd.DataFrame]:
+    """Integer group code of every row and the key columns of each group
+
+    Rows missing a group value form their own group, keyed MISSING_KEY, so
+    every row is counted and keys compare equal across calls.
+    """
+    grouped = df.groupby(list(group_by), observed=True, sort=sort, dropna=False)
+    codes = grouped.ngroup().to_numpy().astype(np.int64)
+    keys = grouped.size().index.to_frame(index=False).astype(object)
+    return codes, keys.where(keys.notna(), MISSING_KEY)
+
+
+def build_case_series(df: pd.DataFrame, group_by: Sequence[str] = (), freq: str = 'day',
+                      date_column: str = CASE_CREATED_COLUMN) -> CaseSeries:
+    """Count cases per group and day or ISO week, with zero-filled gaps
+
+    Each row is mapped to a (group code, period index) cell and counted
+    with one bincount, so building thousands of series costs one pass.
+    Weeks start on Monday; rows missing a group value are counted under
+    MISSING_KEY.
+    """
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency: {freq}. Use one of {list(FREQUENCIES)}")
+    if date_column not in df.columns:
+        raise ValueError(f"Date column {date_column} not found in data")
+    days = to_datetime_array(df[date_column]).astype('datetime64[D]')
+    valid = ~np.isnat(days)
+    group_by = list(group_by)
+    if group_by:
+        codes, keys = group_keys(df, group_by)
+    else:
+        codes = np.zeros(len(df), dtype=np.int64)
+        keys = pd.DataFrame(index=[0])
+    if not valid.any():
+        return CaseSeries(keys.iloc[:0], np.array([], dtype='datetime64[D]'), np.zeros((0, 0)), freq)
+
+    days, codes = days[valid], codes[valid]
+    if freq == 'week':
+        # 1970-01-01 was a Thursday; shift so periods start on Monday
+        days = days - ((days.astype('int64') + 3) % 7).astype('timedelta64[D]')
+    step = FREQUENCIES[freq][0]
+    start = days.min()
+    index = ((days - start).astype('int64') // step)
+    n_periods = int(index.max()) + 1
+    n_series = int(codes.max()) + 1
+    counts = np.bincount(codes * n_periods + index, minlength=n_series * n_periods)
+    periods = start + np.arange(n_periods) * np.timedelta64(step, 'D')
+    return CaseSeries(keys.iloc[:n_series], periods, counts.reshape(n_series, n_periods).astype(np.float64), freq)
+
+
+def _initial_state(values: np.ndarray, season_length: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Level, trend and seasonal indices from the first two seasons"""
+    m = season_length
+    first = values[:, :m].mean(axis=1)
+    if values.shape[1] >= 2 * m:
+        trend = (values[:, m:2 * m].mean(axis=1) - first) / m
+    else:
+        trend = np.zeros(len(values))
+    seasonal = values[:, :m] - first[:, None] if m > 1 else np.zeros((len(values), 1))
+    return first, trend, seasonal
+
+
+def _smooth(values: np.ndarray, season_length: int, alpha: np.ndarray, beta: np.ndarray,
+            gamma: np.ndarray, residuals: Optional[np.ndarray] = None):
+    """Run additive Holt-Winters over time for a (series x candidates) parameter array
+
+    Returns the final level, trend and seasonal state and the one-step
+    squared error per (series, candidate); fills residuals (series x time)
+    when given, which needs a single candidate per series.
+    """
+    n, t = values.shape
+    m = season_length
+    k = alpha.shape[1]
+    level0, trend0, seasonal0 = _initial_state(values, m)
+    level = np.repeat(level0[:, None], k, axis=1)
+    trend = np.repeat(trend0[:, None], k, axis=1)
+    seasonal = np.repeat(seasonal0[:, :, None], k, axis=2)
+    sse = np.zeros((n, k))
+    for step in range(t):
+        season = seasonal[:, step % m, :]
+        observed = values[:, step][:, None]
+        error = observed - (level + trend + season)
+        if residuals is not None:
+            residuals[:, step] = error[:, 0]
+        sse += error * error
+        new_level = alpha * (observed - season) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        seasonal[:, step % m, :] = gamma * (observed - new_level) + (1 - gamma) * season
+        level = new_level
+    return level, trend, seasonal, sse
+
+
+def holt_winters_batch(values: np.ndarray, season_length: int = 7, horizon: int = 14,
+                       alphas: Sequence[float] = ALPHAS, betas: Sequence[float] = BETAS,
+                       gammas: Sequence[float] = GAMMAS) -> Dict[str, np.ndarray]:
+    """Additive Holt-Winters fitted to every row of a (series x time) matrix
+
+    Every series is run with every (alpha, beta, gamma) combination as one
+    (series x combinations) array per time step, so the only Python loop is
+    over time. Each series keeps the combination with the lowest one-step
+    squared error and is re-run once with it to record its residuals.
+    season_length=1, or series shorter than two seasons, give Holt's linear
+    trend method.
+
+    Returns forecasts (series x horizon), the one-step residuals of the
+    chosen fit (series x time), rmse, the chosen parameters and final state.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n, t = values.shape
+    m = max(1, season_length)
+    if m > 1 and t < 2 * m:
+        m = 1
+    grid = np.array(list(itertools.product(alphas, betas, gammas if m > 1 else (0.0,))))
+    _, _, _, sse = _smooth(values, m, *(grid[:, i][None, :] for i in range(3)))
+
+    best = np.argmin(sse, axis=1)
+    chosen = grid[best]
+    residuals = np.empty((n, t))
+    level, trend, seasonal, best_sse = _smooth(values, m, *(chosen[:, i][:, None] for i in range(3)),
+                                               residuals=residuals)
+    level, trend, seasonal = level[:, 0], trend[:, 0], seasonal[:, :, 0]
+    return {
+        'forecasts': holt_winters_forecast(level, trend, seasonal, t % m, horizon),
+        'residuals': residuals,
+        'rmse': np.sqrt(best_sse[:, 0] / max(t, 1)),
+        'alpha': chosen[:, 0],
+        'beta': chosen[:, 1],
+        'gamma': chosen[:, 2],
+        'season_length': m,
+        'level': level,
+        'trend': trend,
+        'seasonal': seasonal
+    }
+
+
+def holt_winters_update(values: np.ndarray, level: np.ndarray, trend: np.ndarray, seasonal: np.ndarray,
+                        phase: int, alpha: np.ndarray, beta: np.ndarray, gamma: np.ndarray):
+    """Continue fitted Holt-Winters states over new (series x period) values
+
+    Costs one vectorized step per new period, independent of the history
+    length. phase is the seasonal index of the first new period. Returns the
+    new level, trend, seasonal state (seasonal is updated in place) and phase.
+    """
+    m = seasonal.shape[1]
+    rows = np.arange(len(values))
+    for step in range(values.shape[1]):
+        index = (phase + step) % m
+        season = seasonal[rows, index]
+        observed = values[:, step]
+        new_level = alpha * (observed - season) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        seasonal[rows, index] = gamma * (observed - new_level) + (1 - gamma) * season
+        level = new_level
+    return level, trend, seasonal, (phase + values.shape[1]) % m
+
+
+def holt_winters_forecast(level: np.ndarray, trend: np.ndarray, seasonal: np.ndarray, phase: int,
+                          horizon: int) -> np.ndarray:
+    """Forecasts (series x horizon) from Holt-Winters states"""
+    steps = np.arange(1, horizon + 1)
+    return level[:, None] + trend[:, None] * steps[None, :] + seasonal[:, (phase + steps - 1) % seasonal.shape[1]]
+
+
+def forecast_case_volumes(df: pd.DataFrame, group_by: Sequence[str] = (), freq: str = 'day',
+                          horizon: int = 14, season_length: Optional[int] = None,
+                          max_series: Optional[int] = None, levels: Sequence[float] = DEFAULT_LEVELS,
+                          n_paths: int = DEFAULT_PATHS, workers: Optional[int] = None) -> Dict[str, Any]:
+    """Forecast case counts per group from case creation dates
+
+    Each forecast comes with bootstrap prediction intervals at the given
+    coverage levels (none for levels=()). max_series limits the output (not
+    the fit) to the highest-volume series; intervals are only simulated for
+    the series returned.
+    """
+    series = build_case_series(df, group_by=group_by, freq=freq)
+    if series.values.size == 0:
+        raise ValueError("No dated cases to forecast")
+    season_length = FREQUENCIES[freq][1] if season_length is None else season_length
+    fit = holt_winters_batch(series.values, season_length=season_length, horizon=horizon)
+    forecasts = np.clip(fit['forecasts'], 0, None)
+
+    order = np.argsort(-series.values.sum(axis=1), kind='stable')
+    if max_series is not None:
+        order = order[:max_series]
+    m = fit['season_length']
+    # The first season only initialises the seasonal state, so its errors say little
+    residuals = fit['residuals'][order, m:] if fit['residuals'].shape[1] > 2 * m else fit['residuals'][order]
+    weights = error_weights(horizon, fit['alpha'][order], fit['beta'][order], fit['gamma'][order], m)
+    intervals = bootstrap_intervals(forecasts[order], residuals, weights, levels=levels, n_paths=n_paths,
+                                    workers=workers, lower_bound=0.0) if levels else []
+    step = np.timedelta64(FREQUENCIES[freq][0], 'D')
+    future = series.periods[-1] + np.arange(1, horizon + 1) * step
+    records = []
+    for row, i in enumerate(order):
+        records.append({
+            'key': {col: series.keys.iloc[i][col] for col in series.keys.columns},
+            'history_total': int(series.values[i].sum()),
+            'forecast': [round(float(v), 3) for v in forecasts[i]],
+            'intervals': [{'level': iv['level'], 'lower': [round(float(v), 3) for v in iv['lower'][row]],
+                           'upper': [round(float(v), 3) for v in iv['upper'][row]]} for iv in intervals],
+            'rmse': round(float(fit['rmse'][i]), 4),
+            'params': {'alpha': float(fit['alpha'][i]), 'beta': float(fit['beta'][i]),
+                       'gamma': float(fit['gamma'][i])}
+        })
+    return {
+        'freq': freq,
+        'group_by': list(group_by),
+        'season_length': fit['season_length'],
+        'history': {'start': str(series.periods[0]), 'end': str(series.periods[-1]),
+                    'periods': len(series.periods)},
+        'forecast_periods': [str(p) for p in future],
+        'series_count': len(series.values),
+        'series': records
+    }
@@ -1,40 +1,130 @@
 """LangChain tool for predictive analysis"""
 from langchain.tools import BaseTool
 from langchain.callbacks.manager import CallbackManagerForToolRun
-import pandas as pd
+from typing import Optional
 import json
 
+from ..data.registry import dataset_registry, dataframe_fingerprint
+from ..result_cache import get_default_result_cache
 from .core import PredictiveAnalyzer
+from .intervals import DEFAULT_LEVELS
 
 class PredictiveAnalysisTool(BaseTool):
     """LangChain tool for predictive analysis"""
     
     name = "predictive_analysis"
-    description = "Performs predictive analysis and forecasting on KPI data"
+    description = (
+        "Performs predictive analysis and forecasting on KPI data. data_json is a "
+        "dataset handle from data_retrieval (e.g. 'ds:cases_Q4_2024') or JSON records. "
+        "analysis_type 'model' trains a model for target_column, or returns the stored "
+        "one for the same data (refresh=True retrains), and reports its model_id; with "
+        "features='encoded' it also uses Problem Code, Product Family, Model Name, Origin, "
+        "Agreement Type and case date features; backend is 'random_forest' (default), "
+        "'hist_gradient_boosting' (fastest for large data) or 'linear', and time_budget "
+        "caps training seconds; "
+        "'predict' scores the rows in data_json with a stored model_id; 'models' lists "
+        "stored models; 'volume_forecast' forecasts case counts for the next horizon "
+        "periods per group of level (e.g. 'call_center' or 'call_center,Problem Code "
+        "Category'; empty for the total) at grain 'day' or 'week'. Forecasts include "
+        "prediction intervals at the comma-separated coverage levels in coverage (default "
+        "'0.8,0.95'). 'backtest' scores the target_column model on folds time-ordered by "
+        "Case Created On Date; split is 'expanding' or 'rolling'. 'online_update' starts an "
+        "online model on data_json (a volume forecaster per level, or an incrementally "
+        "trained linear model for target_column) and returns its model_id; called again "
+        "with that model_id it learns from the new rows only and, for volumes, returns "
+        "the updated forecast (data_json may be empty to forecast without updating)"
+    )
     
     def _run(
         self,
         data_json: str,
-        target_column: str,
+        target_column: Optional[str] = None,
         analysis_type: str = "forecast",
+        model_id: Optional[str] = None,
+        refresh: bool = False,
+        level: Optional[str] = None,
+        grain: str = "day",
+        horizon: int = 14,
+        coverage: Optional[str] = None,
+        folds: int = 5,
+        split: str = "expanding",
+        features: str = "numeric",
+        backend: str = "random_forest",
+        time_budget: Optional[float] = None,
         run_manager: Optional[CallbackManagerForToolRun] = None
     ) -> str:
-        """Execute predictive analysis"""
+        """Execute predictive analysis, reusing the result of an identical earlier call"""
+        if analysis_type == "models":
+            # The model store changes independently of any dataset
+            return json.dumps(PredictiveAnalyzer.list_models(), indent=2, default=str)
+        if analysis_type == "online_update":
+            # Online models change with every call, so their results are never reused
+            return self._analyze(data_json, target_column, analysis_type, model_id, refresh, level, grain, horizon)
+        return get_default_result_cache().get_or_run(
+            self.name, [data_json],
+            {'target_column': target_column, 'analysis_type': analysis_type, 'model_id': model_id,
+             'level': level, 'grain': grain, 'horizon': horizon, 'coverage': coverage,
+             'folds': folds, 'split': split, 'features': features,
+             'backend': backend, 'time_budget': time_budget,
+             # Online models change under the same id; their version keeps predictions current
+             'model_version': PredictiveAnalyzer.model_version(model_id) if analysis_type == "predict" else None},
+            lambda: self._analyze(data_json, target_column, analysis_type, model_id, refresh,
+                                  level, grain, horizon, coverage, folds, split, features, backend,
+                                  time_budget),
+            refresh=refresh
+        )
+    
+    def _analyze(self, data_json: str, target_column: Optional[str], analysis_type: str,
+                 model_id: Optional[str] = None, refresh: bool = False, level: Optional[str] = None,
+                 grain: str = "day", horizon: int = 14, coverage: Optional[str] = None,
+                 folds: int = 5, split: str = "expanding", features: str = "numeric",
+                 backend: str = "random_forest", time_budget: Optional[float] = None) -> str:
+        """Run the requested analysis"""
         try:
-            # Parse data
-            data = json.loads(data_json)
-            df = pd.DataFrame(data)
+            coverage_levels = tuple(float(part) for part in coverage.split(',')) if coverage else DEFAULT_LEVELS
+            if analysis_type == "predict":
+                if not model_id:
+                    return "predict needs the model_id returned by analysis_type='model'"
+                results = PredictiveAnalyzer.predict_with_model(model_id, dataset_registry.resolve(data_json))
+                return json.dumps(results, indent=2)
+            if analysis_type == "online_update":
+                group_levels = [part.strip() for part in level.split(',') if part.strip()] if level else []
+                df = dataset_registry.resolve(data_json) if data_json else None
+                results = PredictiveAnalyzer.online_update(df, model_id=model_id, target_column=target_column,
+                                                           levels=group_levels, grain=grain, horizon=int(horizon))
+                return json.dumps(results, indent=2, default=str)
+            if analysis_type == "volume_forecast":
+                group_levels = [part.strip() for part in level.split(',') if part.strip()] if level else []
+                results = PredictiveAnalyzer.forecast_case_volumes(dataset_registry.resolve(data_json), group_levels,
+                                                                   grain=grain, horizon=int(horizon),
+                                                                   coverage=coverage_levels)
+                return json.dumps(results, indent=2, default=str)
+            if not target_column:
+                return f"{analysis_type} needs target_column"
+            
+            # Resolve dataset handle or inline JSON records
+            if dataset_registry.is_handle(data_json):
+                entry = dataset_registry.get_entry(data_json)
+                df, fingerprint = entry.df, entry.get_fingerprint()
+            else:
+                df = dataset_registry.resolve(data_json)
+                fingerprint = dataframe_fingerprint(df)
             
             # Perform analysis based on type
             if analysis_type == "forecast":
-                results = PredictiveAnalyzer.forecast_future(df, target_column)
+                results = PredictiveAnalyzer.forecast_future(df, target_column, coverage=coverage_levels)
                 return json.dumps(results, indent=2)
+            elif analysis_type == "backtest":
+                results = PredictiveAnalyzer.backtest_model(df, target_column, n_folds=int(folds), mode=split,
+                                                            backend=backend, time_budget=time_budget)
+                return json.dumps(results, indent=2, default=str)
             elif analysis_type == "model":
-                X, y = PredictiveAnalyzer.prepare_data(df, target_column)
-                results = PredictiveAnalyzer.train_forecast_model(X, y)
-                return json.dumps(results, indent=2)
+                results = PredictiveAnalyzer.train_or_load_model(df, target_column, fingerprint=fingerprint,
+                                                                 refresh=refresh, features=features,
+                                                                 backend=backend, time_budget=time_budget)
+                return json.dumps(results, indent=2, default=str)
             else:
-                return "Unsupported analysis type. Use 'forecast' or 'model'"
+                return "Unsupported analysis type. Use 'forecast', 'model', 'predict', 'models', 'volume_forecast', 'backtest' or 'online_update'"
                 
         except Exception as e:
             return f"Predictive analysis failed: {str(e)}"
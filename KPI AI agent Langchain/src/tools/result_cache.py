@@ -0,0 +1,197 @@
+"""Cache of analysis tool outputs keyed by dataset content and parameters"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Optional
+
+from .data.registry import dataset_registry
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_VERSION = 2
+
+
+def data_ref_fingerprint(data_ref: str) -> str:
+    """Content fingerprint for a tool's data argument
+
+    Handles (one or several, comma separated) map to their datasets'
+    fingerprints, so re-registering identical data still hits while a new
+    version of a dataset under the same handle misses. Inline JSON records
+    are hashed as given.
+    """
+    if dataset_registry.is_handle(data_ref):
+        return ",".join(dataset_registry.get_entry(ref.strip()).get_fingerprint() for ref in data_ref.split(','))
+    return hashlib.blake2b(data_ref.encode(), digest_size=16).hexdigest()
+
+
+class ToolResultCache:
+    """LRU cache of tool output strings, optionally persisted as JSON files
+
+    Only outputs that are valid JSON are stored, so error messages are
+    always recomputed. Entries on disk outlive the process and are shared
+    by every agent that uses the same cache directory.
+    """
+
+    def __init__(self, max_entries: int = 256, persist: bool = False,
+                 cache_dir: str = "./kpi_cache/results", max_disk_entries: int = 2048,
+                 enabled: bool = True):
+        self.max_entries = max_entries
+        self.persist = persist
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'memory_hits': 0, 'disk_hits': 0,
+                      'stores': 0, 'evictions': 0, 'uncacheable': 0}
+
+    @staticmethod
+    def make_key(tool_name: str, data_refs: List[Optional[str]], params: Dict[str, Any]) -> str:
+        """Key from the tool, the content of every dataset it reads and its parameters"""
+        payload = json.dumps({
+            'version': RESULT_CACHE_VERSION,
+            'tool': tool_name,
+            'data': [data_ref_fingerprint(ref) if ref else None for ref in data_refs],
+            'params': params
+        }, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _remember(self, key: str, result: str) -> None:
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def _read(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), 'r') as f:
+                return json.load(f)['result']
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable cached result {key}: {e}")
+            return None
+
+    def _write(self, key: str, result: str) -> None:
+        """Atomically persist a result and keep the directory within its entry budget"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': RESULT_CACHE_VERSION, 'result': result}, f)
+        os.replace(tmp_path, self._path(key))
+
+        files = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.json')]
+        if len(files) > self.max_disk_entries:
+            for path in sorted(files, key=os.path.getmtime)[:len(files) - self.max_disk_entries]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a result in memory, then on disk"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return self._entries[key]
+        result = self._read(key) if self.persist else None
+        if result is not None:
+            self._remember(key, result)
+            with self._lock:
+                self.stats['disk_hits'] += 1
+        return result
+
+    def put(self, key: str, result: str) -> bool:
+        """Store a result if it is a JSON document; returns whether it was stored"""
+        try:
+            json.loads(result)
+        except (TypeError, ValueError):
+            with self._lock:
+                self.stats['uncacheable'] += 1
+            return False
+        self._remember(key, result)
+        if self.persist:
+            try:
+                self._write(key, result)
+            except OSError as e:
+                logger.warning(f"Failed to persist cached result {key}: {e}")
+        with self._lock:
+            self.stats['stores'] += 1
+        return True
+
+    def get_or_run(self, tool_name: str, data_refs: List[Optional[str]], params: Dict[str, Any],
+                   run: Callable[[], str], refresh: bool = False) -> str:
+        """Return the cached output of a tool call, running it on a miss
+
+        With refresh the call always runs and its output replaces the entry.
+        """
+        if not self.enabled:
+            return run()
+        try:
+            key = self.make_key(tool_name, data_refs, params)
+        except KeyError:
+            # Unknown handle: let the tool report the error
+            return run()
+
+        result = None if refresh else self.get(key)
+        with self._lock:
+            self.stats['hits' if result is not None else 'misses'] += 1
+        if result is not None:
+            return result
+        result = run()
+        self.put(key, result)
+        return result
+
+    def clear(self, remove_files: bool = False) -> None:
+        """Drop all entries from memory and optionally from disk"""
+        with self._lock:
+            self._entries.clear()
+        if remove_files and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else None,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'persist': self.persist,
+                'enabled': self.enabled
+            }
+
+
+_default_cache: Optional[ToolResultCache] = None
+
+
+def get_default_result_cache() -> ToolResultCache:
+    """Get the process-wide result cache configured from the environment"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ToolResultCache(
+            max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256")),
+            persist=os.getenv("RESULT_CACHE_PERSIST", "False").lower() == "true",
+            cache_dir=os.getenv("RESULT_CACHE_DIR", "./kpi_cache/results"),
+            enabled=os.getenv("RESULT_CACHE_ENABLED", "True").lower() == "true"
+        )
+    return _default_cache
+
+
+def configure_default_result_cache(**kwargs) -> ToolResultCache:
+    """Replace the process-wide result cache, e.g. from tool configuration"""
+    global _default_cache
+    _default_cache = ToolResultCache(**kwargs)
+    return _default_cache
@@ -0,0 +1 @@
+"""SQL query tools for KPI AI Agent"""
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""Core SQL query functionality over local datasets"""
+import os
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from ..data.cache import ColumnarCache, get_default_cache
+from ..data.registry import HANDLE_PREFIX, dataset_registry
+
+DEFAULT_MAX_ROWS = 1000
+DEFAULT_TIMEOUT_SECONDS = 30.0
+
+_READ_ONLY_PREFIXES = ('select', 'with', 'describe', 'summarize', 'pivot', 'unpivot', 'from')
+_COMMENTS = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+
+
+class QueryTimeoutError(Exception):
+    """Raised when a query runs longer than its time limit"""
+
+
+def _clean_query(query: str) -> str:
+    """Strip comments and trailing semicolons, and allow only one read-only statement"""
+    cleaned = _COMMENTS.sub(' ', query).strip().rstrip(';').strip()
+    if not cleaned:
+        raise ValueError("Empty query")
+    if ';' in cleaned:
+        raise ValueError("Only a single statement is allowed")
+    if not cleaned.lower().startswith(_READ_ONLY_PREFIXES):
+        raise ValueError("Only read-only queries (SELECT/WITH) are allowed")
+    return cleaned
+
+
+def _table_name(name: str) -> str:
+    """SQL table name for a dataset handle or file name"""
+    name = name[len(HANDLE_PREFIX):] if name.startswith(HANDLE_PREFIX) else name
+    return re.sub(r'[^A-Za-z0-9_]+', '_', name).strip('_')
+
+
+class SQLQueryEngine:
+    """Runs SQL with DuckDB against registered datasets and cached columnar files
+
+    Every registered dataset is exposed as a table named after its handle
+    without the 'ds:' prefix (ds:cases_Q4_2024 -> cases_Q4_2024). Cached CSV
+    loads are exposed under their file name when the query mentions them.
+    Frames and memory-mapped Arrow tables are scanned in place, so only the
+    query result is materialized.
+    """
+
+    def __init__(self, max_rows: int = DEFAULT_MAX_ROWS,
+                 timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+                 cache: Optional[ColumnarCache] = None,
+                 threads: Optional[int] = None):
+        self.max_rows = max_rows
+        self.timeout_seconds = timeout_seconds
+        self.cache = cache
+        self.threads = threads
+
+    @staticmethod
+    def is_available() -> bool:
+        """Check whether duckdb is installed"""
+        try:
+            import duckdb  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def _connect(self):
+        import duckdb
+        con = duckdb.connect(database=':memory:')
+        # Queries only see registered tables, never the file system
+        con.execute("SET enable_external_access = false")
+        if self.threads:
+            con.execute(f"SET threads TO {int(self.threads)}")
+        return con
+
+    def _register_tables(self, con, query: str) -> List[str]:
+        """Expose datasets and referenced cached files as tables"""
+        tables = []
+        for dataset in dataset_registry.list_datasets():
+            name = _table_name(dataset['handle'])
+            con.register(name, dataset_registry.get(dataset['handle']))
+            tables.append(name)
+
+        cache = self.cache or get_default_cache()
+        if not cache.enabled:
+            return tables
+        lowered = query.lower()
+        for entry in cache.list_entries():
+            name = _table_name(os.path.splitext(os.path.basename(entry['source_path']))[0])
+            if name in tables or name.lower() not in lowered or not os.path.exists(entry['source_path']):
+                continue
+            table = cache.read_table(entry['source_path'], variant=entry['variant'])
+            if table is not None:
+                con.register(name, table)
+                tables.append(name)
+        return tables
+
+    def run(self, query: str, max_rows: Optional[int] = None,
+            timeout_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Run a read-only query and return at most max_rows result rows (never more than the engine's cap)"""
+        start = time.perf_counter()
+        max_rows = self.max_rows if max_rows is None else min(int(max_rows), self.max_rows)
+        timeout_seconds = self.timeout_seconds if timeout_seconds is None else timeout_seconds
+        cleaned = _clean_query(query)
+
+        import duckdb
+        con = self._connect()
+        try:
+            tables = self._register_tables(con, cleaned)
+            register_seconds = time.perf_counter() - start
+
+            # One extra row tells whether the result was truncated
+            limited = f"SELECT * FROM ({cleaned}) AS q LIMIT {int(max_rows) + 1}"
+            timer = threading.Timer(timeout_seconds, con.interrupt)
+            timer.start()
+            execute_start = time.perf_counter()
+            try:
+                result = con.execute(limited)
+                execute_seconds = time.perf_counter() - execute_start
+                fetch_start = time.perf_counter()
+                df = result.fetchdf()
+                fetch_seconds = time.perf_counter() - fetch_start
+            except duckdb.InterruptException:
+                raise QueryTimeoutError(f"Query exceeded the {timeout_seconds}s time limit")
+            finally:
+                timer.cancel()
+        finally:
+            con.close()
+
+        truncated = len(df) > max_rows
+        df = df.head(max_rows)
+        df = df.astype(object).where(df.notnull(), None)
+        return {
+            'columns': list(df.columns),
+            'data': df.to_dict(orient='records'),
+            'row_count': len(df),
+            'truncated': truncated,
+            'tables': tables,
+            'timing': {
+                'register_seconds': round(register_seconds, 4),
+                'execute_seconds': round(execute_seconds, 4),
+                'fetch_seconds': round(fetch_seconds, 4),
+                'total_seconds': round(time.perf_counter() - start, 4)
+            }
+        }
+
+    def list_tables(self) -> List[Dict[str, Any]]:
+        """Describe the tables queries can use"""
+        return [{'table': _table_name(d['handle']), 'columns': d['columns'], 'rows': d['shape'][0]}
+                for d in dataset_registry.list_datasets()]
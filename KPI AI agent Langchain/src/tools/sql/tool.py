@@ -0,0 +1,48 @@
+"""LangChain tool for SQL queries over local datasets"""
+from langchain.tools import BaseTool
+from langchain.callbacks.manager import CallbackManagerForToolRun
+from typing import Optional
+import json
+
+from .core import SQLQueryEngine
+
+class SQLQueryTool(BaseTool):
+    """LangChain tool for SQL aggregation over loaded datasets"""
+    
+    name = "sql_query"
+    description = (
+        "Runs a read-only SQL (DuckDB dialect) query against loaded datasets and returns "
+        "only the result rows. Each dataset handle is a table named without the 'ds:' "
+        "prefix (ds:cases_Q4_2024 -> cases_Q4_2024); cached CSV files are available by "
+        "file name. Quote column names with spaces, e.g. "
+        "SELECT \"Call Center\", count(*) FROM cases_Q4_2024 GROUP BY 1. "
+        "Pass query='tables' to list available tables and columns."
+    )
+    engine: SQLQueryEngine = None
+    
+    def __init__(self, engine: Optional[SQLQueryEngine] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.engine = engine or SQLQueryEngine()
+    
+    def _run(
+        self,
+        query: str,
+        max_rows: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        run_manager: Optional[CallbackManagerForToolRun] = None
+    ) -> str:
+        """Execute SQL query"""
+        try:
+            if not self.engine.is_available():
+                return "SQL query failed: duckdb is not installed"
+            if query.strip().lower() == "tables":
+                return json.dumps(self.engine.list_tables(), indent=2, default=str)
+            
+            result = self.engine.run(query, max_rows=max_rows, timeout_seconds=timeout_seconds)
+            return json.dumps(result, indent=2, default=str)
+            
+        except Exception as e:
+            return f"SQL query failed: {str(e)}"
+    
+    async def _arun(self, *args, **kwargs) -> str:
+        return self._run(*args, **kwargs)
@@ -15,10 +15,13 @@ class DataProcessor:
         
         # Handle missing values
         for col in df.columns:
-            if df[col].dtype in ['int64', 'float64']:
+            if pd.api.types.is_numeric_dtype(df[col]):
                 df[col] = df[col].fillna(df[col].median())
             else:
-                df[col] = df[col].fillna(df[col].mode()[0] if not df[col].mode().empty else 'Unknown')
+                fill_value = df[col].mode()[0] if not df[col].mode().empty else 'Unknown'
+                if isinstance(df[col].dtype, pd.CategoricalDtype) and fill_value not in df[col].cat.categories:
+                    df[col] = df[col].cat.add_categories([fill_value])
+                df[col] = df[col].fillna(fill_value)
         
         return df
     
@@ -0,0 +1,130 @@
+"""Tests for streaming anomaly detection"""
+import json
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.tools.anomaly import core
+from src.tools.anomaly.core import StreamingDetector
+from src.tools.anomaly.tool import AnomalyAlertTool
+
+VOLUME_SPIKE = ('CC3', 'PC2', '2025-03-10')
+SLOW_DAY = ('CC5', 'PC4', '2025-03-12')
+
+
+def make_cases(n_centers=20, n_categories=5, days=70, seed=0):
+    """Daily cases per call center and category with a weekly pattern, one volume spike and one slow day"""
+    rng = np.random.default_rng(seed)
+    day = np.arange(days)
+    rate = rng.uniform(3, 30, (n_centers, n_categories))[:, :, None] * np.where(day % 7 < 5, 1.0, 0.3)
+    rate[3, 2, 63] *= 5
+    counts = rng.poisson(rate)
+    center, category, offset = (np.repeat(index, counts.ravel()) for index in np.indices(counts.shape))
+    resolution = rng.gamma(2.0, 1.5, len(offset))
+    resolution[(center == 5) & (category == 4) & (offset == 65)] += 8
+    dates = pd.Timestamp('2025-01-06') + pd.to_timedelta(offset, unit='D')
+    return pd.DataFrame({'Call Center': [f"CC{i}" for i in center],
+                         'Problem Code Category': [f"PC{i}" for i in category],
+                         'Case Created On Date': dates.strftime('%d/%m/%Y'),
+                         'Resolution Days': resolution})
+
+
+def alert_keys(alerts):
+    return {(a['key']['Call Center'], a['key']['Problem Code Category'], a['period']) for a in alerts}
+
+
+class TestStreamingDetector(unittest.TestCase):
+
+    def setUp(self):
+        self.df = make_cases()
+        self.days = pd.to_datetime(self.df['Case Created On Date'], format='%d/%m/%Y')
+
+    def test_flags_injected_anomalies(self):
+        """Test that a volume spike and a slow day are flagged with few other alerts"""
+        detector = StreamingDetector()
+        result = detector.update(self.df)
+        self.assertEqual(result['new_series'], 100)
+        # The last day is held back as possibly incomplete
+        self.assertEqual(result['days_added'], 69)
+        self.assertEqual(detector.describe()['watermark'], '2025-03-15')
+
+        alerts = detector.recent_alerts(days=7)
+        self.assertIn(VOLUME_SPIKE, alert_keys(alerts))
+        self.assertIn(SLOW_DAY, alert_keys(alerts))
+        spike = next(a for a in alerts if a['metric'] == 'volume' and a['key']['Call Center'] == 'CC3')
+        self.assertGreater(spike['value'], 3 * spike['expected'])
+        # Scored series-days after warm-up, two metrics each
+        scored = 100 * 2 * (69 - 7 - core.WARMUP_PERIODS)
+        self.assertLess(len(detector.recent_alerts(days=None)) - 2, 0.005 * scored)
+        self.assertEqual(detector.recent_alerts(days=7, metric='resolution_days', top=1)[0]['period'],
+                         SLOW_DAY[2])
+
+    def test_batches_match_single_pass(self):
+        """Test that feeding days in batches gives the same state and alerts as one pass"""
+        single = StreamingDetector(method='mad')
+        single.update(self.df)
+        streamed = StreamingDetector(method='mad')
+        for end in ['2025-02-01', '2025-02-20', '2025-03-11']:
+            streamed.update(self.df[self.days <= end])
+        result = streamed.update(self.df)
+        self.assertEqual(result['days_added'], 5)
+        np.testing.assert_allclose(streamed.mad[[streamed.key_rows[k] for k in single.keys]], single.mad)
+        self.assertEqual(list(streamed.alerts), list(single.alerts))
+
+        # Days at or before the watermark are not ingested again
+        self.assertEqual(streamed.update(self.df)['rows_used'], 0)
+        self.assertEqual(streamed.describe()['rows_ingested'], single.describe()['rows_ingested'])
+        self.assertEqual(streamed.describe()['state_bytes_per_series'], single.describe()['state_bytes_per_series'])
+
+    def test_tool_keeps_state_between_calls(self):
+        """Test that the tool only processes new days and reloads the detector from disk"""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            core.configure_default_detector_store(store_dir=tmp_dir)
+            tool = AnomalyAlertTool()
+            first = json.loads(tool._run(self.df[self.days <= '2025-03-08'].to_json(orient='records')))
+            self.assertEqual(first['detector']['watermark'], '2025-03-07')
+            self.assertNotIn(VOLUME_SPIKE, alert_keys(first['alerts']))
+
+            core.configure_default_detector_store(store_dir=tmp_dir)
+            second = json.loads(tool._run(self.df[self.days >= '2025-03-08'].to_json(orient='records'),
+                                          metric='volume'))
+            self.assertEqual(second['detector_id'], first['detector_id'])
+            self.assertEqual(second['days_added'], 8)
+            self.assertEqual(second['detector']['updates'], 2)
+            self.assertIn(VOLUME_SPIKE, alert_keys(second['alerts']))
+            self.assertTrue(all(a['metric'] == 'volume' for a in second['alerts']))
+
+            listed = json.loads(tool._run('', metric='volume'))
+            self.assertEqual(listed['alerts'], second['alerts'])
+            self.assertEqual(listed['rows_used'], 0)
+            self.assertIn('failed', tool._run('', method='zscore'))
+        finally:
+            core.configure_default_detector_store(persist=False)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def test_missing_keys_survive_reload(self):
+        """Test that series with a missing call center keep their state when the store is reloaded"""
+        df = self.df.copy()
+        df.loc[df['Call Center'] == 'CC7', 'Call Center'] = np.nan
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            core.configure_default_detector_store(store_dir=tmp_dir)
+            first = core.detect_anomalies(df[self.days <= '2025-03-01'])
+            core.configure_default_detector_store(store_dir=tmp_dir)
+            second = core.detect_anomalies(df)
+            self.assertEqual(second['detector_id'], first['detector_id'])
+            self.assertEqual(second['new_series'], 0)
+            self.assertEqual(second['detector']['series'], 100)
+            keys = json.loads(json.dumps(core.get_default_detector_store().get(second['detector_id'])[0].keys))
+            self.assertIn(['(missing)', 'PC0'], keys)
+        finally:
+            core.configure_default_detector_store(persist=False)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
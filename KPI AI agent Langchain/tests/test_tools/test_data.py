@@ -0,0 +1,421 @@
+"""Tests for data retrieval tools"""
+import os
+import shutil
+import tempfile
+import json
+import unittest
+
+import pandas as pd
+
+from src.tools.data.cache import ColumnarCache
+from src.tools.data.core import DataRetriever
+from src.tools.data.dates import build_calendar_dimension, parse_case_dates
+from src.tools.data.encoding import drop_export_footer, optimize_dtypes
+from src.tools.data.incremental import IncrementalIngestor, incremental_ingestor
+from src.tools.data.multifile import concat_frames
+from src.tools.data.registry import DatasetRegistry, dataset_registry
+from src.tools.data.sampling import ReservoirSample, estimate_tokens, represent, stratified_sample
+from src.tools.data.streaming import StreamingSummary
+from src.tools.data.tool import DataRetrievalTool
+
+CASE_HEADER = "Geo Hierarchy - Geo;Call Center;Case Number;Case Created On Date;# of TSC Break Fix Resolved Cases\n"
+
+
+def write_cases(path, rows):
+    """Write a small semicolon-delimited case export"""
+    with open(path, 'w') as f:
+        f.write(CASE_HEADER)
+        for row in rows:
+            f.write(";".join(str(v) for v in row) + "\n")
+
+
+class TestColumnarCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmp_dir, "cases.csv")
+        write_cases(self.csv_path, [
+            ("EMEA", "Rabat", "CAS-1", "01/02/2025", 1),
+            ("North America", "Rabat CA", "CAS-2", "03/02/2025", 1),
+        ])
+        self.cache = ColumnarCache(cache_dir=os.path.join(self.tmp_dir, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_second_load_hits_cache(self):
+        """Test that an unchanged file is served from the cache"""
+        df, first = DataRetriever.load_csv_with_metrics(self.csv_path, cache=self.cache)
+        cached, second = DataRetriever.load_csv_with_metrics(self.csv_path, cache=self.cache)
+        self.assertEqual(first.source, "parse")
+        self.assertEqual(second.source, "cache")
+        self.assertEqual(list(cached.columns), list(df.columns))
+        self.assertEqual(cached.shape, (2, 5))
+
+    def test_changed_file_invalidates_entry(self):
+        """Test that modifying the source forces a reparse"""
+        DataRetriever.load_csv_with_metrics(self.csv_path, cache=self.cache)
+        write_cases(self.csv_path, [("EMEA", "Rabat", "CAS-3", "04/02/2025", 1)])
+        df, metrics = DataRetriever.load_csv_with_metrics(self.csv_path, cache=self.cache)
+        self.assertEqual(metrics.source, "parse")
+        self.assertEqual(len(df), 1)
+
+    def test_lru_eviction_respects_budget(self):
+        """Test that the cache directory stays within its size budget"""
+        other_path = os.path.join(self.tmp_dir, "other.csv")
+        write_cases(other_path, [("EMEA", "Rabat", "CAS-9", "05/02/2025", 1)])
+        DataRetriever.load_csv_with_metrics(self.csv_path, cache=self.cache)
+        self.cache.max_bytes = self.cache.get_stats()['size_bytes']
+        DataRetriever.load_csv_with_metrics(other_path, cache=self.cache)
+
+        stats = self.cache.get_stats()
+        self.assertEqual(stats['entries'], 1)
+        self.assertEqual(stats['evictions'], 1)
+        self.assertLessEqual(stats['size_bytes'], self.cache.max_bytes)
+
+
+class TestPushdown(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmp_dir, "cases.csv")
+        write_cases(self.csv_path, [
+            ("EMEA", "Rabat", "CAS-1", "01/02/2025", 1),
+            ("EMEA", "Rabat", "CAS-2", "20/02/2025", 1),
+            ("North America", "Rabat CA", "CAS-3", "03/02/2025", 1),
+        ])
+        self.cache = ColumnarCache(cache_dir=os.path.join(self.tmp_dir, "cache"))
+        self.filters = {'Geo Hierarchy - Geo': 'EMEA',
+                        'Case Created On Date': {'from': '01/02/2025', 'to': '2025-02-10'}}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_filters_applied_while_parsing(self):
+        """Test projection and filters on a cache miss"""
+        df, metrics = DataRetriever.load_csv_with_metrics(
+            self.csv_path, cache=self.cache, columns=['Case Number'], filters=self.filters)
+        self.assertEqual(list(df.columns), ['Case Number'])
+        self.assertEqual(list(df['Case Number']), ['CAS-1'])
+        self.assertEqual(metrics.rows_skipped, 2)
+        self.assertEqual(metrics.columns_skipped, 4)
+
+    def test_filters_applied_against_cache(self):
+        """Test that the cached table gives the same subset"""
+        DataRetriever.load_csv_data(self.csv_path, cache=self.cache)
+        df, metrics = DataRetriever.load_csv_with_metrics(
+            self.csv_path, cache=self.cache, columns=['Case Number'], filters=self.filters)
+        self.assertEqual(metrics.source, "cache")
+        self.assertEqual(list(df['Case Number']), ['CAS-1'])
+        self.assertGreater(metrics.bytes_skipped, 0)
+
+    def test_numeric_equality_matches_on_miss_and_hit(self):
+        """Test that a counter filter matches the same rows whether the total row left the column as text"""
+        write_cases(self.csv_path, [
+            ("EMEA", "Rabat", "CAS-1", "01/02/2025", 1),
+            ("EMEA", "Rabat", "CAS-2", "20/02/2025", 0),
+            ("North America", "Rabat CA", "CAS-3", "03/02/2025", 1),
+            ("Total", "", "", "", "6 837"),
+        ])
+        for filters in [{'# of TSC Break Fix Resolved Cases': 1}, {'# of TSC Break Fix Resolved Cases': ['1']}]:
+            self.cache.invalidate()
+            miss, miss_metrics = DataRetriever.load_csv_with_metrics(
+                self.csv_path, cache=self.cache, columns=['Case Number'], filters=filters)
+            DataRetriever.load_csv_data(self.csv_path, cache=self.cache)
+            hit, hit_metrics = DataRetriever.load_csv_with_metrics(
+                self.csv_path, cache=self.cache, columns=['Case Number'], filters=filters)
+            self.assertEqual((miss_metrics.source, hit_metrics.source), ("parse", "cache"))
+            self.assertEqual(list(miss['Case Number']), ['CAS-1', 'CAS-3'])
+            self.assertEqual(list(hit['Case Number']), list(miss['Case Number']))
+
+
+class TestIncrementalIngestion(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmp_dir, "cases.csv")
+        write_cases(self.csv_path, [
+            ("EMEA", "Rabat", "CAS-1", "01/02/2025", 1),
+            ("EMEA", "Rabat", "CAS-2", "02/02/2025", 1),
+        ])
+        self.ingestor = IncrementalIngestor()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_appended_rows_parsed_alone(self):
+        """Test that a refresh reads only the new tail and updates aggregates"""
+        self.ingestor.refresh(self.csv_path)
+        self.ingestor.register_aggregate(self.csv_path, "summary", StreamingSummary)
+        with open(self.csv_path, 'a') as f:
+            f.write("North America;Rabat CA;CAS-3;03/02/2025;1\nEMEA;Rab")
+
+        df, metrics = self.ingestor.refresh(self.csv_path)
+        self.assertEqual(metrics['mode'], "append")
+        self.assertEqual(metrics['rows_appended'], 1)
+        self.assertEqual(list(df['Case Number']), ['CAS-1', 'CAS-2', 'CAS-3'])
+        self.assertEqual(df['Geo Hierarchy - Geo'].dtype.name, 'category')
+        self.assertEqual(self.ingestor.get_aggregate(self.csv_path, "summary").rows, 3)
+
+        # The partial last line is completed and picked up next time
+        with open(self.csv_path, 'a') as f:
+            f.write("at;CAS-4;04/02/2025;1\n")
+        df, metrics = self.ingestor.refresh(self.csv_path)
+        self.assertEqual(list(df['Case Number'])[-1], 'CAS-4')
+        self.assertEqual(self.ingestor.refresh(self.csv_path)[1]['mode'], "unchanged")
+
+    def test_rewritten_prefix_forces_full_reload(self):
+        """Test that edits before the stored offset trigger a full reload"""
+        self.ingestor.refresh(self.csv_path)
+        write_cases(self.csv_path, [
+            ("EMEA", "Rabat", "CAS-9", "01/02/2025", 1),
+            ("EMEA", "Rabat", "CAS-2", "02/02/2025", 1),
+            ("EMEA", "Rabat", "CAS-3", "03/02/2025", 1),
+        ])
+        df, metrics = self.ingestor.refresh(self.csv_path)
+        self.assertEqual(metrics['mode'], "full")
+        self.assertEqual(metrics['reason'], "prefix changed")
+        self.assertEqual(list(df['Case Number']), ['CAS-9', 'CAS-2', 'CAS-3'])
+
+    def test_tool_applies_columns_and_filters(self):
+        """Test that incremental tool loads honour the requested columns and filters"""
+        tool = DataRetrievalTool()
+        with open(self.csv_path, 'a') as f:
+            f.write("North America;Rabat CA;CAS-3;03/02/2025;1\n")
+        result = json.loads(tool._run(file_path=self.csv_path, incremental=True, columns=['Case Number'],
+                                      filters={'Geo Hierarchy - Geo': 'EMEA',
+                                               'Case Created On Date': {'from': '02/02/2025'}}))
+        df = dataset_registry.get(result['dataset'])
+        self.assertEqual(list(df.columns), ['Case Number'])
+        self.assertEqual(list(df['Case Number']), ['CAS-2'])
+        self.assertEqual(result['load_metrics']['rows'], 3)
+        self.assertEqual(result['load_metrics']['rows_selected'], 1)
+        dataset_registry.remove(result['dataset'])
+        incremental_ingestor.forget(self.csv_path)
+
+
+class TestCaseDates(unittest.TestCase):
+
+    def test_day_first_parse_and_resolution_days(self):
+        """Test that dates parse as dd/mm/yyyy and resolution time is derived"""
+        df = pd.DataFrame({
+            'Case Created On Date': pd.Series(['03/02/2025', '12/01/2025', None], dtype='category'),
+            'Completion Date': ['05/02/2025', '12/01/2025', '13/01/2025']
+        })
+        df, parsed = parse_case_dates(df)
+        self.assertEqual(parsed, ['Case Created On Date', 'Completion Date'])
+        self.assertEqual(df['Case Created On Date'][0], pd.Timestamp(2025, 2, 3))
+        self.assertEqual(list(df['Resolution Days'][:2]), [2.0, 0.0])
+        self.assertTrue(pd.isnull(df['Resolution Days'][2]))
+
+    def test_calendar_dimension(self):
+        """Test calendar attributes for a date range"""
+        calendar = build_calendar_dimension('2025-03-28', '2025-04-01')
+        friday, saturday = calendar.loc['2025-03-28'], calendar.loc['2025-03-29']
+        self.assertTrue(friday['is_business_day'])
+        self.assertFalse(saturday['is_business_day'])
+        self.assertEqual(friday['business_day_number'], saturday['business_day_number'])
+        self.assertEqual(list(calendar['quarter_label'].unique()), ['2025Q1', '2025Q2'])
+        self.assertEqual(calendar.loc['2025-04-01', 'week_start'], pd.Timestamp('2025-03-31'))
+
+
+class TestSampling(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        centers = ['Rabat CA'] * 950 + ['Rabat US'] * 45 + ['Dublin'] * 5
+        self.df = pd.DataFrame({
+            'Geo Hierarchy - Geo': ['North America'] * 995 + ['EMEA'] * 5,
+            'Call Center': centers,
+            'Case Number': [f"CAS-{i}" for i in range(1000)],
+            'Resolution Days': [float(i % 7) for i in range(1000)]
+        })
+
+    def test_stratified_sample_covers_small_strata(self):
+        """Test that rare call centers are represented and sizes are proportional"""
+        sample = stratified_sample(self.df, 40)
+        counts = sample['Call Center'].value_counts()
+        self.assertEqual(len(sample), 40)
+        self.assertEqual(set(counts.index), {'Rabat CA', 'Rabat US', 'Dublin'})
+        self.assertGreater(counts['Rabat CA'], 30)
+
+    def test_sample_size_follows_token_budget(self):
+        """Test that larger budgets return more rows and small frames come back whole"""
+        small = represent(self.df, token_budget=1500)
+        large = represent(self.df, token_budget=6000)
+        self.assertLess(small['sampling']['rows'], large['sampling']['rows'])
+        self.assertLessEqual(large['sampling']['estimated_tokens'], 6000)
+        self.assertEqual(large['sketch']['Call Center']['top'][0], ['Rabat CA', 950])
+        self.assertEqual(represent(self.df.head(3))['sampling']['method'], 'all')
+
+    def test_reservoir_sample_spans_stream(self):
+        """Test that the reservoir keeps a fixed-size sample of the whole stream"""
+        reservoir = ReservoirSample(20)
+        for start in range(0, 1000, 100):
+            reservoir.update(self.df.iloc[start:start + 100])
+        sample = reservoir.to_frame()
+        self.assertEqual(len(sample), 20)
+        self.assertGreater(sample.index.max(), 500)
+
+    def test_json_source_is_bounded(self):
+        """Test that large JSON inputs are not echoed back whole"""
+        tool = DataRetrievalTool(token_budget=1500)
+        result = json.loads(tool._run(source_type="json", json_data=self.df.to_json(orient='records'),
+                                      dataset_name="sampling_test"))
+        self.assertLess(len(result['data']), len(self.df))
+        self.assertEqual(result['sampling']['total_rows'], 1000)
+        self.assertEqual(result['sampling']['token_budget'], 1500)
+        # The summary is counted in the budget, not added on top of it
+        self.assertLessEqual(estimate_tokens(result), 1500)
+        dataset_registry.remove(result['dataset'])
+
+
+    def test_tool_output_fits_token_budget(self):
+        """Test that the whole response for a real export, as emitted, fits the token budget"""
+        csv_path = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'cases_Q4_2024.csv')
+        if not os.path.exists(csv_path):
+            self.skipTest("sample export not available")
+        for token_budget in (3000, 6000):
+            output = DataRetrievalTool()._run(file_path=csv_path, dataset_name="budget_test", token_budget=token_budget)
+            result = json.loads(output)
+            self.assertLessEqual(len(output) // 4, token_budget)
+            self.assertGreater(result['sampling']['rows'], 0)
+            dataset_registry.remove(result['dataset'])
+
+
+class TestStreamingSummary(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.tmp_dir, "cases.csv")
+        rows = [("EMEA", "Rabat", f"CAS-{i}", "01/02/2025", 1) for i in range(2500)]
+        rows.append(("EMEA", "", "CAS-X", "", ""))
+        write_cases(self.csv_path, rows)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_matches_full_load_summary(self):
+        """Test that chunked summaries agree with a full in-memory summary"""
+        result = DataRetriever.summarize_csv_streaming(self.csv_path, chunk_rows=1000)
+        full = DataRetriever.get_data_summary(DataRetriever.load_csv_data(self.csv_path, use_cache=False, optimize=False))
+        summary = result['summary']
+
+        self.assertEqual(result['stream_metrics']['chunks'], 3)
+        self.assertEqual(summary['shape'], full['shape'])
+        self.assertEqual(summary['missing_values'], full['missing_values'])
+        self.assertEqual(summary['numeric_columns'], full['numeric_columns'])
+        self.assertEqual(summary['categorical_columns'], full['categorical_columns'])
+
+
+class TestMultiFileLoad(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.mkdtemp()
+        header = "Geo Hierarchy - Geo;Case Number;Completion Date;Agent Name\n"
+        with open(os.path.join(self.tmp_dir, "cases_Q4.csv"), 'w') as f:
+            f.write(header + "EMEA;CAS-1;05/12/2024;Ayman\nEMEA;CAS-2;06/12/2024;Hind\n")
+        with open(os.path.join(self.tmp_dir, "cases_Q1.csv"), 'w') as f:
+            f.write(header + "EMEA;CAS-1;10/01/2025;Zineb\nEMEA;CAS-3;11/01/2025;Hind\n")
+        self.cache = ColumnarCache(cache_dir=os.path.join(self.tmp_dir, "cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_glob_load_deduplicates_by_latest_completion(self):
+        """Test that overlapping quarters keep the latest version of a case"""
+        df, metrics = DataRetriever.load_csv_files(os.path.join(self.tmp_dir, "cases_*.csv"),
+                                                   max_workers=1, cache=self.cache)
+        self.assertEqual(metrics['duplicates_removed'], 1)
+        self.assertEqual(sorted(df['Case Number']), ["CAS-1", "CAS-2", "CAS-3"])
+        self.assertEqual(df.loc[df['Case Number'] == "CAS-1", 'Agent Name'].item(), "Zineb")
+        self.assertEqual(df['Agent Name'].dtype, 'category')
+
+    def test_process_pool_matches_serial_load(self):
+        """Test that parallel loading gives the same rows"""
+        pattern = os.path.join(self.tmp_dir, "cases_*.csv")
+        serial, _ = DataRetriever.load_csv_files(pattern, max_workers=1, use_cache=False)
+        parallel, metrics = DataRetriever.load_csv_files(pattern, max_workers=2, cache=self.cache)
+        self.assertEqual(metrics['workers'], 2)
+        self.assertEqual(list(parallel['Case Number']), list(serial['Case Number']))
+
+    def test_concat_leaves_inputs_unchanged(self):
+        """Test that recoding onto the union vocabulary does not touch the caller's frames"""
+        first = pd.DataFrame({'Agent Name': pd.Categorical(['Ayman', 'Hind'])})
+        second = pd.DataFrame({'Agent Name': pd.Categorical(['Zineb'])})
+        combined = concat_frames([first, second])
+        self.assertEqual(combined['Agent Name'].dtype, 'category')
+        self.assertEqual(list(combined['Agent Name']), ['Ayman', 'Hind', 'Zineb'])
+        self.assertEqual(list(first['Agent Name'].cat.categories), ['Ayman', 'Hind'])
+        self.assertEqual(list(second['Agent Name'].cat.categories), ['Zineb'])
+
+
+class TestCompactEncoding(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.df = pd.DataFrame({
+            'Geo Hierarchy - Geo': ['EMEA', 'North America'] * 50 + ['Total'],
+            'Case Number': [f"CAS-{i}" for i in range(100)] + [None],
+            '# of TSC Break Fix Resolved Cases': ['1'] * 100 + ['6 837']
+        })
+
+    def test_footer_rows_dropped(self):
+        """Test that Power BI total rows are removed"""
+        self.assertEqual(len(drop_export_footer(self.df)), 100)
+
+    def test_categoricals_and_counters(self):
+        """Test dictionary encoding and counter downcasting"""
+        df, report = optimize_dtypes(drop_export_footer(self.df))
+        self.assertEqual(df['Geo Hierarchy - Geo'].dtype, 'category')
+        self.assertEqual(df['Case Number'].dtype, object)
+        self.assertEqual(df['# of TSC Break Fix Resolved Cases'].dtype, 'int8')
+        self.assertLess(report['memory_after_bytes'], report['memory_before_bytes'])
+
+
+class TestDatasetRegistry(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.df = pd.DataFrame({'Call Center': ['Rabat', 'Rabat CA'], 'cases': [3, 5]})
+
+    def test_handle_resolves_to_same_frame(self):
+        """Test that handles resolve without copying the data"""
+        registry = DatasetRegistry()
+        handle = registry.register(self.df, "cases Q4-2024")
+        self.assertEqual(handle, "ds:cases_Q4_2024")
+        self.assertIs(registry.resolve(handle), self.df)
+
+    def test_resolve_accepts_json_records(self):
+        """Test that inline JSON records still work"""
+        df = DatasetRegistry().resolve(json.dumps([{'a': 1}, {'a': 2}]))
+        self.assertEqual(list(df['a']), [1, 2])
+
+    def test_least_recently_used_dataset_evicted(self):
+        """Test that the registry is bounded"""
+        registry = DatasetRegistry(max_datasets=2)
+        first = registry.register(self.df, "first")
+        registry.register(self.df, "second")
+        registry.get(first)
+        registry.register(self.df, "third")
+        handles = [d['handle'] for d in registry.list_datasets()]
+        self.assertEqual(handles, ["ds:first", "ds:third"])
+
+    def test_eda_tool_accepts_handle(self):
+        """Test that tools operate on registered datasets"""
+        from src.tools.eda.tool import EDATool
+        handle = dataset_registry.register(self.df, "eda_handle_test")
+        try:
+            result = json.loads(EDATool().run({'data_json': handle, 'analysis_type': 'summary'}))
+        finally:
+            dataset_registry.remove(handle)
+        self.assertEqual(result['shape'], [2, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,256 @@
+"""Tests for EDA tools"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+
+from src.tools.data.registry import dataset_registry
+from src.tools.eda import profiles
+from src.tools.eda.association import association_matrix, association_store
+from src.tools.eda.core import EDAProcessor
+from src.tools.eda.profiles import MAX_LISTED_VALUES, ProfileStore, diff_profiles, merge_profiles
+from src.tools.eda.sketches import ApproxProfile, HeavyHitters, HyperLogLog, KLLQuantiles
+from src.tools.eda.tool import EDATool
+from src.tools.result_cache import configure_default_result_cache
+
+
+def make_frame():
+    """Mixed-type frame with missing values, ties and an unused category"""
+    return pd.DataFrame({
+        'days': pd.Series([1.5, np.nan, 3.0, 0.0, 7.25, 3.0], dtype='float32'),
+        'count': [1, 2, 2, 3, 5, 8],
+        'center': ['Rabat', 'Pune', None, 'Rabat', 'Pune', 'Dublin'],
+        'geo': pd.Categorical(['NA', 'NA', 'EMEA', None, 'NA', 'EMEA'], categories=['APAC', 'EMEA', 'NA']),
+        'resolved': [True, False, True, True, None, False],
+        'created': pd.to_datetime(['2025-01-01', None, '2025-01-03', '2025-01-04', '2025-01-05', '2025-01-06'])
+    })
+
+
+class TestSummaryStats(unittest.TestCase):
+
+    def test_matches_pandas_statistics(self):
+        """Test that the fused profiler reproduces describe/value_counts output"""
+        df = make_frame()
+        summary = EDAProcessor.generate_summary_stats(df)
+        expected = df[['days', 'count']].describe().to_dict()
+
+        self.assertEqual(summary['shape'], df.shape)
+        self.assertEqual(list(summary['numeric_summary']), ['days', 'count'])
+        for col, stats in expected.items():
+            self.assertEqual(list(summary['numeric_summary'][col]), list(stats))
+            for name, value in stats.items():
+                self.assertAlmostEqual(summary['numeric_summary'][col][name], value, places=12)
+        for col in ['center', 'geo']:
+            self.assertEqual(summary['categorical_summary'][col], {
+                'unique_count': df[col].nunique(),
+                'top_values': df[col].value_counts().head(5).to_dict()
+            })
+        self.assertEqual(summary['missing_data'], df.isnull().sum().to_dict())
+        self.assertEqual(summary['data_types'], df.dtypes.to_dict())
+
+    def test_parallel_matches_serial(self):
+        """Test that column-parallel profiling gives the same result"""
+        df = pd.concat([make_frame()] * 50, ignore_index=True)
+        serial = EDAProcessor.generate_summary_stats(df, workers=1)
+        parallel = EDAProcessor.generate_summary_stats(df, workers=4)
+        self.assertEqual(serial['categorical_summary'], parallel['categorical_summary'])
+        self.assertEqual(serial['numeric_summary'], parallel['numeric_summary'])
+
+class TestApproxSummary(unittest.TestCase):
+
+    def test_sketches_within_error_bounds(self):
+        """Test HLL, KLL and heavy hitters built per chunk and merged against exact values"""
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(size=200_000)
+        labels = pd.Series(rng.zipf(1.5, size=200_000) % 5000).astype(str)
+        hll, kll, top = HyperLogLog(), KLLQuantiles(), HeavyHitters(capacity=256)
+        for start in range(0, len(values), 50_000):
+            part_hll, part_kll, part_top = HyperLogLog(), KLLQuantiles(seed=start), HeavyHitters(capacity=256)
+            part_hll.update(labels.iloc[start:start + 50_000])
+            part_kll.update(values[start:start + 50_000])
+            part_top.update(labels.iloc[start:start + 50_000])
+            hll.merge(part_hll)
+            kll.merge(part_kll)
+            top.merge(part_top)
+
+        distinct = labels.nunique()
+        self.assertLess(abs(hll.estimate() - distinct) / distinct, 4 * hll.relative_error)
+        ordered = np.sort(values)
+        for q, estimate in zip([0.1, 0.5, 0.9], kll.quantiles([0.1, 0.5, 0.9])):
+            rank = np.searchsorted(ordered, estimate) / len(values)
+            self.assertLess(abs(rank - q), kll.rank_error)
+        exact = labels.value_counts()
+        for value, count in top.top(5).items():
+            self.assertLessEqual(count, exact[value])
+            self.assertGreaterEqual(count, exact[value] - top.count_error)
+
+    def test_merged_chunks_exact_fields(self):
+        """Test that merging chunk profiles keeps counts, moments and extremes exact"""
+        df = pd.concat([make_frame()] * 40, ignore_index=True)
+        merged = ApproxProfile().update(df.iloc[:100]).merge(ApproxProfile().update(df.iloc[100:]))
+        summary = merged.to_summary()
+        expected = EDAProcessor.generate_summary_stats(df)
+
+        self.assertEqual(summary['shape'], df.shape)
+        self.assertEqual(summary['missing_data'], expected['missing_data'])
+        for col, stats in expected['numeric_summary'].items():
+            for name in ['count', 'mean', 'std', 'min', 'max']:
+                self.assertAlmostEqual(summary['numeric_summary'][col][name], stats[name], places=5)
+        for col, stats in expected['categorical_summary'].items():
+            # Sketches only see values that occur, so unused categories are not listed
+            observed = {value: count for value, count in stats['top_values'].items() if count}
+            self.assertEqual(summary['categorical_summary'][col]['unique_count'], stats['unique_count'])
+            self.assertEqual(summary['categorical_summary'][col]['top_values'], observed)
+
+    def test_tool_reports_error_bounds(self):
+        """Test the summary_approx analysis type"""
+        records = make_frame().drop(columns=['created']).to_json(orient='records')
+        result = json.loads(EDATool()._run(records, analysis_type='summary_approx'))
+        self.assertIn('error_bounds', result)
+        self.assertEqual(result['categorical_summary']['center']['unique_count'], 3)
+
+class TestProfiles(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = profiles.configure_default_profile_store(profile_dir=self.tmp_dir)
+        rng = np.random.default_rng(1)
+        self.q4 = pd.DataFrame({
+            'days': rng.exponential(3.0, 2000),
+            'code': rng.choice(['A1', 'B2', 'C3'], 2000),
+            'agent': np.where(rng.random(2000) < 0.1, None, 'Agent 1')
+        })
+        self.q1 = pd.DataFrame({
+            'days': rng.exponential(3.0, 2000) + 2.0,
+            'code': rng.choice(['B2', 'C3', 'D4'], 2000),
+            'agent': np.where(rng.random(2000) < 0.3, None, 'Agent 1')
+        })
+
+    def tearDown(self):
+        profiles.configure_default_profile_store(persist=False)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_persisted_profile_round_trip(self):
+        """Test that a profile read back from disk gives the same summary"""
+        profile, built = self.store.get_or_build('q4', self.q4)
+        self.assertTrue(built)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, 'q4.json')))
+
+        fresh = ProfileStore(profile_dir=self.tmp_dir)
+        loaded, built = fresh.get_or_build('q4', self.q4.iloc[:0])
+        self.assertFalse(built)
+        self.assertEqual(fresh.stats['disk_hits'], 1)
+        self.assertEqual(json.dumps(loaded.to_summary(), default=str), json.dumps(profile.to_summary(), default=str))
+
+    def test_merge_without_rows_matches_combined_frame(self):
+        """Test that merged quarterly profiles agree with profiling both quarters at once"""
+        q4 = EDAProcessor.profile_dataset(self.q4)
+        q1 = EDAProcessor.profile_dataset(self.q1)
+        merged = EDAProcessor.combine_profiles([q4, q1]).to_summary()
+        combined = EDAProcessor.generate_summary_stats(pd.concat([self.q4, self.q1], ignore_index=True))
+
+        self.assertEqual(q4.rows, len(self.q4))
+        self.assertEqual(merged['missing_data'], combined['missing_data'])
+        self.assertAlmostEqual(merged['numeric_summary']['days']['mean'], combined['numeric_summary']['days']['mean'])
+        self.assertEqual(merged['categorical_summary']['code'], combined['categorical_summary']['code'])
+
+    def test_diff_reports_shift(self):
+        """Test new and disappeared categories, missing-rate change and numeric shift"""
+        base, other = merge_profiles([EDAProcessor.profile_dataset(self.q4)]), EDAProcessor.profile_dataset(self.q1)
+        diff = diff_profiles(base, other)
+
+        self.assertEqual(diff['categorical_shift']['code']['new_values'], ['D4'])
+        self.assertEqual(diff['categorical_shift']['code']['disappeared_values'], ['A1'])
+        self.assertEqual(diff['categorical_shift']['code']['new_count'], 1)
+        self.assertAlmostEqual(diff['missing_rate']['agent']['change'],
+                               self.q1['agent'].isnull().mean() - self.q4['agent'].isnull().mean(), places=5)
+        self.assertGreater(diff['numeric_shift']['days']['ks_statistic'], 0.3)
+        self.assertEqual(diff['columns'], {'added': [], 'removed': [], 'type_changed': {}})
+
+    def test_diff_value_lists_stay_small(self):
+        """Test that long value diffs are capped and ID-like columns list no values"""
+        q4 = self.q4.assign(account=[f"ACC-{i % 300:04d}" for i in range(2000)],
+                            case=[f"CAS-{i:05d}" for i in range(2000)])
+        q1 = self.q1.assign(account=[f"ACC-{i % 300 + 100:04d}" for i in range(2000)],
+                            case=[f"CAS-{i + 2000:05d}" for i in range(2000)])
+        diff = diff_profiles(EDAProcessor.profile_dataset(q4), EDAProcessor.profile_dataset(q1))
+
+        account = diff['categorical_shift']['account']
+        self.assertEqual((account['new_count'], account['disappeared_count']), (100, 100))
+        self.assertEqual(account['new_values'], [f"ACC-{i:04d}" for i in range(300, 300 + MAX_LISTED_VALUES)])
+        self.assertEqual(len(account['disappeared_values']), MAX_LISTED_VALUES)
+        case = diff['categorical_shift']['case']
+        self.assertTrue(case['id_like'])
+        self.assertEqual(case['new_count'], 2000)
+        self.assertNotIn('new_values', case)
+
+    def test_tool_compares_handles(self):
+        """Test the compare analysis type on registered datasets"""
+        dataset_registry.register(self.q4, 'profile_q4')
+        dataset_registry.register(self.q1, 'profile_q1')
+        try:
+            result = json.loads(EDATool()._run('ds:profile_q4', analysis_type='compare', compare_to='ds:profile_q1'))
+            self.assertEqual(result['categorical_shift']['code']['new_values'], ['D4'])
+            merged = json.loads(EDATool()._run('ds:profile_q4, ds:profile_q1', analysis_type='summary_approx'))
+            self.assertEqual(merged['shape'][0], 4000)
+            self.assertEqual(self.store.stats['builds'], 2)
+        finally:
+            dataset_registry.remove('ds:profile_q4')
+            dataset_registry.remove('ds:profile_q1')
+
+class TestAssociation(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        n = 3000
+        self.df = pd.DataFrame({'a': rng.normal(size=n), 'b': rng.normal(size=n)})
+        self.df['c'] = 2 * self.df['a'] + rng.normal(size=n)
+        self.df.loc[rng.random(n) < 0.2, 'b'] = np.nan
+        self.df['sign'] = np.where(self.df['a'] > 0, 'pos', 'neg')
+        self.df['noise'] = pd.Categorical(rng.choice(['p', 'q', 'r'], n))
+        self.df['id'] = [f"C{i}" for i in range(n)]
+
+    def test_numeric_pairs_match_pandas(self):
+        """Test blockwise pairwise-complete Pearson against DataFrame.corr"""
+        result = association_matrix(self.df, block=2)
+        matrix = pd.DataFrame(result['matrix']).loc[['a', 'b', 'c'], ['a', 'b', 'c']].astype(float)
+        expected = self.df[['a', 'b', 'c']].corr()
+        np.testing.assert_allclose(matrix.values, expected.values, atol=1e-5)
+        self.assertEqual(result['skipped'], {'id': 'too many categories'})
+
+    def test_categorical_measures(self):
+        """Test Cramér's V and the correlation ratio"""
+        result = association_matrix(self.df, method='spearman')
+        matrix = result['matrix']
+        self.assertAlmostEqual(matrix['sign']['sign'], 1.0)
+        self.assertLess(matrix['sign']['noise'], 0.1)
+        self.assertGreater(matrix['a']['sign'], 0.7)
+        self.assertLess(matrix['b']['noise'], 0.1)
+
+        # A 2x2 table with perfect dependence has V = 1
+        pairs = pd.DataFrame({'x': ['u', 'v'] * 50, 'y': ['s', 't'] * 50})
+        self.assertAlmostEqual(association_matrix(pairs)['matrix']['x']['y'], 1.0)
+
+    def test_tool_caches_per_dataset(self):
+        """Test the association analysis type and its per-dataset cache"""
+        association_store.clear()
+        dataset_registry.register(self.df, 'association_cases')
+        # Bypass the tool output cache so the second call reaches the association store
+        configure_default_result_cache(enabled=False)
+        try:
+            first = json.loads(EDATool()._run('ds:association_cases', analysis_type='association'))
+            second = json.loads(EDATool()._run('ds:association_cases', analysis_type='association'))
+            self.assertFalse(first['cached'])
+            self.assertTrue(second['cached'])
+            self.assertEqual(first['strongest_pairs'][0]['columns'], ['a', 'c'])
+        finally:
+            dataset_registry.remove('ds:association_cases')
+            configure_default_result_cache()
+
+if __name__ == '__main__':
+    unittest.main()
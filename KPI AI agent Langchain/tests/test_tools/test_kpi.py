@@ -0,0 +1,71 @@
+"""Tests for KPI cube tools"""
+import json
+import unittest
+
+import pandas as pd
+
+from src.tools.data.registry import dataset_registry
+from src.tools.kpi.core import KPICube, kpi_cube_store
+from src.tools.kpi.tool import KPICubeTool
+
+
+def make_cases():
+    """Small case frame spanning two countries and two months"""
+    return pd.DataFrame({
+        'Geo Hierarchy - Geo': ['North America'] * 5,
+        'Geo Hierarchy - Country': ['Canada', 'Canada', 'Canada', 'United States', 'United States'],
+        'Call Center': ['Rabat CA', 'Rabat CA', 'Rabat CA', 'Rabat US', 'Rabat US'],
+        'Agent Name': ['Hind', 'Zineb', 'Hind', 'Omar', None],
+        'Case Created On Date': ['30/01/2025', '31/01/2025', '03/02/2025', '03/02/2025', '04/02/2025'],
+        'Completion Date': ['01/02/2025', '31/01/2025', '06/02/2025', '04/02/2025', '04/02/2025'],
+        '# of TSC Break Fix Resolved Cases': [1, 1, 1, 1, 1],
+        '# of Service Fix Resolved Cases': [0, 1, 0, 1, 0]
+    })
+
+
+class TestKPICube(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.cube = KPICube(make_cases())
+
+    def test_rollup_matches_raw_rows(self):
+        """Test that every materialized level agrees with a raw aggregation"""
+        for level in ['total', 'geo', 'country', 'call_center', 'agent']:
+            for grain in [None, 'day', 'week', 'month']:
+                depth = self.cube.resolve_level(level)
+                cube_result, source = self.cube.query(level=level, grain=grain)
+                raw_result = self.cube._query_raw(self.cube.hierarchy[:depth], grain, {})
+                self.assertEqual(source, "cube")
+                pd.testing.assert_frame_equal(cube_result, raw_result)
+
+        total, _ = self.cube.query()
+        self.assertEqual(total['cases'][0], 5)
+        self.assertEqual(total['resolution_days_median'][0], 1.0)
+
+    def test_drill_down_and_fallback(self):
+        """Test filtered drill-down from the cube and raw fallback"""
+        result, source = self.cube.query(level='agent', grain='month', filters={
+            'country': 'Canada', 'period': {'from': '01/02/2025'}})
+        self.assertEqual(source, "cube")
+        self.assertEqual(list(result['Agent Name']), ['Hind'])
+
+        # The agent level is below the requested country level
+        result, source = self.cube.query(level='country', filters={'agent': 'Hind'})
+        self.assertEqual(source, "raw")
+        self.assertEqual(result['cases'][0], 2)
+
+    def test_tool_reuses_cube_for_handle(self):
+        """Test that the tool builds the cube once per dataset version"""
+        kpi_cube_store.clear()
+        handle = dataset_registry.register(make_cases(), "kpi_test")
+        tool = KPICubeTool()
+        first = json.loads(tool._run(handle, level='call_center'))
+        second = json.loads(tool._run(handle, level='geo'))
+        self.assertTrue(first['cube']['built_now'])
+        self.assertFalse(second['cube']['built_now'])
+        self.assertEqual(second['data'][0]['cases'], 5)
+        dataset_registry.remove(handle)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,489 @@
+"""Tests for predictive analysis tools"""
+import io
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from src.tools.predictive import backends, features, online, registry
+from src.tools.predictive.core import PredictiveAnalyzer
+from src.tools.predictive.backends import BUDGET_FIRST_STEP, fit_model, predict
+from src.tools.predictive.backtest import regression_metrics, time_splits
+from src.tools.predictive.features import FeaturePipeline
+from src.tools.predictive.intervals import bootstrap_intervals, error_weights
+from src.tools.predictive.online import OnlineRegressor, OnlineVolumeForecaster
+from src.tools.predictive.registry import ModelRegistry
+from src.tools.predictive.timeseries import MISSING_KEY, build_case_series, forecast_case_volumes, \
+    holt_winters_batch
+from src.tools.predictive.tool import PredictiveAnalysisTool
+from src.tools.result_cache import configure_default_result_cache
+
+
+def make_cases(n=200, seed=0):
+    """Case-like frame whose resolution time depends on two numeric fields"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Work Order Number': rng.integers(1, 50, n),
+        '# of Service Fix Resolved Cases': rng.integers(0, 3, n),
+        'Call Center': rng.choice(['Rabat', 'Pune'], n)
+    })
+    df['Resolution Days'] = 0.1 * df['Work Order Number'] + 2 * df['# of Service Fix Resolved Cases'] + rng.normal(0, 0.1, n)
+    return df
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.registry = registry.configure_default_model_registry(store_dir=self.tmp_dir)
+        self.df = make_cases()
+
+    def tearDown(self):
+        registry.configure_default_model_registry(persist=False)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_identical_request_reuses_model(self):
+        """Test that a repeat request is served without training, and refresh retrains"""
+        first = PredictiveAnalyzer.train_or_load_model(self.df, 'Resolution Days')
+        second = PredictiveAnalyzer.train_or_load_model(self.df, 'Resolution Days')
+        self.assertFalse(first['model']['cached'])
+        self.assertTrue(second['model']['cached'])
+        self.assertEqual(first['model_performance'], second['model_performance'])
+        self.assertEqual(self.registry.stats['trains'], 1)
+
+        refreshed = PredictiveAnalyzer.train_or_load_model(self.df, 'Resolution Days', refresh=True)
+        self.assertFalse(refreshed['model']['cached'])
+        self.assertEqual(self.registry.stats['refreshes'], 1)
+
+        other = PredictiveAnalyzer.train_or_load_model(make_cases(seed=1), 'Resolution Days')
+        self.assertNotEqual(other['model']['model_id'], first['model']['model_id'])
+
+    def test_persisted_model_predicts_new_rows(self):
+        """Test that a model loaded from disk scores new rows like the fitted one"""
+        result = PredictiveAnalyzer.train_or_load_model(self.df, 'Resolution Days')
+        model_id = result['model']['model_id']
+        new_rows = make_cases(n=20, seed=2).drop(columns=['Resolution Days'])
+        expected = PredictiveAnalyzer.predict_with_model(model_id, new_rows)['predictions']
+
+        fresh = ModelRegistry(store_dir=self.tmp_dir)
+        predictions, record = fresh.predict(model_id, new_rows)
+        self.assertEqual(fresh.stats['disk_hits'], 1)
+        self.assertEqual(record.feature_columns, ['Work Order Number', '# of Service Fix Resolved Cases'])
+        np.testing.assert_allclose(predictions, expected)
+        self.assertEqual([m['model_id'] for m in fresh.list_models()], [model_id])
+
+    def test_tool_model_and_predict(self):
+        """Test the model, predict and models analysis types"""
+        configure_default_result_cache(enabled=False)
+        try:
+            tool = PredictiveAnalysisTool()
+            records = self.df.to_json(orient='records')
+            trained = json.loads(tool._run(records, 'Resolution Days', analysis_type='model'))
+            model_id = trained['model']['model_id']
+
+            new_rows = make_cases(n=5, seed=3).to_json(orient='records')
+            scored = json.loads(tool._run(new_rows, analysis_type='predict', model_id=model_id))
+            self.assertEqual(scored['rows'], 5)
+            listed = json.loads(tool._run('', analysis_type='models'))
+            self.assertEqual([m['model_id'] for m in listed], [model_id])
+            self.assertEqual(self.registry.stats['trains'], 1)
+        finally:
+            configure_default_result_cache()
+
+
+class TestVolumeForecast(unittest.TestCase):
+
+    def test_case_series_counts_per_group_and_period(self):
+        """Test that series are zero-filled on a shared calendar and weeks start on Monday"""
+        df = pd.DataFrame({
+            'Call Center': ['Rabat', 'Rabat', 'Pune', 'Rabat'],
+            'Case Created On Date': ['02/01/2025', '02/01/2025', '04/01/2025', '07/01/2025']
+        })
+        daily = build_case_series(df, ['Call Center'], freq='day')
+        self.assertEqual(list(daily.keys['Call Center']), ['Pune', 'Rabat'])
+        self.assertEqual(str(daily.periods[0]), '2025-01-02')
+        np.testing.assert_array_equal(daily.values, [[0, 0, 1, 0, 0, 0], [2, 0, 0, 0, 0, 1]])
+
+        weekly = build_case_series(df, ['Call Center'], freq='week')
+        self.assertEqual([str(p) for p in weekly.periods], ['2024-12-30', '2025-01-06'])
+        np.testing.assert_array_equal(weekly.values, [[1, 0], [2, 1]])
+
+    def test_missing_group_values_form_their_own_series(self):
+        """Test that cases without a group value are counted under MISSING_KEY instead of failing"""
+        df = pd.DataFrame({
+            'Call Center': ['Rabat', None, 'Pune', np.nan, 'Rabat'],
+            'Case Created On Date': ['02/01/2025', '02/01/2025', '03/01/2025', '04/01/2025', '04/01/2025']
+        })
+        series = build_case_series(df, ['Call Center'])
+        self.assertEqual(list(series.keys['Call Center']), ['Pune', 'Rabat', MISSING_KEY])
+        np.testing.assert_array_equal(series.values, [[0, 1, 0], [1, 0, 1], [1, 0, 1]])
+        categorical = build_case_series(df.astype({'Call Center': 'category'}), ['Call Center'])
+        np.testing.assert_array_equal(categorical.values, series.values)
+
+        result = forecast_case_volumes(pd.concat([df] * 10, ignore_index=True), group_by=['Call Center'], horizon=2)
+        self.assertEqual(sum(s['history_total'] for s in result['series']), 50)
+        self.assertIn({'Call Center': MISSING_KEY}, [s['key'] for s in result['series']])
+
+    def test_batch_matches_single_series_fits(self):
+        """Test that fitting many series together equals fitting each alone and tracks the pattern"""
+        rng = np.random.default_rng(0)
+        t = np.arange(84)
+        values = 50 + np.outer(rng.uniform(0.5, 2, 6), 10 * (t % 7 < 5)) + rng.normal(0, 1, (6, 84))
+        batch = holt_winters_batch(values, season_length=7, horizon=7)
+        for i in range(len(values)):
+            single = holt_winters_batch(values[i:i + 1], season_length=7, horizon=7)
+            np.testing.assert_allclose(batch['forecasts'][i], single['forecasts'][0])
+        # The series repeat weekly, so the next week should look like the last one
+        self.assertLess(np.abs(batch['forecasts'] - values[:, -7:]).mean(), 3)
+
+    def test_tool_volume_forecast(self):
+        """Test per-call-center forecasts through the tool"""
+        rng = np.random.default_rng(1)
+        dates = pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 60, 3000), unit='D')
+        df = pd.DataFrame({'Call Center': rng.choice(['Rabat', 'Pune', 'Casablanca'], 3000),
+                           'Case Created On Date': dates.strftime('%d/%m/%Y')})
+        configure_default_result_cache(enabled=False)
+        try:
+            result = json.loads(PredictiveAnalysisTool()._run(
+                df.to_json(orient='records'), analysis_type='volume_forecast', level='call_center', horizon=5))
+        finally:
+            configure_default_result_cache()
+        self.assertEqual(result['series_count'], 3)
+        self.assertEqual(result['forecast_periods'][0], '2025-03-02')
+        self.assertEqual(sum(s['history_total'] for s in result['series']), 3000)
+        for series in result['series']:
+            self.assertEqual(len(series['forecast']), 5)
+            self.assertTrue(all(v >= 0 for v in series['forecast']))
+            self.assertEqual([iv['level'] for iv in series['intervals']], [0.8, 0.95])
+            self.assertTrue(all(lo >= 0 for lo in series['intervals'][1]['lower']))
+
+
+class TestPredictionIntervals(unittest.TestCase):
+
+    def test_bootstrap_coverage_matches_levels(self):
+        """Test that random-walk intervals cover held-out values at about the nominal rate"""
+        rng = np.random.default_rng(0)
+        paths = np.cumsum(rng.normal(0.5, 1, (500, 70)), axis=1)
+        history, future = paths[:, :60], paths[:, 60:]
+        drift = np.diff(history, axis=1).mean(axis=1)
+        forecasts = history[:, -1:] + drift[:, None] * np.arange(1, 11)
+        residuals = np.diff(history, axis=1) - drift[:, None]
+        intervals = bootstrap_intervals(forecasts, residuals, error_weights(10, np.ones(500), 0.0, 0.0),
+                                        levels=(0.5, 0.9), n_paths=1000)
+        for interval in intervals:
+            covered = ((future >= interval['lower']) & (future <= interval['upper'])).mean()
+            self.assertAlmostEqual(covered, interval['level'], delta=0.05)
+        # Wider levels nest narrower ones and intervals widen with the horizon
+        self.assertTrue(np.all(intervals[1]['lower'] <= intervals[0]['lower']))
+        width = (intervals[1]['upper'] - intervals[1]['lower']).mean(axis=0)
+        self.assertGreater(width[-1], 2 * width[0])
+
+    def test_forecast_future_intervals(self):
+        """Test that forecast_future fills confidence_intervals around its forecasts"""
+        df = pd.DataFrame({'cases': np.cumsum(np.random.default_rng(1).normal(1, 1, 40))})
+        result = PredictiveAnalyzer.forecast_future(df, 'cases', periods=6, coverage=(0.9,))
+        interval = result['confidence_intervals'][0]
+        self.assertEqual(interval['level'], 0.9)
+        for lower, forecast, upper in zip(interval['lower'], result['forecasts'], interval['upper']):
+            self.assertLess(lower, forecast)
+            self.assertLess(forecast, upper)
+        again = PredictiveAnalyzer.forecast_future(df, 'cases', periods=6, coverage=(0.9,))
+        self.assertEqual(again['confidence_intervals'], result['confidence_intervals'])
+
+
+class TestBacktest(unittest.TestCase):
+
+    def test_splits_never_train_on_later_dates(self):
+        """Test expanding and rolling folds against the dates they cover"""
+        offsets = np.random.default_rng(0).integers(0, 60, 600).astype('timedelta64[D]')
+        days = np.sort(np.datetime64('2025-01-01') + offsets)
+        expanding = time_splits(days, n_folds=4, mode='expanding')
+        rolling = time_splits(days, n_folds=4, mode='rolling', window_days=10)
+        self.assertEqual(len(expanding), 4)
+        self.assertEqual(expanding[-1].test_end, len(days))
+        for fold in expanding + rolling:
+            self.assertLess(days[fold.train_end - 1], days[fold.train_end])
+            self.assertEqual(str(days[fold.train_end]), fold.origin)
+        for a, b in zip(expanding, expanding[1:]):
+            self.assertEqual(a.test_end, b.train_end)
+            self.assertEqual(b.train_start, 0)
+        for fold in rolling:
+            span = days[fold.train_end - 1] - days[fold.train_start]
+            self.assertLess(span, np.timedelta64(10, 'D'))
+        with self.assertRaises(ValueError):
+            time_splits(days[:3], n_folds=4)
+
+    def test_metrics(self):
+        """Test MSE, MAE and MAPE, which skips zero actuals"""
+        metrics = regression_metrics(np.array([0.0, 2.0, 4.0]), np.array([1.0, 1.0, 5.0]))
+        self.assertAlmostEqual(metrics['mse'], 1.0)
+        self.assertAlmostEqual(metrics['mae'], 1.0)
+        self.assertAlmostEqual(metrics['mape'], 37.5)
+        self.assertEqual(metrics['mape_rows'], 2)
+
+    def test_tool_backtest(self):
+        """Test the backtest analysis type on dated cases"""
+        df = make_cases(n=300)
+        df['Case Created On Date'] = (pd.Timestamp('2025-01-01') +
+                                      pd.to_timedelta(np.arange(300) // 10, unit='D')).strftime('%d/%m/%Y')
+        configure_default_result_cache(enabled=False)
+        try:
+            result = json.loads(PredictiveAnalysisTool()._run(
+                df.to_json(orient='records'), 'Resolution Days', analysis_type='backtest', folds=3, split='rolling'))
+        finally:
+            configure_default_result_cache()
+        self.assertEqual([fold['index'] for fold in result['folds']], [0, 1, 2])
+        self.assertEqual(result['mode'], 'rolling')
+        for fold in result['folds']:
+            self.assertGreater(fold['train_rows'], 0)
+            self.assertGreater(fold['fit_seconds'], 0)
+        self.assertLess(result['summary']['mae']['mean'], 1.0)
+
+
+def make_coded_cases(n=400, seed=0):
+    """Cases whose resolution time depends on Origin and a high-cardinality Problem Code"""
+    rng = np.random.default_rng(seed)
+    codes = np.array([f"{i}.01" for i in range(150)])
+    df = pd.DataFrame({
+        'Problem Code': rng.choice(codes, n),
+        'Origin': rng.choice(['Phone', 'Chat', 'Email'], n),
+        'Agreement Type': rng.choice(['MPS', 'Base Warranty'], n),
+        'Work Order Number': rng.integers(1, 50, n),
+        'Case Created On Date': (pd.Timestamp('2025-01-06') +
+                                 pd.to_timedelta(rng.integers(0, 28, n), unit='D')).strftime('%d/%m/%Y')
+    })
+    code_effect = df['Problem Code'].str.split('.').str[0].astype(int) % 5
+    df['Resolution Days'] = code_effect + 3 * (df['Origin'] == 'Phone') + rng.normal(0, 0.1, n)
+    return df
+
+
+class TestFeaturePipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.models = registry.configure_default_model_registry(store_dir=f"{self.tmp_dir}/models")
+        self.store = features.configure_default_feature_store(store_dir=f"{self.tmp_dir}/features")
+
+    def tearDown(self):
+        registry.configure_default_model_registry(persist=False)
+        features.configure_default_feature_store(persist=False)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_encodings_and_unseen_values(self):
+        """Test one-hot, target and date encodings, and that new values do not refit"""
+        df = make_coded_cases()
+        pipeline = FeaturePipeline(one_hot_max_categories=10)
+        X = pipeline.fit_transform(df, df['Resolution Days'])
+        self.assertEqual(list(pipeline.one_hot), ['Origin', 'Agreement Type'])
+        self.assertEqual(list(pipeline.target), ['Problem Code'])
+        self.assertEqual(X.shape, (400, len(pipeline.feature_names)))
+        self.assertEqual(X.dtype, np.float32)
+        names = pipeline.feature_names
+        # Every row sets exactly one column per one-hot encoded field
+        first_one_hot = len(names) - 5
+        one_hot = X[:, first_one_hot:].toarray()
+        np.testing.assert_array_equal(one_hot.sum(axis=1), 2)
+        dayofweek = X[:5, names.index('Case Created On Date dayofweek')].toarray().ravel()
+        expected = pd.to_datetime(df['Case Created On Date'][:5], format='%d/%m/%Y').dt.dayofweek
+        np.testing.assert_array_equal(dayofweek, expected)
+
+        new = pd.DataFrame({'Problem Code': ['999.99', df['Problem Code'][0]], 'Origin': ['Fax', 'Phone'],
+                            'Work Order Number': [1, None]})
+        encoded = pipeline.transform(new).toarray()
+        target_mean = encoded[:, names.index('Problem Code (target mean)')]
+        self.assertAlmostEqual(target_mean[0], pipeline.prior, places=4)
+        self.assertNotAlmostEqual(target_mean[1], pipeline.prior, places=4)
+        self.assertEqual(encoded[0, first_one_hot:].sum(), 0)
+        self.assertEqual(encoded[1, names.index('Origin=Phone')], 1)
+        self.assertEqual(encoded[1, names.index('Work Order Number')], 0)
+        self.assertEqual(pipeline.feature_names, names)
+
+    def test_encoded_model_reuses_persisted_pipeline(self):
+        """Test that the pipeline is fitted once and scores new rows after a reload"""
+        df = make_coded_cases()
+        numeric = PredictiveAnalyzer.train_or_load_model(df, 'Resolution Days')
+        encoded = PredictiveAnalyzer.train_or_load_model(df, 'Resolution Days', features='encoded')
+        self.assertLess(encoded['model_performance']['mse'], numeric['model_performance']['mse'])
+        PredictiveAnalyzer.train_or_load_model(df, 'Resolution Days', features='encoded', refresh=False)
+        self.assertEqual(self.store.stats['trains'], 1)
+
+        model_id = encoded['model']['model_id']
+        new_rows = make_coded_cases(n=30, seed=1).drop(columns=['Resolution Days'])
+        expected = PredictiveAnalyzer.predict_with_model(model_id, new_rows)['predictions']
+        registry.configure_default_model_registry(store_dir=f"{self.tmp_dir}/models")
+        reloaded = features.configure_default_feature_store(store_dir=f"{self.tmp_dir}/features")
+        np.testing.assert_allclose(PredictiveAnalyzer.predict_with_model(model_id, new_rows)['predictions'],
+                                   expected)
+        self.assertEqual(reloaded.stats['disk_hits'], 1)
+        self.assertEqual(reloaded.stats['trains'], 0)
+
+
+class TestBackends(unittest.TestCase):
+
+    def setUp(self):
+        registry.configure_default_model_registry(persist=False)
+
+    def test_backends_report_timing(self):
+        """Test that every backend fits and reports training and inference time"""
+        df = make_cases(n=300)
+        for backend in ['random_forest', 'hist_gradient_boosting', 'linear']:
+            result = PredictiveAnalyzer.train_or_load_model(df, 'Resolution Days', backend=backend)
+            self.assertEqual(result['backend'], backend)
+            self.assertEqual(result['model']['model_type'], backend)
+            self.assertGreater(result['timing']['train_seconds'], 0)
+            self.assertGreater(result['timing']['predict_rows_per_second'], 0)
+            self.assertGreater(result['model_performance']['r2_score'], 0.8)
+
+    def test_time_budget_stops_training(self):
+        """Test that an exhausted budget keeps the first trees and still predicts"""
+        X, y = PredictiveAnalyzer.prepare_data(make_cases(n=300), 'Resolution Days')
+        model, info = fit_model('random_forest', X, y, time_budget=1e-6)
+        self.assertTrue(info['stopped_early'])
+        self.assertEqual(info['estimators'], BUDGET_FIRST_STEP)
+        self.assertEqual(len(predict(model, X)), 300)
+
+        model, info = fit_model('random_forest', X, y, params={'n_estimators': 15}, time_budget=60)
+        self.assertFalse(info['stopped_early'])
+        self.assertEqual(info['estimators'], 15)
+        with self.assertRaises(ValueError):
+            fit_model('svm', X, y)
+
+    def test_time_budget_separates_fixed_cost_per_fit(self):
+        """Test that the budget is spent on iterations, not charged the fixed cost of each fit call"""
+        clock = [0.0]
+
+        class FakeBoosting:
+            """Warm-started booster whose fit costs 0.2s plus 0.01s per added iteration"""
+            def __init__(self, max_iter, **params):
+                self.max_iter, self.n_iter_ = max_iter, 0
+
+            def set_params(self, max_iter):
+                self.max_iter = max_iter
+
+            def fit(self, X, y):
+                clock[0] += 0.2 + 0.01 * (self.max_iter - self.n_iter_)
+                self.n_iter_ = self.max_iter
+
+        X, y = np.zeros((10, 2)), np.zeros(10)
+        with patch.object(backends, '_make', lambda backend, params: FakeBoosting(**params)), \
+                patch.object(backends.time, 'perf_counter', lambda: clock[0]):
+            _, info = fit_model('hist_gradient_boosting', X, y, params={'max_iter': 200}, time_budget=1.0)
+        self.assertTrue(info['stopped_early'])
+        self.assertGreater(info['estimators'], BUDGET_FIRST_STEP)
+        self.assertLessEqual(info['train_seconds'], 1.0 + 1e-9)
+
+def make_dated_cases(days=70, seed=0):
+    """Weekly-seasonal case arrivals for two call centers, one row per case"""
+    rng = np.random.default_rng(seed)
+    day = np.arange(days)
+    counts = rng.poisson(np.where(day % 7 < 5, 30, 8))
+    dates = pd.Timestamp('2025-01-06') + pd.to_timedelta(np.repeat(day, counts), unit='D')
+    n = len(dates)
+    df = pd.DataFrame({'Call Center': rng.choice(['Rabat', 'Pune'], n),
+                       'Origin': rng.choice(['Phone', 'Chat'], n),
+                       'Work Order Number': rng.integers(1, 50, n),
+                       'Case Created On Date': dates.strftime('%d/%m/%Y')})
+    df['Resolution Days'] = 0.1 * df['Work Order Number'] + 2 * (df['Origin'] == 'Phone') + rng.normal(0, 0.1, n)
+    return df
+
+
+class TestOnlineUpdates(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.store = online.configure_default_online_store(store_dir=self.tmp_dir)
+
+    def tearDown(self):
+        online.configure_default_online_store(persist=False)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_update_matches_fit_on_full_history(self):
+        """Test that updating with new days gives the state of a fit over the whole history"""
+        df = make_dated_cases()
+        days = pd.to_datetime(df['Case Created On Date'], format='%d/%m/%Y')
+        forecaster = OnlineVolumeForecaster.from_history(df[days < '2025-02-17'])
+        self.assertEqual(forecaster.describe()['watermark'], '2025-02-15')
+        result = forecaster.update(df)
+        # The last day of the full export is held back as possibly incomplete
+        self.assertEqual(result['periods_added'], 70 - 41 - 1)
+        self.assertEqual(forecaster.describe()['watermark'], '2025-03-15')
+
+        complete = build_case_series(df).values[:, :-1]
+        state = forecaster.state
+        expected = holt_winters_batch(complete, horizon=7, alphas=state['alpha'], betas=state['beta'],
+                                      gammas=state['gamma'])
+        np.testing.assert_allclose(forecaster.forecast(7)['series'][0]['forecast'],
+                                   np.clip(expected['forecasts'][0], 0, None).round(3), atol=1e-3)
+        self.assertEqual(forecaster.forecast(1)['forecast_periods'], ['2025-03-16'])
+
+        # Rows at or before the watermark are ignored, so re-sending the export changes nothing
+        before = forecaster.forecast(7)
+        self.assertEqual(forecaster.update(df)['rows_used'], 0)
+        self.assertEqual(forecaster.forecast(7), before)
+
+    def test_missing_group_values_keep_one_series(self):
+        """Test that cases without a call center stay one series across reloads"""
+        df = make_dated_cases()
+        df.loc[df.index % 10 == 0, 'Call Center'] = np.nan
+        days = pd.to_datetime(df['Case Created On Date'], format='%d/%m/%Y')
+        started = PredictiveAnalyzer.online_update(df[days < '2025-02-17'], levels=['call_center'], horizon=2)
+        self.assertIn({'Call Center': MISSING_KEY}, [s['key'] for s in started['forecast']['series']])
+        online.configure_default_online_store(store_dir=self.tmp_dir)
+        updated = PredictiveAnalyzer.online_update(df, model_id=started['model_id'], horizon=2)
+        self.assertEqual(updated['new_series'], 0)
+        self.assertEqual(updated['state']['series'], 3)
+        self.assertEqual(updated['state']['rows_ingested'], int((days < '2025-03-16').sum()))
+
+    def test_cached_predictions_follow_online_updates(self):
+        """Test that 'predict' through the result cache reflects the latest online update"""
+        df = make_dated_cases()
+        days = pd.to_datetime(df['Case Created On Date'], format='%d/%m/%Y')
+        rows = df.head(5).drop(columns=['Resolution Days']).to_json(orient='records')
+        model_id = PredictiveAnalyzer.online_update(df[days < '2025-02-03'], target_column='Resolution Days')['model_id']
+        tool = PredictiveAnalysisTool()
+        configure_default_result_cache()
+        try:
+            before = json.loads(tool._run(rows, analysis_type='predict', model_id=model_id))['predictions']
+            PredictiveAnalyzer.online_update(df, model_id=model_id)
+            after = json.loads(tool._run(rows, analysis_type='predict', model_id=model_id))['predictions']
+        finally:
+            configure_default_result_cache()
+        direct = PredictiveAnalyzer.predict_with_model(model_id, pd.read_json(io.StringIO(rows)))['predictions']
+        np.testing.assert_allclose(after, direct)
+        self.assertFalse(np.allclose(before, after))
+
+    def test_online_models_persist_across_calls(self):
+        """Test per-group volume and SGD models through the tool, reloaded from disk between updates"""
+        df = make_dated_cases()
+        days = pd.to_datetime(df['Case Created On Date'], format='%d/%m/%Y')
+        first, rest = df[days < '2025-02-17'], df[days >= '2025-02-16']
+        tool = PredictiveAnalysisTool()
+        started = json.loads(tool._run(first.to_json(orient='records'), analysis_type='online_update',
+                                       level='call_center', horizon=3))
+        self.assertEqual(len(started['forecast']['series']), 2)
+        online.configure_default_online_store(store_dir=self.tmp_dir)
+        updated = json.loads(tool._run(rest.to_json(orient='records'), analysis_type='online_update',
+                                       model_id=started['model_id'], horizon=3))
+        self.assertEqual(updated['periods_added'], 28)
+        self.assertEqual(updated['rows_used'], int((days.between('2025-02-16', '2025-03-15')).sum()))
+        self.assertEqual(updated['state']['updates'], 1)
+        forecast_only = json.loads(tool._run('', analysis_type='online_update', model_id=started['model_id'],
+                                             horizon=3))
+        self.assertEqual(forecast_only['forecast'], updated['forecast'])
+
+        regressor = PredictiveAnalyzer.online_update(first, target_column='Resolution Days')
+        self.assertEqual(regressor['model_type'], 'online_sgd')
+        result = PredictiveAnalyzer.online_update(rest, model_id=regressor['model_id'])
+        # Scored on the new rows before learning from them
+        self.assertLess(result['metrics_before_update']['mae'], 0.5)
+        online.configure_default_online_store(store_dir=self.tmp_dir)
+        predictions = PredictiveAnalyzer.predict_with_model(regressor['model_id'], rest.head(5))['predictions']
+        np.testing.assert_allclose(predictions, rest['Resolution Days'].head(5), atol=0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
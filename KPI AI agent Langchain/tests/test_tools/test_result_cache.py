@@ -0,0 +1,67 @@
+"""Tests for the tool result cache"""
+import json
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from src.tools.data.registry import dataset_registry
+from src.tools.eda.tool import EDATool
+from src.tools.result_cache import ToolResultCache, configure_default_result_cache
+
+
+class TestToolResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = configure_default_result_cache(cache_dir=self.tmp_dir, persist=True)
+        self.df = pd.DataFrame({'days': [1.0, 2.5, 4.0, 8.0], 'center': ['Rabat', 'Pune', 'Pune', 'Dublin']})
+        dataset_registry.register(self.df, 'result_cache_cases')
+
+    def tearDown(self):
+        dataset_registry.remove('ds:result_cache_cases')
+        configure_default_result_cache()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_repeated_call_hits(self):
+        """Test that an identical tool call is served from the cache"""
+        first = EDATool()._run('ds:result_cache_cases', analysis_type='summary')
+        second = EDATool()._run('ds:result_cache_cases', analysis_type='summary')
+        self.assertEqual(first, second)
+        self.assertEqual((self.cache.stats['misses'], self.cache.stats['hits']), (1, 1))
+
+        EDATool()._run('ds:result_cache_cases', analysis_type='correlation')
+        self.assertEqual(self.cache.stats['misses'], 2)
+
+    def test_new_dataset_version_misses(self):
+        """Test that the key follows dataset content rather than the handle"""
+        EDATool()._run('ds:result_cache_cases', analysis_type='summary')
+        dataset_registry.register(self.df.assign(days=self.df['days'] * 2), 'result_cache_cases')
+        result = json.loads(EDATool()._run('ds:result_cache_cases', analysis_type='summary'))
+        self.assertEqual(result['numeric_summary']['days']['max'], 16.0)
+        self.assertEqual(self.cache.stats['hits'], 0)
+
+    def test_errors_not_cached_and_results_persisted(self):
+        """Test that failures are recomputed and results survive a new cache instance"""
+        EDATool()._run('ds:result_cache_cases', analysis_type='nonsense')
+        self.assertEqual(self.cache.stats['uncacheable'], 1)
+        EDATool()._run('ds:result_cache_cases', analysis_type='summary')
+
+        fresh = configure_default_result_cache(cache_dir=self.tmp_dir, persist=True)
+        EDATool()._run('ds:result_cache_cases', analysis_type='summary')
+        self.assertEqual(fresh.stats['disk_hits'], 1)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = ToolResultCache(max_entries=2)
+        for key in ['a', 'b']:
+            cache.put(key, json.dumps({'key': key}))
+        cache.get('a')
+        cache.put('c', '{}')
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Tests for SQL query tools"""
+import json
+import unittest
+
+import pandas as pd
+
+from src.tools.data.registry import dataset_registry
+from src.tools.sql.core import QueryTimeoutError, SQLQueryEngine
+from src.tools.sql.tool import SQLQueryTool
+
+
+class TestSQLQueryEngine(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.handle = dataset_registry.register(pd.DataFrame({
+            'Call Center': pd.Series(['Rabat CA', 'Rabat CA', 'Rabat US'], dtype='category'),
+            'Resolution Days': [1.0, 3.0, 2.0]
+        }), "sql_cases")
+        self.engine = SQLQueryEngine()
+
+    def tearDown(self):
+        dataset_registry.remove(self.handle)
+
+    def test_aggregate_over_registered_dataset(self):
+        """Test that handles are queryable as tables and results are limited"""
+        result = self.engine.run(
+            'SELECT "Call Center", avg("Resolution Days") AS days FROM sql_cases GROUP BY 1 ORDER BY 1')
+        self.assertEqual(result['data'], [{'Call Center': 'Rabat CA', 'days': 2.0},
+                                          {'Call Center': 'Rabat US', 'days': 2.0}])
+        self.assertIn('execute_seconds', result['timing'])
+
+        limited = self.engine.run('SELECT * FROM sql_cases', max_rows=2)
+        self.assertEqual(limited['row_count'], 2)
+        self.assertTrue(limited['truncated'])
+
+    def test_rejects_writes_and_file_access(self):
+        """Test that only single read-only statements over datasets run"""
+        for query in ["DROP TABLE sql_cases", "SELECT 1; SELECT 2"]:
+            with self.assertRaises(ValueError):
+                self.engine.run(query)
+        with self.assertRaises(Exception):
+            self.engine.run("SELECT * FROM read_csv('requirements.txt')")
+
+    def test_timeout_interrupts_query(self):
+        """Test that long queries are interrupted"""
+        with self.assertRaises(QueryTimeoutError):
+            self.engine.run("SELECT count(*) FROM range(100000000) a, range(100000) b", timeout_seconds=0.2)
+
+    def test_tool_reports_errors(self):
+        """Test tool output for a valid and an invalid query"""
+        tool = SQLQueryTool(self.engine)
+        self.assertEqual(json.loads(tool._run("SELECT count(*) AS n FROM sql_cases"))['data'], [{'n': 3}])
+        self.assertTrue(tool._run("SELECT * FROM missing_table").startswith("SQL query failed"))
+
+    def test_max_rows_capped_by_engine(self):
+        """Test that a caller cannot ask for more rows than the engine allows"""
+        tool = SQLQueryTool(SQLQueryEngine(max_rows=2))
+        self.assertEqual(json.loads(tool._run("SELECT * FROM sql_cases"))['row_count'], 2)
+        capped = json.loads(tool._run("SELECT * FROM sql_cases", max_rows=10))
+        self.assertEqual(capped['row_count'], 2)
+        self.assertTrue(capped['truncated'])
+        self.assertEqual(json.loads(tool._run("SELECT * FROM sql_cases", max_rows=1))['row_count'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+"""Tests for tool import cost"""
+import os
+import subprocess
+import sys
+import unittest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_building_tools_skips_heavy_dependencies(self):
+        """Test that plotting and modelling libraries load only when an analysis needs them"""
+        code = (
+            "import sys\n"
+            "from src.tools.factory import get_all_tools\n"
+            "get_all_tools({'tools': {'powerbi': {'enabled': False}, 'ahp': {'enabled': False}}})\n"
+            "print(','.join(m for m in ['matplotlib', 'seaborn', 'sklearn', 'scipy'] if m in sys.modules))\n"
+        )
+        proc = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_DIR, capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stdout.strip(), "")
+
+if __name__ == '__main__':
+    unittest.main()